@@ -0,0 +1,34 @@
+import gc
+import time
+import tracemalloc
+
+
+def measure(func, repeat=3):
+    """
+    Run func repeatedly, returning the best wall time in seconds and the
+    peak memory allocated by a single run in bytes.
+    """
+    best_time = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        if best_time is None or elapsed < best_time:
+            best_time = elapsed
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return best_time, peak_memory
+
+
+def report(label, func, repeat=3):
+    elapsed, peak_memory = measure(func, repeat=repeat)
+    print("{0:<40} {1:>9.3f} s {2:>10.1f} MB".format(label, elapsed, peak_memory / 1024.0 / 1024.0))
+    return elapsed, peak_memory
@@ -0,0 +1,93 @@
+import io
+import zipfile
+
+
+_w_namespace = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+_r_namespace = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+
+_content_types_xml = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '</Types>'
+)
+
+_package_relationships_xml = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    '</Relationships>'
+)
+
+_run_properties = [
+    "",
+    "<w:rPr><w:b/></w:rPr>",
+    "<w:rPr><w:i/></w:rPr>",
+    "<w:rPr><w:b/><w:i/><w:u w:val=\"single\"/></w:rPr>",
+]
+
+
+def paragraphs_xml(paragraph_count, runs_per_paragraph=4):
+    paragraphs = []
+    for paragraph_index in range(paragraph_count):
+        runs = "".join(
+            "<w:r>{0}<w:t xml:space=\"preserve\">Paragraph {1}, run {2}. </w:t></w:r>".format(
+                _run_properties[run_index % len(_run_properties)],
+                paragraph_index,
+                run_index,
+            )
+            for run_index in range(runs_per_paragraph)
+        )
+        paragraphs.append("<w:p><w:pPr><w:pStyle w:val=\"Normal\"/></w:pPr>{0}</w:p>".format(runs))
+    return "".join(paragraphs)
+
+
+def nested_tables_xml(depth, cells_per_row=2, leaf_xml="<w:p><w:r><w:t>Cell</w:t></w:r></w:p>"):
+    if depth == 0:
+        return leaf_xml
+    else:
+        cell = "<w:tc>{0}</w:tc>".format(nested_tables_xml(depth - 1, cells_per_row=cells_per_row, leaf_xml=leaf_xml))
+        return "<w:tbl><w:tr>{0}</w:tr></w:tbl><w:p/>".format(cell * cells_per_row)
+
+
+def document_xml(body_xml):
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="{0}" xmlns:r="{1}"><w:body>{2}</w:body></w:document>'
+    ).format(_w_namespace, _r_namespace, body_xml).encode("utf-8")
+
+
+def comments_xml(comment_count, paragraphs_per_comment=2):
+    comments = "".join(
+        '<w:comment w:id="{0}" w:author="Author" w:initials="A">{1}</w:comment>'.format(
+            comment_index,
+            paragraphs_xml(paragraphs_per_comment),
+        )
+        for comment_index in range(comment_count)
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:comments xmlns:w="{0}" xmlns:r="{1}">{2}</w:comments>'
+    ).format(_w_namespace, _r_namespace, comments).encode("utf-8")
+
+
+def comment_references_xml(comment_count):
+    return "".join(
+        '<w:p><w:r><w:t>Paragraph {0}.</w:t></w:r><w:r><w:commentReference w:id="{0}"/></w:r></w:p>'.format(comment_index)
+        for comment_index in range(comment_count)
+    )
+
+
+def docx(body_xml, comments_xml=None):
+    fileobj = io.BytesIO()
+    with zipfile.ZipFile(fileobj, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        zip_file.writestr("[Content_Types].xml", _content_types_xml)
+        zip_file.writestr("_rels/.rels", _package_relationships_xml)
+        zip_file.writestr("word/document.xml", document_xml(body_xml))
+        if comments_xml is not None:
+            zip_file.writestr("word/comments.xml", comments_xml)
+    fileobj.seek(0)
+    return fileobj
@@ -0,0 +1,53 @@
+"""
+Measure the time and peak memory of converting a document with many
+comments, with comments ignored, as they are by default, and included, and
+of extracting its raw text.
+
+Usage:
+
+    python benchmarks/comments.py [docx-path ...]
+
+If no paths are given, a synthetic document is generated.
+"""
+
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mammoth
+
+import _measure
+import _synthetic
+
+
+def main():
+    paths = sys.argv[1:]
+    if paths:
+        inputs = [(path, _read_file(path)) for path in paths]
+    else:
+        comment_count = 5000
+        docx_bytes = _synthetic.docx(
+            _synthetic.comment_references_xml(comment_count),
+            comments_xml=_synthetic.comments_xml(comment_count),
+        ).getvalue()
+        inputs = [("synthetic ({0} comments)".format(comment_count), docx_bytes)]
+
+    for label, docx_bytes in inputs:
+        print(label)
+        _measure.report("comments ignored", lambda: mammoth.convert_to_html(io.BytesIO(docx_bytes)))
+        _measure.report("comments included", lambda: mammoth.convert_to_html(
+            io.BytesIO(docx_bytes),
+            style_map="comment-reference => sup",
+        ))
+        _measure.report("raw text", lambda: mammoth.extract_raw_text(io.BytesIO(docx_bytes)))
+
+
+def _read_file(path):
+    with open(path, "rb") as fileobj:
+        return fileobj.read()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Measure the time and peak memory of converting a document to HTML, both
+including reading the document and converting the already read document
+model.
+
+Usage:
+
+    python benchmarks/convert.py [docx-path ...]
+
+If no paths are given, a synthetic document is generated.
+"""
+
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mammoth
+from mammoth import docx, options
+from mammoth.conversion import convert_document_element_to_html
+
+import _measure
+import _synthetic
+
+
+def main():
+    paths = sys.argv[1:]
+    if paths:
+        inputs = [(path, _read_file(path)) for path in paths]
+    else:
+        body_xml = _synthetic.paragraphs_xml(5000, runs_per_paragraph=20)
+        inputs = [("synthetic (5000 paragraphs, 100000 runs)", _synthetic.docx(body_xml).getvalue())]
+
+    for label, docx_bytes in inputs:
+        document = docx.read(io.BytesIO(docx_bytes)).value
+        convert_options = options.read_options({}).value
+
+        print(label)
+        _measure.report("read and convert", lambda: mammoth.convert_to_html(io.BytesIO(docx_bytes)))
+        _measure.report("convert document model", lambda: convert_document_element_to_html(document, **convert_options))
+
+
+def _read_file(path):
+    with open(path, "rb") as fileobj:
+        return fileobj.read()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Measure the time taken to convert many small documents, comparing calling
+mammoth.convert_to_html for each document against using one
+mammoth.Converter for all of them, both sequentially and from a thread
+pool.
+
+Usage:
+
+    python benchmarks/converter.py [--documents N] [--threads N]
+"""
+
+import argparse
+import concurrent.futures
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mammoth
+
+import _measure
+import _synthetic
+
+
+_style_map = "\n".join([
+    "p[style-name='Normal'] => p.body:fresh",
+    "b => strong.bold",
+    "i => em.italic",
+    "u => span.underline",
+])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    documents = [
+        _synthetic.docx(_synthetic.paragraphs_xml(20)).getvalue()
+        for _ in range(args.documents)
+    ]
+    print("{0} documents".format(len(documents)))
+
+    def convert_each():
+        for docx_bytes in documents:
+            mammoth.convert_to_html(io.BytesIO(docx_bytes), style_map=_style_map)
+
+    def convert_with_converter():
+        converter = mammoth.Converter(style_map=_style_map)
+        for docx_bytes in documents:
+            converter.convert(io.BytesIO(docx_bytes))
+
+    def convert_with_converter_in_threads():
+        converter = mammoth.Converter(style_map=_style_map)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=args.threads) as executor:
+            for _ in executor.map(lambda docx_bytes: converter.convert(io.BytesIO(docx_bytes)), documents):
+                pass
+
+    _measure.report("convert_to_html", convert_each)
+    _measure.report("Converter", convert_with_converter)
+    _measure.report("Converter ({0} threads)".format(args.threads), convert_with_converter_in_threads)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Measure the memory retained by the document model of a document after it has
+been read.
+
+Usage:
+
+    python benchmarks/document_memory.py [docx-path ...]
+
+If no paths are given, a synthetic document is generated.
+"""
+
+import gc
+import io
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mammoth import docx
+
+import _synthetic
+
+
+def main():
+    paths = sys.argv[1:]
+    if paths:
+        inputs = [(path, _read_file(path)) for path in paths]
+    else:
+        body_xml = _synthetic.paragraphs_xml(5000, runs_per_paragraph=20)
+        inputs = [("synthetic (5000 paragraphs, 100000 runs)", _synthetic.docx(body_xml).getvalue())]
+
+    for label, docx_bytes in inputs:
+        retained_memory = _measure_retained_memory(lambda: docx.read(io.BytesIO(docx_bytes)).value)
+        print("{0:<40} {1:>10.1f} MB retained".format(label, retained_memory / 1024.0 / 1024.0))
+
+
+def _read_file(path):
+    with open(path, "rb") as fileobj:
+        return fileobj.read()
+
+
+def _measure_retained_memory(func):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        value = func()
+        gc.collect()
+        retained_memory, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    # Keep the value alive until the memory has been measured
+    del value
+    return retained_memory
+
+
+if __name__ == "__main__":
+    main()
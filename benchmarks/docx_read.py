@@ -0,0 +1,71 @@
+"""
+Measure the time and peak memory of reading a document into the document
+model, comparing reading the children of w:body as they are parsed against
+parsing the whole of document.xml into an XML tree first.
+
+Usage:
+
+    python benchmarks/docx_read.py [docx-path ...]
+
+If no paths are given, a synthetic document is generated.
+"""
+
+import io
+import os
+import sys
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mammoth import docx
+from mammoth.docx import body_xml, office_xml
+from mammoth.docx.numbering_xml import Numbering
+from mammoth.docx.document_xml import read_document_xml_element
+
+import _measure
+import _synthetic
+
+
+def main():
+    paths = sys.argv[1:]
+    if paths:
+        inputs = [(path, _read_file(path)) for path in paths]
+    else:
+        inputs = [("synthetic (20000 paragraphs)", _synthetic.docx(_synthetic.paragraphs_xml(20000)).getvalue())]
+
+    for label, docx_bytes in inputs:
+        print(label)
+        _measure.report("whole XML tree", lambda: _read_with_whole_tree(docx_bytes))
+        _measure.report("streamed body", lambda: docx.read(io.BytesIO(docx_bytes)))
+        _report_properties_cache(docx_bytes)
+
+
+def _read_file(path):
+    with open(path, "rb") as fileobj:
+        return fileobj.read()
+
+
+def _read_with_whole_tree(docx_bytes, body_reader=None):
+    if body_reader is None:
+        body_reader = body_xml.reader(numbering=Numbering.EMPTY)
+    with zipfile.ZipFile(io.BytesIO(docx_bytes)) as zip_file:
+        with zip_file.open("word/document.xml") as fileobj:
+            root = office_xml.read(fileobj)
+    return read_document_xml_element(root, body_reader=body_reader)
+
+
+def _report_properties_cache(docx_bytes):
+    body_reader = body_xml.reader(numbering=Numbering.EMPTY)
+    _read_with_whole_tree(docx_bytes, body_reader=body_reader)
+    for name, info in sorted(body_reader.properties_cache_info().items()):
+        look_ups = info.hits + info.misses
+        print("{0:<40} {1:>9.1%} hits ({2} distinct of {3})".format(
+            name + " properties cache",
+            info.hits / look_ups if look_ups else 0,
+            info.currsize,
+            look_ups,
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Measure the time and peak memory of embedding a style map into a document
+with large images, both by copying the document and in place.
+
+Usage:
+
+    python benchmarks/embed_style_map.py [images-size-in-MB]
+"""
+
+import io
+import os
+import sys
+import zipfile
+
+import tempman
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mammoth
+
+import _measure
+import _synthetic
+
+
+def main():
+    images_size = int(float(sys.argv[1]) * 1024 * 1024) if len(sys.argv) > 1 else 64 * 1024 * 1024
+    docx_bytes = _docx_with_images(images_size)
+
+    print("{0:.1f} MB of images".format(images_size / 1024.0 / 1024.0))
+    with tempman.create_temp_dir() as temp_dir:
+        path = os.path.join(temp_dir.path, "images.docx")
+        with open(path, "wb") as fileobj:
+            fileobj.write(docx_bytes)
+
+        _measure.report("copy", lambda: _embed(path, in_place=False))
+        _measure.report("in place", lambda: _embed(path, in_place=True))
+
+
+def _embed(path, in_place):
+    with open(path, "r+b") as fileobj:
+        mammoth.embed_style_map(fileobj, "p => h1", in_place=in_place)
+
+
+def _docx_with_images(images_size):
+    # Images are usually already compressed, so random bytes are
+    # representative, and are deflated as the images in documents often are.
+    image_size = 1024 * 1024
+    source = _synthetic.docx(_synthetic.paragraphs_xml(100))
+    fileobj = io.BytesIO()
+    with zipfile.ZipFile(source) as source_zip:
+        with zipfile.ZipFile(fileobj, "w", zipfile.ZIP_DEFLATED) as zip_file:
+            for info in source_zip.infolist():
+                zip_file.writestr(info, source_zip.read(info))
+            zip_file.writestr("word/_rels/document.xml.rels", _relationships_xml)
+            for index in range(images_size // image_size):
+                zip_file.writestr("word/media/image{0}.png".format(index), os.urandom(image_size))
+    return fileobj.getvalue()
+
+
+_relationships_xml = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships"/>'
+)
+
+
+if __name__ == "__main__":
+    main()
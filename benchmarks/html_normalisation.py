@@ -0,0 +1,71 @@
+"""
+Measure the time and peak memory of stripping empty nodes and collapsing the
+HTML generated for a document, comparing the fused single pass against
+stripping and collapsing separately.
+
+Usage:
+
+    python benchmarks/html_normalisation.py [docx-path ...]
+
+If no paths are given, a synthetic table-heavy document is generated.
+"""
+
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mammoth import docx, html, options, writers
+from mammoth.conversion import _create_converter, _ConversionContext
+
+import _measure
+import _synthetic
+
+
+def main():
+    paths = sys.argv[1:]
+    if paths:
+        inputs = [(path, _read_file(path)) for path in paths]
+    else:
+        body_xml = _synthetic.nested_tables_xml(depth=3, cells_per_row=4) * 200 + _synthetic.paragraphs_xml(5000)
+        inputs = [("synthetic (nested tables)", _synthetic.docx(body_xml).getvalue())]
+
+    for label, docx_bytes in inputs:
+        nodes = _convert_to_nodes(docx_bytes)
+        assert html.collapse(html.strip_empty(nodes)) == html.strip_empty_and_collapse(nodes)
+
+        print(label)
+        _measure.report("strip_empty then collapse", lambda: html.collapse(html.strip_empty(nodes)))
+        _measure.report("strip_empty_and_collapse", lambda: html.strip_empty_and_collapse(nodes))
+        _measure.report("separate passes, then write", lambda: _write(html.collapse(html.strip_empty(nodes))))
+        _measure.report("fused pass, then write", lambda: _write(html.strip_empty_and_collapse(nodes)))
+
+
+def _read_file(path):
+    with open(path, "rb") as fileobj:
+        return fileobj.read()
+
+
+def _convert_to_nodes(docx_bytes):
+    document = docx.read(io.BytesIO(docx_bytes)).value
+    convert_options = options.read_options({}).value
+    converter = _create_converter(
+        messages=[],
+        comments=document.comments,
+        style_map=convert_options["style_map"],
+        convert_image=None,
+        id_prefix=None,
+        ignore_empty_paragraphs=True,
+    )
+    return converter.visit(document, _ConversionContext(is_table_header=False))
+
+
+def _write(nodes):
+    writer = writers.writer()
+    html.write(writer, nodes)
+    return writer.as_string()
+
+
+if __name__ == "__main__":
+    main()
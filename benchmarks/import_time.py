@@ -0,0 +1,59 @@
+"""
+Measure the time taken to import mammoth in a fresh interpreter.
+
+Usage:
+
+    python benchmarks/import_time.py [--runs N] [--max-seconds SECONDS]
+
+If --max-seconds is set, exits with a non-zero status when the median import
+time exceeds it, so that the benchmark can be used to guard against
+regressions.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+
+_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_measure_import = (
+    "import time\n"
+    "start = time.perf_counter()\n"
+    "import mammoth\n"
+    "print(time.perf_counter() - start)\n"
+)
+
+
+def main():
+    args = _parse_args()
+
+    times = [_measure_import_time() for _ in range(args.runs)]
+    median_time = statistics.median(times)
+    print("import mammoth: median {0:.1f} ms, min {1:.1f} ms over {2} runs".format(
+        median_time * 1000,
+        min(times) * 1000,
+        args.runs,
+    ))
+
+    if args.max_seconds is not None and median_time > args.max_seconds:
+        print("Median import time exceeds {0:.1f} ms".format(args.max_seconds * 1000))
+        sys.exit(1)
+
+
+def _measure_import_time():
+    output = subprocess.check_output([sys.executable, "-c", _measure_import], cwd=_root)
+    return float(output.decode("ascii").strip())
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--max-seconds", type=float, default=None)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Measure the time and peak memory of reading deeply nested tables into the
+document model, both without messages and with a warning for every cell.
+
+Usage:
+
+    python benchmarks/nested_tables.py
+"""
+
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mammoth.docx import body_xml, office_xml
+from mammoth.docx.numbering_xml import Numbering
+from mammoth.docx.styles_xml import Styles
+
+import _measure
+import _synthetic
+
+
+_leaf_with_warning_xml = (
+    "<w:p><w:pPr><w:pStyle w:val=\"Undefined\"/></w:pPr>"
+    "<w:r><w:t>Cell</w:t></w:r></w:p>"
+)
+
+
+def main():
+    cases = [
+        ("depth 12, 2 cells per row", dict(depth=12, cells_per_row=2)),
+        ("depth 8, 3 cells per row", dict(depth=8, cells_per_row=3)),
+    ]
+    for label, kwargs in cases:
+        for leaf_label, leaf_xml in [("", None), (", warnings", _leaf_with_warning_xml)]:
+            if leaf_xml is not None:
+                kwargs = dict(kwargs, leaf_xml=leaf_xml)
+            body = _parse_body(_synthetic.nested_tables_xml(**kwargs))
+            _measure.report(label + leaf_label, lambda: _read(body))
+
+
+def _parse_body(body_xml_string):
+    root = office_xml.read(io.BytesIO(_synthetic.document_xml(body_xml_string)))
+    return root.find_child("w:body")
+
+
+def _read(body):
+    reader = body_xml.reader(numbering=Numbering.EMPTY, styles=Styles.EMPTY)
+    return reader.read_all(body.children)
+
+
+if __name__ == "__main__":
+    main()
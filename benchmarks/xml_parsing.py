@@ -0,0 +1,86 @@
+"""
+Compare parsing a document.xml part with mammoth's expat-based tree builder
+against the previous approach of building a full xml.dom.minidom tree and
+then converting it.
+
+Usage:
+
+    python benchmarks/xml_parsing.py [docx-path ...]
+
+If no paths are given, a synthetic document is generated.
+"""
+
+import io
+import os
+import sys
+import xml.dom.minidom
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mammoth.docx import office_xml
+from mammoth.docx.xmlparser import parse_xml, XmlElement, XmlText
+
+import _measure
+import _synthetic
+
+
+def main():
+    paths = sys.argv[1:]
+    if paths:
+        parts = [(path, _read_document_xml(path)) for path in paths]
+    else:
+        parts = [("synthetic (20000 paragraphs)", _synthetic.document_xml(_synthetic.paragraphs_xml(20000)))]
+
+    for label, part in parts:
+        print("{0}: {1:.1f} MB of XML".format(label, len(part) / 1024.0 / 1024.0))
+        _measure.report("minidom", lambda: _parse_with_minidom(io.BytesIO(part), office_xml._namespaces))
+        _measure.report("expat tree builder", lambda: parse_xml(io.BytesIO(part), office_xml._namespaces))
+
+
+def _read_document_xml(path):
+    with zipfile.ZipFile(path) as zip_file:
+        return zip_file.read("word/document.xml")
+
+
+def _parse_with_minidom(fileobj, namespace_mapping):
+    namespace_prefixes = dict((uri, prefix) for prefix, uri in namespace_mapping)
+
+    document = xml.dom.minidom.parse(fileobj)
+
+    def convert_node(node):
+        if node.nodeType == xml.dom.Node.ELEMENT_NODE:
+            return convert_element(node)
+        elif node.nodeType == xml.dom.Node.TEXT_NODE:
+            return XmlText(node.nodeValue)
+        else:
+            return None
+
+    def convert_element(element):
+        converted_attributes = dict(
+            (convert_name(attribute), attribute.value)
+            for attribute in element.attributes.values()
+            if attribute.namespaceURI != "http://www.w3.org/2000/xmlns/"
+        )
+        converted_children = []
+        for child_node in element.childNodes:
+            converted_child_node = convert_node(child_node)
+            if converted_child_node is not None:
+                converted_children.append(converted_child_node)
+        return XmlElement(convert_name(element), converted_attributes, converted_children)
+
+    def convert_name(node):
+        if node.namespaceURI is None:
+            return node.localName
+        else:
+            prefix = namespace_prefixes.get(node.namespaceURI)
+            if prefix is None:
+                return "{%s}%s" % (node.namespaceURI, node.localName)
+            else:
+                return "%s:%s" % (prefix, node.localName)
+
+    return convert_node(document.documentElement)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Measure the time taken to parse a document.xml part into an XML tree, the
+memory retained by the tree, and the time taken to look up children by name
+in the way that reading run and paragraph properties does.
+
+Usage:
+
+    python benchmarks/xml_tree.py [docx-path ...]
+
+If no paths are given, a synthetic document is generated.
+"""
+
+import gc
+import io
+import os
+import sys
+import tracemalloc
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mammoth.docx import office_xml
+from mammoth.docx.xmlparser import parse_xml
+
+import _measure
+import _synthetic
+
+
+# The children of w:rPr looked up when reading a run
+_run_property_names = [
+    "w:rStyle", "w:vertAlign", "w:b", "w:i", "w:u", "w:strike",
+    "w:caps", "w:smallCaps", "w:rFonts", "w:sz", "w:highlight",
+]
+
+
+def main():
+    paths = sys.argv[1:]
+    if paths:
+        parts = [(path, _read_document_xml(path)) for path in paths]
+    else:
+        parts = [("synthetic (20000 paragraphs)", _synthetic.document_xml(_synthetic.paragraphs_xml(20000)))]
+
+    for label, part in parts:
+        print("{0}: {1:.1f} MB of XML".format(label, len(part) / 1024.0 / 1024.0))
+        _measure.report("parse", lambda: parse_xml(io.BytesIO(part), office_xml._namespaces))
+
+        _report_look_ups(part)
+
+        retained_memory = _measure_retained_memory(lambda: parse_xml(io.BytesIO(part), office_xml._namespaces))
+        print("{0:<40} {1:>10.1f} MB retained".format("tree", retained_memory / 1024.0 / 1024.0))
+
+
+def _report_look_ups(part):
+    root = parse_xml(io.BytesIO(part), office_xml._namespaces)
+    run_properties = list(_find_all(root, "w:rPr"))
+    _measure.report("look up run properties", lambda: _look_up_children(run_properties))
+
+
+def _read_document_xml(path):
+    with zipfile.ZipFile(path) as zip_file:
+        return zip_file.read("word/document.xml")
+
+
+def _find_all(element, name):
+    for child in element.children:
+        if getattr(child, "name", None) == name:
+            yield child
+        if hasattr(child, "children"):
+            for descendant in _find_all(child, name):
+                yield descendant
+
+
+def _look_up_children(elements):
+    for element in elements:
+        for name in _run_property_names:
+            element.find_child_or_null(name)
+
+
+def _measure_retained_memory(func):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        value = func()
+        gc.collect()
+        retained_memory, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    del value
+    return retained_memory
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Measure the time and peak memory of converting a document with a large
+image to HTML, reading the document from a file on disk, which is
+memory-mapped, and from an in-memory file, which isn't. The image is
+encoded using streaming_data_uri and the HTML is written to a file as it's
+generated, so the peak memory is mostly the copies made of the image.
+
+Usage:
+
+    python benchmarks/zip_images.py [image-size-in-MB]
+
+The image is stored uncompressed, as images usually are in DOCX files.
+"""
+
+import io
+import os
+import sys
+import zipfile
+
+import tempman
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mammoth
+
+import _measure
+
+
+_test_data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tests", "test-data")
+
+
+def main():
+    image_size = int(float(sys.argv[1]) * 1024 * 1024) if len(sys.argv) > 1 else 32 * 1024 * 1024
+    docx_bytes = _docx_with_image(os.urandom(image_size))
+
+    print("{0:.1f} MB image".format(image_size / 1024.0 / 1024.0))
+    with tempman.create_temp_dir() as temp_dir:
+        path = os.path.join(temp_dir.path, "image.docx")
+        with open(path, "wb") as fileobj:
+            fileobj.write(docx_bytes)
+
+        _measure.report("file on disk", lambda: _convert_path(path))
+        _measure.report("in-memory file", lambda: _convert(io.BytesIO(docx_bytes)))
+
+
+def _convert_path(path):
+    with open(path, "rb") as fileobj:
+        return _convert(fileobj)
+
+
+def _convert(fileobj):
+    with open(os.devnull, "wb") as output:
+        return mammoth.convert_to_html(
+            fileobj,
+            convert_image=mammoth.images.streaming_data_uri,
+            output=output,
+        )
+
+
+def _docx_with_image(image_bytes):
+    fileobj = io.BytesIO()
+    with zipfile.ZipFile(os.path.join(_test_data_dir, "tiny-picture.docx")) as source_zip:
+        with zipfile.ZipFile(fileobj, "w") as zip_file:
+            for info in source_zip.infolist():
+                if info.filename == "word/media/image1.png":
+                    zip_file.writestr(info.filename, image_bytes, compress_type=zipfile.ZIP_STORED)
+                else:
+                    zip_file.writestr(info, source_zip.read(info))
+    return fileobj.getvalue()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,14 @@
-from . import docx, conversion, options, images, transforms, underline
+import itertools
+
+from . import docx, conversion, options, images, results, transforms, underline
 from .raw_text import extract_raw_text_from_element
-from .docx.style_map import write_style_map, read_style_map
+from .docx.style_map import write_style_map, read_style_map, read_zip_style_map
+from .zips import open_zip
+from .options import compile_style_map
+from .caches import LruCache, PartCache
+from .styles import CompiledStyleMap
 
-__all__ = ["convert_to_html", "extract_raw_text", "images", "transforms", "underline"]
+__all__ = ["convert_to_html", "aconvert_to_html", "iter_convert_to_html", "compile_style_map", "Converter", "extract_raw_text", "images", "transforms", "underline"]
 
 
 _undefined = object()
@@ -22,28 +28,177 @@ def convert(
     id_prefix=None,
     include_embedded_style_map=_undefined,
     external_file_access=_undefined,
+    executor=None,
+    fetcher=None,
+    part_cache=None,
     **kwargs
 ):
+    return _read_document_and_options(
+        fileobj,
+        transform_document=transform_document,
+        include_embedded_style_map=include_embedded_style_map,
+        external_file_access=external_file_access,
+        executor=executor,
+        fetcher=fetcher,
+        part_cache=part_cache,
+        kwargs=kwargs,
+    ).bind(lambda document_and_options:
+        conversion.convert_document_element_to_html(
+            document_and_options[0],
+            id_prefix=id_prefix,
+            **document_and_options[1]
+        )
+    )
+
+
+def _read_document_and_options(fileobj, transform_document, include_embedded_style_map, external_file_access, executor, fetcher, part_cache, kwargs):
     if include_embedded_style_map is _undefined:
         include_embedded_style_map = True
 
     if transform_document is None:
         transform_document = lambda x: x
 
+    zip_file = open_zip(fileobj, "r")
+
     if include_embedded_style_map:
-        kwargs["embedded_style_map"] = read_style_map(fileobj)
+        kwargs["embedded_style_map"] = read_zip_style_map(zip_file)
 
     if external_file_access is _undefined:
         external_file_access = False
 
     return options.read_options(kwargs).bind(lambda convert_options:
-        docx.read(fileobj, external_file_access=external_file_access).map(transform_document).bind(lambda document:
-            conversion.convert_document_element_to_html(
-                document,
-                id_prefix=id_prefix,
-                **convert_options
+        docx.read(fileobj, external_file_access=external_file_access, zip_file=zip_file, executor=executor, fetcher=fetcher, part_cache=part_cache)
+            .map(transform_document)
+            .map(lambda document: (document, convert_options))
+    )
+
+
+async def aconvert_to_html(*args, **kwargs):
+    from . import aio
+    return await aio.convert(*args, output_format="html", **kwargs)
+
+
+def _attributes_size(attributes):
+    # Streamed attribute values aren't held in memory, so don't count
+    return sum(len(value) for value in attributes.values() if isinstance(value, str))
+
+
+class Converter(object):
+    def __init__(
+        self,
+        style_map=None,
+        convert_image=None,
+        output_format="html",
+        id_prefix=None,
+        include_default_style_map=True,
+        include_embedded_style_map=True,
+        ignore_empty_paragraphs=True,
+        transform_document=None,
+        external_file_access=False,
+        fetcher=None,
+        image_cache_size=64 * 1024 * 1024,
+        part_cache_size=64,
+    ):
+        if not isinstance(style_map, CompiledStyleMap):
+            style_map = compile_style_map(style_map or "")
+
+        if transform_document is None:
+            transform_document = lambda x: x
+
+        # Only data URIs are cached: custom image converters can use
+        # images.memoize to cache their own images.
+        self.image_cache = LruCache(image_cache_size, size=_attributes_size)
+        if convert_image is None:
+            convert_image = images.img_element(images.memoize(images._data_uri_attributes, cache=self.image_cache))
+
+        self._style_map = style_map
+        self._convert_image = convert_image
+        self._output_format = output_format
+        self._id_prefix = id_prefix
+        self._include_default_style_map = include_default_style_map
+        self._include_embedded_style_map = include_embedded_style_map
+        self._ignore_empty_paragraphs = ignore_empty_paragraphs
+        self._transform_document = transform_document
+        self._external_file_access = external_file_access
+        self._fetcher = fetcher
+        self.part_cache = PartCache(part_cache_size)
+        self._run_wrappings = LruCache(32)
+
+    def convert(self, fileobj, output=None):
+        zip_file = open_zip(fileobj, "r")
+
+        if self._include_embedded_style_map:
+            embedded_style_map = read_zip_style_map(zip_file)
+        else:
+            embedded_style_map = None
+
+        options_result = options.read_options(dict(
+            style_map=self._style_map,
+            embedded_style_map=embedded_style_map,
+            include_default_style_map=self._include_default_style_map,
+        ))
+
+        return options_result.bind(lambda convert_options:
+            docx.read(fileobj, external_file_access=self._external_file_access, zip_file=zip_file, fetcher=self._fetcher, part_cache=self.part_cache).map(self._transform_document).bind(lambda document:
+                conversion._convert_document_element_to_html(
+                    document,
+                    style_map=convert_options["style_map"],
+                    convert_image=self._convert_image,
+                    id_prefix=self._id_prefix,
+                    output_format=self._output_format,
+                    ignore_empty_paragraphs=self._ignore_empty_paragraphs,
+                    output=output,
+                    run_wrappings=self._find_run_wrappings(convert_options["style_map"]),
+                )
             )
         )
+
+    def _find_run_wrappings(self, style_map):
+        run_wrappings = self._run_wrappings.get(style_map)
+        if run_wrappings is None:
+            run_wrappings = self._run_wrappings[style_map] = conversion._run_wrappings_cache()
+        return run_wrappings
+
+
+def iter_convert_to_html(*args, **kwargs):
+    return iter_convert(*args, output_format="html", **kwargs)
+
+
+def iter_convert(
+    fileobj,
+    id_prefix=None,
+    include_embedded_style_map=_undefined,
+    external_file_access=_undefined,
+    executor=None,
+    fetcher=None,
+    part_cache=None,
+    **kwargs
+):
+    if include_embedded_style_map is _undefined:
+        include_embedded_style_map = True
+
+    zip_file = open_zip(fileobj, "r")
+
+    if include_embedded_style_map:
+        kwargs["embedded_style_map"] = read_zip_style_map(zip_file)
+
+    if external_file_access is _undefined:
+        external_file_access = False
+
+    convert_options_result = options.read_options(kwargs)
+    document_parts = docx.iter_read(fileobj, external_file_access=external_file_access, zip_file=zip_file, executor=executor, fetcher=fetcher, part_cache=part_cache)
+    document_result = next(document_parts)
+
+    children_results = itertools.chain(
+        [results.Result([], convert_options_result.messages + document_result.messages)],
+        document_parts,
+    )
+
+    return conversion.iter_convert_document_to_html(
+        document_result.value,
+        children_results,
+        id_prefix=id_prefix,
+        **convert_options_result.value
     )
 
 
@@ -51,8 +206,28 @@ def extract_raw_text(fileobj):
     return docx.read(fileobj).map(extract_raw_text_from_element)
 
 
-def embed_style_map(fileobj, style_map):
-    write_style_map(fileobj, style_map)
+def embed_style_map(fileobj, style_map, in_place=False):
+    write_style_map(fileobj, style_map, in_place=in_place)
+
+
+def embed_style_map_in_files(paths, style_map, in_place=False, executor=None):
+    if executor is None:
+        import concurrent.futures
+        with concurrent.futures.ThreadPoolExecutor() as default_executor:
+            return embed_style_map_in_files(paths, style_map, in_place=in_place, executor=default_executor)
+
+    def embed(path):
+        with open(path, "r+b") as fileobj:
+            write_style_map(fileobj, style_map, in_place=in_place)
+
+    futures = [(path, executor.submit(embed, path)) for path in paths]
+    errors = {}
+    for path, future in futures:
+        error = future.exception()
+        if error is not None:
+            errors[path] = error
+    return errors
+
 
 def read_embedded_style_map(fileobj):
     return read_style_map(fileobj)
@@ -0,0 +1,163 @@
+import asyncio
+import contextlib
+import functools
+import io
+
+from . import _read_document_and_options, conversion, documents, html_paths, results
+from .docx.files import InvalidFileReferenceError, _urlopen
+
+
+async def convert(
+    fileobj,
+    output_format,
+    transform_document=None,
+    id_prefix=None,
+    include_embedded_style_map=True,
+    external_file_access=False,
+    executor=None,
+    fetcher=None,
+    part_cache=None,
+    max_concurrent_fetches=8,
+    fetch_timeout=30,
+    **kwargs
+):
+    loop = asyncio.get_running_loop()
+
+    if external_file_access and fetcher is None:
+        fetcher = _TimeoutFetcher(fetch_timeout)
+
+    read_result, linked_images = await loop.run_in_executor(executor, functools.partial(
+        _read_document_and_find_linked_images,
+        fileobj,
+        transform_document=transform_document,
+        include_embedded_style_map=include_embedded_style_map,
+        external_file_access=external_file_access,
+        fetcher=fetcher,
+        part_cache=part_cache,
+        kwargs=kwargs,
+    ))
+    document, convert_options = read_result.value
+
+    if linked_images:
+        await fetch_linked_images(
+            linked_images,
+            executor=executor,
+            max_concurrent_fetches=max_concurrent_fetches,
+            timeout=fetch_timeout,
+        )
+
+    conversion_result = await loop.run_in_executor(executor, functools.partial(
+        conversion.convert_document_element_to_html,
+        document,
+        id_prefix=id_prefix,
+        output_format=output_format,
+        **convert_options
+    ))
+    return results.Result(conversion_result.value, read_result.messages + conversion_result.messages)
+
+
+def _read_document_and_find_linked_images(fileobj, transform_document, include_embedded_style_map, external_file_access, fetcher, part_cache, kwargs):
+    # Finding linked images reads the referenced notes and comments, so is
+    # done in the executor along with reading the document.
+    read_result = _read_document_and_options(
+        fileobj,
+        transform_document=transform_document,
+        include_embedded_style_map=include_embedded_style_map,
+        external_file_access=external_file_access,
+        executor=None,
+        fetcher=fetcher,
+        part_cache=part_cache,
+        kwargs=kwargs,
+    )
+    if external_file_access:
+        document, convert_options = read_result.value
+        linked_images = _find_linked_images(document, convert_options["style_map"])
+    else:
+        linked_images = []
+    return read_result, linked_images
+
+
+async def fetch_linked_images(images, executor, max_concurrent_fetches, timeout):
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(max_concurrent_fetches)
+
+    async def fetch(image):
+        await semaphore.acquire()
+        future = loop.run_in_executor(executor, _read_image, image)
+        # A read that times out can't be stopped, so the semaphore is only
+        # released once the read has finished.
+        future.add_done_callback(lambda _: semaphore.release())
+        try:
+            contents = await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            image.open = functools.partial(_raise, InvalidFileReferenceError(
+                "could not open external image: timed out after {0} seconds".format(timeout)
+            ))
+        except Exception as error:
+            image.open = functools.partial(_raise, error)
+        else:
+            image.open = functools.partial(io.BytesIO, contents)
+
+    await asyncio.gather(*[fetch(image) for image in images])
+
+
+# Comments are only converted if the style map converts comment references.
+def _find_linked_images(document, style_map):
+    if isinstance(document, documents.Document):
+        notes = document.notes
+        comments = document.comments
+        if not isinstance(comments, documents.Comments):
+            comments = documents.Comments(comments)
+    else:
+        notes = documents.Notes({})
+        comments = documents.Comments([])
+
+    comment_style = style_map.find_style(None, "comment_reference")
+    includes_comments = comment_style is not None and comment_style.html_path is not html_paths.ignore
+
+    images = []
+    found_referents = set()
+    elements = [document]
+    while elements:
+        element = elements.pop()
+        if isinstance(element, documents.Image):
+            if not element.is_embedded:
+                images.append(element)
+        elif isinstance(element, documents.NoteReference):
+            key = ("note", element.note_type, element.note_id)
+            if key not in found_referents:
+                found_referents.add(key)
+                elements.extend(_referent_body(lambda: notes.read(element)))
+        elif isinstance(element, documents.CommentReference):
+            key = ("comment", element.comment_id)
+            if includes_comments and key not in found_referents:
+                found_referents.add(key)
+                elements.extend(_referent_body(lambda: comments.read(element.comment_id)))
+        else:
+            elements.extend(getattr(element, "children", ()))
+    return images
+
+
+def _referent_body(read_referent):
+    try:
+        return read_referent().value.body
+    except KeyError:
+        # Missing referents are reported when the document is converted
+        return []
+
+
+class _TimeoutFetcher(object):
+    def __init__(self, timeout):
+        self._timeout = timeout
+
+    def open(self, uri):
+        return contextlib.closing(_urlopen(uri, timeout=self._timeout))
+
+
+def _read_image(image):
+    with image.open() as image_file:
+        return image_file.read()
+
+
+def _raise(error):
+    raise error
@@ -0,0 +1,86 @@
+import collections
+import threading
+
+
+class LruCache(object):
+    def __init__(self, max_size, size=None):
+        self._max_size = max_size
+        self._size = size
+        self._total_size = 0
+        self._values = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self._values.move_to_end(key)
+            except KeyError:
+                return default
+            return self._values[key]
+
+    def __setitem__(self, key, value):
+        value_size = self._value_size(value)
+        with self._lock:
+            if key in self._values:
+                self._total_size -= self._value_size(self._values.pop(key))
+
+            if value_size > self._max_size:
+                return
+
+            self._values[key] = value
+            self._total_size += value_size
+            while self._total_size > self._max_size:
+                _, discarded_value = self._values.popitem(last=False)
+                self._total_size -= self._value_size(discarded_value)
+
+    def __len__(self):
+        return len(self._values)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+            self._total_size = 0
+
+    def _value_size(self, value):
+        if self._size is None:
+            return 1
+        else:
+            return self._size(value)
+
+
+PartCacheInfo = collections.namedtuple("PartCacheInfo", ["hits", "misses", "size"])
+
+
+class PartCache(object):
+    def __init__(self, max_size=64):
+        self._parts = LruCache(max_size)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def read(self, key, read_part):
+        part = self._parts.get(key, _missing)
+        if part is _missing:
+            part = read_part()
+            self._parts[key] = part
+            self._record(is_hit=False)
+        else:
+            self._record(is_hit=True)
+        return part
+
+    def info(self):
+        with self._lock:
+            return PartCacheInfo(hits=self._hits, misses=self._misses, size=len(self._parts))
+
+    def clear(self):
+        self._parts.clear()
+
+    def _record(self, is_hit):
+        with self._lock:
+            if is_hit:
+                self._hits += 1
+            else:
+                self._misses += 1
+
+
+_missing = object()
@@ -1,5 +1,6 @@
 import argparse
-import io
+import contextlib
+import multiprocessing
 import os
 import shutil
 import sys
@@ -17,57 +18,184 @@ def main():
         with open(args.style_map) as style_map_fileobj:
             style_map = style_map_fileobj.read()
     
-    with open(args.path, "rb") as docx_fileobj:
-        if args.output_dir is None:
-            convert_image = None
-            output_path = args.output
-        else:
-            convert_image = mammoth.images.img_element(ImageWriter(args.output_dir))
-            output_filename = "{0}.html".format(os.path.basename(args.path).rpartition(".")[0])
-            output_path = os.path.join(args.output_dir, output_filename)
-        
-        result = mammoth.convert(
-            docx_fileobj,
+    if args.batch:
+        sys.exit(_convert_directory(
+            args.path,
+            args.output_dir,
             style_map=style_map,
-            convert_image=convert_image,
             output_format=args.output_format,
+            jobs=args.jobs,
+        ))
+    
+    if args.output_dir is None:
+        convert_image = None
+        output_path = args.output
+    else:
+        convert_image = mammoth.images.img_element(mammoth.images.memoize(ImageWriter(args.output_dir)))
+        output_path = os.path.join(args.output_dir, _output_filename(args.path))
+    
+    messages = _convert_file(
+        args.path,
+        output_path,
+        style_map=style_map,
+        convert_image=convert_image,
+        output_format=args.output_format,
+    )
+    for message in messages:
+        sys.stderr.write(message.message)
+        sys.stderr.write("\n")
+
+
+def _convert_file(docx_path, output_path, style_map, convert_image, output_format, part_cache=None):
+    with open(docx_path, "rb") as docx_fileobj:
+        with _open_output(output_path) as output:
+            result = mammoth.convert(
+                docx_fileobj,
+                style_map=style_map,
+                convert_image=convert_image,
+                output_format=output_format,
+                output=output,
+                part_cache=part_cache,
+            )
+    
+    return result.messages
+
+
+def _output_filename(docx_path):
+    return "{0}.html".format(os.path.basename(docx_path).rpartition(".")[0])
+
+
+# Files whose output is newer than the input are skipped, so that an
+# interrupted conversion can be resumed.
+def _convert_directory(input_dir, output_dir, style_map, output_format, jobs):
+    tasks = [
+        (docx_path, output_path)
+        for docx_path, output_path in _find_batch_files(input_dir, output_dir)
+        if not _is_up_to_date(docx_path, output_path)
+    ]
+    
+    if jobs == 1:
+        _initialise_batch_worker(style_map, output_format)
+        batch_results = map(_convert_batch_file, tasks)
+        exit_status = _report_batch_results(batch_results)
+    else:
+        pool = multiprocessing.Pool(
+            jobs,
+            initializer=_initialise_batch_worker,
+            initargs=(style_map, output_format),
         )
-        for message in result.messages:
-            sys.stderr.write(message.message)
-            sys.stderr.write("\n")
-        
-        _write_output(output_path, result.value)
+        try:
+            exit_status = _report_batch_results(pool.imap_unordered(_convert_batch_file, tasks))
+        finally:
+            pool.close()
+            pool.join()
+    
+    return exit_status
+
+
+def _find_batch_files(input_dir, output_dir):
+    for dirpath, dirnames, filenames in os.walk(input_dir):
+        dirnames.sort()
+        relative_dir = os.path.relpath(dirpath, input_dir)
+        for filename in sorted(filenames):
+            # Word leaves lock files named ~$<name>.docx next to open documents
+            if filename.lower().endswith(".docx") and not filename.startswith("~$"):
+                yield (
+                    os.path.join(dirpath, filename),
+                    os.path.normpath(os.path.join(output_dir, relative_dir, _output_filename(filename))),
+                )
+
+
+def _is_up_to_date(docx_path, output_path):
+    return (
+        os.path.exists(output_path) and
+        os.path.getmtime(output_path) >= os.path.getmtime(docx_path)
+    )
+
+
+def _report_batch_results(batch_results):
+    exit_status = 0
+    for docx_path, messages, error in batch_results:
+        for message in messages:
+            sys.stderr.write("{0}: {1}\n".format(docx_path, message))
+        if error is not None:
+            sys.stderr.write("{0}: conversion failed: {1}\n".format(docx_path, error))
+            exit_status = 1
+    return exit_status
+
+
+# Set once per worker process, so the style map is parsed once per worker.
+_batch_options = None
+
+
+def _initialise_batch_worker(style_map, output_format):
+    global _batch_options
+    _batch_options = {
+        "style_map": None if style_map is None else mammoth.compile_style_map(style_map),
+        "output_format": output_format,
+        "part_cache": mammoth.PartCache(),
+    }
+
+
+def _convert_batch_file(task):
+    docx_path, output_path = task
+    output_dir = os.path.dirname(output_path)
+    image_prefix = "{0}-".format(os.path.basename(output_path).rpartition(".")[0])
+    try:
+        if not os.path.isdir(output_dir):
+            os.makedirs(output_dir)
+        messages = _convert_file(
+            docx_path,
+            output_path,
+            convert_image=mammoth.images.img_element(mammoth.images.memoize(
+                ImageWriter(output_dir, filename_prefix=image_prefix),
+            )),
+            **_batch_options
+        )
+        return docx_path, [message.message for message in messages], None
+    except Exception as error:
+        return docx_path, [], str(error)
 
 
 class ImageWriter(object):
-    def __init__(self, output_dir):
+    def __init__(self, output_dir, filename_prefix=""):
         self._output_dir = output_dir
+        self._filename_prefix = filename_prefix
         self._image_number = 1
         
     def __call__(self, element):
         extension = element.content_type.partition("/")[2]
-        image_filename = "{0}.{1}".format(self._image_number, extension)
+        image_filename = "{0}{1}.{2}".format(self._filename_prefix, self._image_number, extension)
         with open(os.path.join(self._output_dir, image_filename), "wb") as image_dest:
             with element.open() as image_source:
-                shutil.copyfileobj(image_source, image_dest)
+                if hasattr(image_source, "getbuffer"):
+                    with image_source.getbuffer() as image_bytes:
+                        image_dest.write(image_bytes)
+                else:
+                    shutil.copyfileobj(image_source, image_dest)
         
         self._image_number += 1
         
         return {"src": image_filename}
 
 
-def _write_output(path, contents):
+@contextlib.contextmanager
+def _open_output(path):
     if path is None:
-        if sys.version_info[0] <= 2:
-            stdout = sys.stdout
-        else:
-            stdout = sys.stdout.buffer
-
-        stdout.write(contents.encode("utf-8"))
-        stdout.flush()
+        yield sys.stdout.buffer
+        sys.stdout.buffer.flush()
     else:
-        with io.open(path, "w", encoding="utf-8") as fileobj:
-            fileobj.write(contents)
+        # Write to a temporary file first, so that an interrupted conversion
+        # doesn't leave partial output that looks up-to-date.
+        temp_path = path + ".partial"
+        temp_fileobj = open(temp_path, "wb")
+        try:
+            with temp_fileobj:
+                yield temp_fileobj
+            os.replace(temp_path, path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
 
 
 def _parse_args():
@@ -75,7 +203,7 @@ def _parse_args():
     parser.add_argument(
         "path",
         metavar="docx-path",
-        help="Path to the .docx file to convert.")
+        help="Path to the .docx file to convert, or the directory to convert if --batch is set.")
     
     output_group = parser.add_mutually_exclusive_group()
     output_group.add_argument(
@@ -96,7 +224,23 @@ def _parse_args():
         "--style-map",
         required=False,
         help="File containg a style map.")
-    return parser.parse_args()
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Convert every .docx file in the directory docx-path, including subdirectories. Requires --output-dir. Files with output newer than the .docx file are skipped.")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Number of worker processes to use with --batch. Defaults to the number of CPUs.")
+    args = parser.parse_args()
+    if args.batch and args.output_dir is None:
+        parser.error("--batch requires --output-dir")
+    if args.jobs is None:
+        args.jobs = multiprocessing.cpu_count()
+    elif args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    return args
 
 
 if __name__ == "__main__":
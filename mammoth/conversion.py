@@ -2,55 +2,127 @@
 
 from __future__ import unicode_literals
 
-from functools import partial
-
 import cobble
 
 from . import documents, results, html_paths, images, writers, html
+from .caches import LruCache
 from .docx.files import InvalidFileReferenceError
 from .lists import find_index
+from .styles import CompiledStyleMap
 
 
 def convert_document_element_to_html(element,
+        style_map=None,
+        convert_image=None,
+        id_prefix=None,
+        output_format=None,
+        ignore_empty_paragraphs=True,
+        output=None):
+    return _convert_document_element_to_html(
+        element,
+        style_map=style_map,
+        convert_image=convert_image,
+        id_prefix=id_prefix,
+        output_format=output_format,
+        ignore_empty_paragraphs=ignore_empty_paragraphs,
+        output=output,
+        run_wrappings=None,
+    )
+
+
+def _convert_document_element_to_html(element, style_map, convert_image, id_prefix,
+        output_format, ignore_empty_paragraphs, output, run_wrappings):
+    if isinstance(element, documents.Document):
+        comments = element.comments
+    else:
+        comments = documents.Comments([])
+
+    messages = []
+    converter = _create_converter(
+        messages=messages,
+        comments=comments,
+        style_map=style_map,
+        convert_image=convert_image,
+        id_prefix=id_prefix,
+        ignore_empty_paragraphs=ignore_empty_paragraphs,
+        run_wrappings=run_wrappings,
+    )
+    context = _ConversionContext(is_table_header=False)
+    nodes = converter.visit(element, context)
+
+    writer = writers.writer(output_format, output=output)
+    html.write(writer, html.strip_empty_and_collapse(nodes))
+    return results.Result(writer.as_string(), messages)
+
+
+# document should have no children: they're read from children_results.
+def iter_convert_document_to_html(document, children_results,
         style_map=None,
         convert_image=None,
         id_prefix=None,
         output_format=None,
         ignore_empty_paragraphs=True):
+    messages = []
+    converter = _create_converter(
+        messages=messages,
+        comments=document.comments,
+        style_map=style_map,
+        convert_image=convert_image,
+        id_prefix=id_prefix,
+        ignore_empty_paragraphs=ignore_empty_paragraphs,
+    )
+    context = _ConversionContext(is_table_header=False)
+    collapsed = []
+
+    def write_chunk(nodes):
+        writer = writers.writer(output_format)
+        html.write(writer, nodes)
+        chunk = results.Result(writer.as_string(), messages[:])
+        del messages[:]
+        return chunk
+
+    for children_result in children_results:
+        messages.extend(children_result.messages)
+        nodes = converter._visit_all(children_result.value, context)
+        html.strip_empty_and_collapse_onto(collapsed, nodes)
+
+        pending = collapsed[-1:]
+        complete = collapsed[:-1]
+        collapsed = pending
+
+        if complete or messages:
+            yield write_chunk(complete)
+
+    html.strip_empty_and_collapse_onto(collapsed, converter._visit_referents(document, context))
+    yield write_chunk(collapsed)
+
 
+def _create_converter(messages, comments, style_map, convert_image, id_prefix, ignore_empty_paragraphs, run_wrappings=None):
     if style_map is None:
         style_map = []
 
+    if not isinstance(style_map, CompiledStyleMap):
+        style_map = CompiledStyleMap(style_map, [])
+
     if id_prefix is None:
         id_prefix = ""
 
     if convert_image is None:
-        convert_image = images.data_uri
+        convert_image = images._memoized_data_uri()
 
-    if isinstance(element, documents.Document):
-        comments = dict(
-            (comment.comment_id, comment)
-            for comment in element.comments
-        )
-    else:
-        comments = {}
+    if run_wrappings is None:
+        run_wrappings = _run_wrappings_cache()
 
-    messages = []
-    converter = _DocumentConverter(
+    return _DocumentConverter(
         messages=messages,
         style_map=style_map,
         convert_image=convert_image,
         id_prefix=id_prefix,
         ignore_empty_paragraphs=ignore_empty_paragraphs,
         note_references=[],
-        comments=comments,
+        run_wrappings=run_wrappings,
+        comments=comments if isinstance(comments, documents.Comments) else documents.Comments(comments),
     )
-    context = _ConversionContext(is_table_header=False)
-    nodes = converter.visit(element, context)
-
-    writer = writers.writer(output_format)
-    html.write(writer, html.collapse(html.strip_empty(nodes)))
-    return results.Result(writer.as_string(), messages)
 
 
 @cobble.data
@@ -62,7 +134,7 @@ class _ConversionContext(object):
 
 
 class _DocumentConverter(documents.element_visitor(args=1)):
-    def __init__(self, messages, style_map, convert_image, id_prefix, ignore_empty_paragraphs, note_references, comments):
+    def __init__(self, messages, style_map, convert_image, id_prefix, ignore_empty_paragraphs, note_references, run_wrappings, comments):
         self._messages = messages
         self._style_map = style_map
         self._id_prefix = id_prefix
@@ -71,6 +143,7 @@ class _DocumentConverter(documents.element_visitor(args=1)):
         self._referenced_comments = []
         self._convert_image = convert_image
         self._comments = comments
+        self._run_wrappings = run_wrappings
 
     def visit_image(self, image, context):
         try:
@@ -81,8 +154,11 @@ class _DocumentConverter(documents.element_visitor(args=1)):
 
     def visit_document(self, document, context):
         nodes = self._visit_all(document.children, context)
+        return nodes + self._visit_referents(document, context)
+
+    def _visit_referents(self, document, context):
         notes = [
-            document.notes.resolve(reference)
+            self._read_referent(document.notes.read(reference))
             for reference in self._note_references
         ]
         notes_list = html.element("ol", {}, self._visit_all(notes, context))
@@ -91,7 +167,13 @@ class _DocumentConverter(documents.element_visitor(args=1)):
             for referenced_comment in self._referenced_comments
             for html_node in self.visit_comment(referenced_comment, context)
         ])
-        return nodes + [notes_list, comments]
+        return [notes_list, comments]
+
+    def _read_referent(self, result):
+        # Notes and comments are read when they're first referenced, so any
+        # messages from reading them are added to the conversion's messages.
+        self._messages.extend(result.messages)
+        return result.value
 
 
     def visit_paragraph(self, paragraph, context):
@@ -107,7 +189,26 @@ class _DocumentConverter(documents.element_visitor(args=1)):
 
 
     def visit_run(self, run, context):
-        nodes = lambda: self._visit_all(run.children, context)
+        key = run.properties
+        wrapping = self._run_wrappings.get(key)
+        if wrapping is None:
+            wrapping = self._find_run_wrapping(run)
+            self._run_wrappings[key] = wrapping
+
+        if wrapping.warning is not None:
+            self._messages.append(wrapping.warning)
+
+        if wrapping.includes_children:
+            nodes = self._visit_all(run.children, context)
+        else:
+            nodes = []
+
+        for tag in wrapping.tags:
+            nodes = [html.Element(tag, nodes)]
+
+        return nodes
+
+    def _find_run_wrapping(self, run):
         paths = []
         if run.highlight is not None:
             style = self._find_style(Highlight(color=run.highlight), "highlight")
@@ -129,12 +230,16 @@ class _DocumentConverter(documents.element_visitor(args=1)):
             paths.append(self._find_style_for_run_property("italic", default="em"))
         if run.is_bold:
             paths.append(self._find_style_for_run_property("bold", default="strong"))
-        paths.append(self._find_html_path_for_run(run))
 
-        for path in paths:
-            nodes = partial(path.wrap, nodes)
+        style = self._find_style(run, "run")
+        if style is None:
+            paths.append(html_paths.empty)
+            warning = self._unrecognised_style_warning(run, "run")
+        else:
+            paths.append(style.html_path)
+            warning = None
 
-        return nodes()
+        return _RunWrapping(paths, warning)
 
 
     def _find_style_for_run_property(self, element_type, default=None):
@@ -275,7 +380,7 @@ class _DocumentConverter(documents.element_visitor(args=1)):
 
     def visit_comment_reference(self, reference, context):
         def nodes():
-            comment = self._comments[reference.comment_id]
+            comment = self._read_referent(self._comments.read(reference.comment_id))
             count = len(self._referenced_comments) + 1
             label = "[{0}{1}]".format(_comment_author_label(comment), count)
             self._referenced_comments.append((label, comment))
@@ -328,28 +433,30 @@ class _DocumentConverter(documents.element_visitor(args=1)):
         default = html_paths.path([html_paths.element("p", fresh=True)])
         return self._find_html_path(paragraph, "paragraph", default, warn_unrecognised=True)
 
-    def _find_html_path_for_run(self, run):
-        return self._find_html_path(run, "run", default=html_paths.empty, warn_unrecognised=True)
-
 
     def _find_html_path(self, element, element_type, default, warn_unrecognised=False):
         style = self._find_style(element, element_type)
         if style is not None:
             return style.html_path
 
-        if warn_unrecognised and getattr(element, "style_id", None) is not None:
-            self._messages.append(results.warning(
-                "Unrecognised {0} style: {1} (Style ID: {2})".format(
-                    element_type, element.style_name, element.style_id)
-            ))
+        if warn_unrecognised:
+            warning = self._unrecognised_style_warning(element, element_type)
+            if warning is not None:
+                self._messages.append(warning)
 
         return default
 
+    def _unrecognised_style_warning(self, element, element_type):
+        if getattr(element, "style_id", None) is None:
+            return None
+        else:
+            return results.warning(
+                "Unrecognised {0} style: {1} (Style ID: {2})".format(
+                    element_type, element.style_name, element.style_id)
+            )
+
     def _find_style(self, element, element_type):
-        for style in self._style_map:
-            document_matcher = style.document_matcher
-            if _document_matcher_matches(document_matcher, element, element_type):
-                return style
+        return self._style_map.find_style(element, element_type)
 
     def _note_html_id(self, note):
         return self._referent_html_id(note.note_type, note.note_id)
@@ -367,40 +474,38 @@ class _DocumentConverter(documents.element_visitor(args=1)):
         return "{0}{1}".format(self._id_prefix, suffix)
 
 
+_max_run_wrappings = 4096
+
+
+def _run_wrappings_cache():
+    return LruCache(_max_run_wrappings)
+
+
+class _RunWrapping(object):
+    def __init__(self, paths, warning):
+        includes_children = True
+        tags = []
+        for path in paths:
+            if path is html_paths.ignore:
+                # Ignored paths discard the nodes they wrap, so only the
+                # paths outside of the ignored path contribute elements.
+                includes_children = False
+                tags = []
+            elif isinstance(path, html_paths.HtmlPath):
+                tags.extend(element.tag for element in reversed(path.elements))
+            else:
+                tags.append(path.tag)
+
+        self.includes_children = includes_children
+        self.tags = tags
+        self.warning = warning
+
+
 @cobble.data
 class Highlight:
     color = cobble.field()
 
 
-def _document_matcher_matches(matcher, element, element_type):
-    if matcher.element_type in ["underline", "strikethrough", "all_caps", "small_caps", "bold", "italic", "comment_reference"]:
-        return matcher.element_type == element_type
-    elif matcher.element_type == "highlight":
-        return (
-            matcher.element_type == element_type and
-            (matcher.color is None or matcher.color == element.color)
-        )
-    elif matcher.element_type == "break":
-        return (
-            matcher.element_type == element_type and
-            matcher.break_type == element.break_type
-        )
-    else: # matcher.element_type in ["paragraph", "run"]:
-        return (
-            matcher.element_type == element_type and (
-                matcher.style_id is None or
-                matcher.style_id == element.style_id
-            ) and (
-                matcher.style_name is None or
-                element.style_name is not None and (matcher.style_name.matches(element.style_name))
-            ) and (
-                element_type != "paragraph" or
-                matcher.numbering is None or
-                matcher.numbering == element.numbering
-            )
-        )
-
-
 def _comment_author_label(comment):
     return comment.author_initials or ""
 
@@ -1,22 +1,48 @@
+import collections
+import collections.abc
+import operator
+
 import cobble
 
+from . import results
+from .caches import LruCache
+
+
+# cobble finds fields using class attributes, which can't have the same
+# names as slots, so the slots are declared by a subclass.
+def _slots(cls):
+    return type(cls.__name__, (cls, ), {
+        "__slots__": tuple(name for name, field in cls._cobble_fields),
+        "__module__": cls.__module__,
+    })
+
 
 class Element(object):
+    __slots__ = ()
+
     def copy(self, **kwargs):
         return cobble.copy(self, **kwargs)
 
 
 class HasChildren(Element):
+    __slots__ = ()
+
     children = cobble.field()
 
 
+@_slots
 @cobble.data
 class Document(HasChildren):
+    __slots__ = ()
+
     notes = cobble.field()
     comments = cobble.field()
 
+@_slots
 @cobble.data
 class Paragraph(HasChildren):
+    __slots__ = ()
+
     style_id = cobble.field()
     style_name = cobble.field()
     numbering = cobble.field()
@@ -24,69 +50,181 @@ class Paragraph(HasChildren):
     indent = cobble.field()
 
 
+@_slots
 @cobble.data
 class ParagraphIndent(object):
+    __slots__ = ()
+
     start = cobble.field()
     end = cobble.field()
     first_line = cobble.field()
     hanging = cobble.field()
 
 
+@_slots
 @cobble.data
 class Indent(object):
+    __slots__ = ()
+
     left = cobble.field()
     right = cobble.field()
     first_line = cobble.field()
     hanging = cobble.field()
 
 
-@cobble.data
+RunProperties = collections.namedtuple("RunProperties", [
+    "style_id",
+    "style_name",
+    "is_bold",
+    "is_italic",
+    "is_underline",
+    "is_strikethrough",
+    "is_all_caps",
+    "is_small_caps",
+    "vertical_alignment",
+    "font",
+    "font_size",
+    "highlight",
+])
+
+
+@cobble.visitable
 class Run(HasChildren):
-    style_id = cobble.field()
-    style_name = cobble.field()
-    is_bold = cobble.field()
-    is_italic = cobble.field()
-    is_underline = cobble.field()
-    is_strikethrough = cobble.field()
-    is_all_caps = cobble.field()
-    is_small_caps = cobble.field()
-    vertical_alignment = cobble.field()
-    font = cobble.field()
-    font_size = cobble.field()
-    highlight = cobble.field()
+    __slots__ = ("children", "properties")
+
+    def __init__(
+        self,
+        children,
+        style_id,
+        style_name,
+        is_bold,
+        is_italic,
+        is_underline,
+        is_strikethrough,
+        is_all_caps,
+        is_small_caps,
+        vertical_alignment,
+        font,
+        font_size,
+        highlight,
+    ):
+        self.children = children
+        self.properties = _intern_run_properties(RunProperties(
+            style_id=style_id,
+            style_name=style_name,
+            is_bold=is_bold,
+            is_italic=is_italic,
+            is_underline=is_underline,
+            is_strikethrough=is_strikethrough,
+            is_all_caps=is_all_caps,
+            is_small_caps=is_small_caps,
+            vertical_alignment=vertical_alignment,
+            font=font,
+            font_size=font_size,
+            highlight=highlight,
+        ))
+
+    def copy(self, **kwargs):
+        fields = self.properties._asdict()
+        fields["children"] = self.children
+        fields.update(kwargs)
+        return Run(**fields)
 
+    def __eq__(self, other):
+        return (
+            isinstance(other, Run) and
+            self.children == other.children and
+            self.properties == other.properties
+        )
+
+    def __ne__(self, other):
+        return not (self == other)
+
+    def __hash__(self):
+        return hash((Run, self.children, self.properties))
+
+    def __repr__(self):
+        return "Run(children={0!r}, {1})".format(
+            self.children,
+            ", ".join(
+                "{0}={1!r}".format(name, value)
+                for name, value in zip(RunProperties._fields, self.properties)
+            ),
+        )
+
+
+for _name in RunProperties._fields:
+    setattr(Run, _name, property(operator.attrgetter("properties." + _name)))
+
+
+_max_interned_run_properties = 4096
+_interned_run_properties = LruCache(_max_interned_run_properties)
+
+
+def _intern_run_properties(properties):
+    try:
+        interned = _interned_run_properties.get(properties)
+        if interned is None:
+            interned = _interned_run_properties[properties] = properties
+        return interned
+    except TypeError:
+        # Properties with unhashable values can't be interned
+        return properties
+
+
+@_slots
 @cobble.data
 class Text(Element):
+    __slots__ = ()
+
     value = cobble.field()
 
+@_slots
 @cobble.data
 class Hyperlink(HasChildren):
+    __slots__ = ()
+
     href = cobble.field()
     anchor = cobble.field()
     target_frame = cobble.field()
 
+@_slots
 @cobble.data
 class Checkbox(Element):
+    __slots__ = ()
+
     checked = cobble.field()
 
 checkbox = Checkbox
 
+@_slots
 @cobble.data
 class Table(HasChildren):
+    __slots__ = ()
+
     style_id = cobble.field()
     style_name = cobble.field()
 
+@_slots
 @cobble.data
 class TableRow(HasChildren):
+    __slots__ = ()
+
     is_header = cobble.field()
 
+@_slots
 @cobble.data
 class TableCell(HasChildren):
+    __slots__ = ()
+
     colspan = cobble.field()
     rowspan = cobble.field()
 
+@_slots
 @cobble.data
 class TableCellUnmerged:
+    __slots__ = ()
+
     children = cobble.field()
     colspan = cobble.field()
     rowspan = cobble.field()
@@ -98,8 +236,11 @@ class TableCellUnmerged:
     def copy(self, **kwargs):
         return cobble.copy(self, **kwargs)
 
+@_slots
 @cobble.data
 class Break(Element):
+    __slots__ = ()
+
     break_type = cobble.field()
 
 line_break = Break("line")
@@ -107,23 +248,31 @@ page_break = Break("page")
 column_break = Break("column")
 
 
+@_slots
 @cobble.data
 class Tab(Element):
-    pass
+    __slots__ = ()
 
 
+@_slots
 @cobble.data
 class Image(Element):
+    __slots__ = ()
+
     alt_text = cobble.field()
     content_type = cobble.field()
     open = cobble.field()
+    # True if the image is stored in the document, rather than linked
+    is_embedded = cobble.field(default=None)
 
 
 def document(children, notes=None, comments=None):
     if notes is None:
         notes = Notes({})
     if comments is None:
-        comments = []
+        comments = Comments([])
+    elif not isinstance(comments, Comments):
+        comments = Comments(comments)
     return Document(children, notes, comments=comments)
 
 def paragraph(children, style_id=None, style_name=None, numbering=None, alignment=None, indent=None):
@@ -187,8 +336,11 @@ def hyperlink(children, href=None, anchor=None, target_frame=None):
     return Hyperlink(href=href, anchor=anchor, target_frame=target_frame, children=children)
 
 
+@_slots
 @cobble.data
 class Bookmark(Element):
+    __slots__ = ()
+
     name = cobble.field()
 
 bookmark = Bookmark
@@ -213,13 +365,19 @@ def table_cell_unmerged(children, colspan, rowspan, vmerge):
 def numbering_level(level_index, is_ordered):
     return _NumberingLevel(str(level_index), bool(is_ordered))
 
+@_slots
 @cobble.data
 class _NumberingLevel(object):
+    __slots__ = ()
+
     level_index = cobble.field()
     is_ordered = cobble.field()
 
+@_slots
 @cobble.data
 class Note(Element):
+    __slots__ = ()
+
     note_type = cobble.field()
     note_id = cobble.field()
     body = cobble.field()
@@ -238,12 +396,21 @@ class Notes(object):
     def resolve(self, reference):
         return self.find_note(reference.note_type, reference.note_id)
 
+    def read(self, reference):
+        return results.success(self.resolve(reference))
+
+    def __iter__(self):
+        return iter(self._notes.values())
+
     def __eq__(self, other):
-        return isinstance(other, Notes) and self._notes == other._notes
+        return isinstance(other, Notes) and dict(self._items()) == dict(other._items())
 
     def __ne__(self, other):
         return not (self == other)
 
+    def _items(self):
+        return self._notes.items()
+
 def notes(notes_list):
     return Notes(dict(
         (_note_key(note), note)
@@ -253,21 +420,79 @@ def notes(notes_list):
 def _note_key(note):
     return (note.note_type, note.note_id)
 
+@_slots
 @cobble.data
 class NoteReference(Element):
+    __slots__ = ()
+
     note_type = cobble.field()
     note_id = cobble.field()
 
 note_reference = NoteReference
 
 
+@_slots
 @cobble.data
 class Comment(object):
+    __slots__ = ()
+
     comment_id = cobble.field()
     body = cobble.field()
     author_name = cobble.field()
     author_initials = cobble.field()
 
+# document.comments used to be a list, so comments can still be indexed,
+# sliced and compared like one.
+class Comments(collections.abc.Sequence):
+    def __init__(self, comments):
+        self._comments = list(comments)
+        self._comments_by_id = dict(
+            (comment.comment_id, comment)
+            for comment in self._comments
+        )
+
+    def find_comment(self, comment_id):
+        return self._comments_by_id[comment_id]
+
+    def read(self, comment_id):
+        return results.success(self.find_comment(comment_id))
+
+    def __getitem__(self, index):
+        return self._comments[index]
+
+    def __iter__(self):
+        return iter(self._comments)
+
+    def __len__(self):
+        return len(self._comments)
+
+    def __add__(self, other):
+        return list(self) + list(other)
+
+    def __radd__(self, other):
+        return list(other) + list(self)
+
+    def __eq__(self, other):
+        if isinstance(other, Comments):
+            return list(self) == list(other)
+        elif isinstance(other, list):
+            return list(self) == other
+        else:
+            return False
+
+    def __ne__(self, other):
+        return not (self == other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "Comments({0!r})".format(list(self))
+
+
+def comments(comments_list):
+    return Comments(comments_list)
+
+
 def comment(comment_id, body, author_name=None, author_initials=None):
     return Comment(
         comment_id=comment_id,
@@ -276,8 +501,11 @@ def comment(comment_id, body, author_name=None, author_initials=None):
         author_initials=author_initials,
     )
 
+@_slots
 @cobble.data
 class CommentReference(Element):
+    __slots__ = ()
+
     comment_id = cobble.field()
 
 comment_reference = CommentReference
@@ -1,16 +1,19 @@
+import collections
 from functools import partial
+import hashlib
+import io
 import os
 
 import cobble
 
-from .. import results, lists, zips
-from .document_xml import read_document_xml_element
+from .. import documents, results, zips
+from .document_xml import read_document_xml_body_children
 from .content_types_xml import empty_content_types, read_content_types_xml_element
 from .relationships_xml import read_relationships_xml_element, Relationships
 from .numbering_xml import read_numbering_xml_element, Numbering
 from .styles_xml import read_styles_xml_element, Styles
-from .notes_xml import read_endnotes_xml_element, read_footnotes_xml_element
-from .comments_xml import read_comments_xml_element
+from .notes_xml import read_endnotes_xml_element, read_footnotes_xml_element, find_endnotes_in_xml_index, find_footnotes_in_xml_index, LazyNotes
+from .comments_xml import read_comments_xml_element, find_comments_in_xml_index, LazyComments
 from .files import Files
 from . import body_xml, office_xml
 from ..zips import open_zip
@@ -19,22 +22,93 @@ from ..zips import open_zip
 _empty_result = results.success([])
 
 
-def read(fileobj, external_file_access=False):
-    zip_file = open_zip(fileobj, "r")
-    part_paths = _find_part_paths(zip_file)
-    read_part_with_body = _part_with_body_reader(
+def read(fileobj, external_file_access=False, zip_file=None, executor=None, fetcher=None, part_cache=None):
+    read_referents, children_results = _read_document(
+        fileobj,
+        external_file_access=external_file_access,
+        zip_file=zip_file,
+        executor=executor,
+        fetcher=fetcher,
+        part_cache=part_cache,
+    )
+
+    # Read the main document in this thread while the parts containing notes
+    # and comments are decompressed by the executor.
+    children = []
+    messages = []
+    for children_result in children_results:
+        children.extend(children_result.value)
+        messages.extend(children_result.messages)
+
+    document_result = read_referents()
+    return results.Result(
+        document_result.value.copy(children=children),
+        document_result.messages + messages,
+    )
+
+
+# The first result contains the document without children. Each later
+# result contains the elements read from the next child of w:body.
+def iter_read(fileobj, external_file_access=False, zip_file=None, executor=None, fetcher=None, part_cache=None):
+    read_referents, children_results = _read_document(
+        fileobj,
+        external_file_access=external_file_access,
+        zip_file=zip_file,
+        executor=executor,
+        fetcher=fetcher,
+        part_cache=part_cache,
+    )
+
+    yield read_referents()
+
+    for children_result in children_results:
+        yield children_result
+
+
+def _read_document(fileobj, external_file_access, zip_file, executor, fetcher, part_cache):
+    if zip_file is None:
+        zip_file = open_zip(fileobj, "r")
+    if executor is None:
+        executor = _synchronous_executor
+    part_paths = _find_part_paths(zip_file, part_cache=part_cache)
+    create_body_reader = _body_reader_factory(
         getattr(fileobj, "name", None),
         zip_file,
         part_paths=part_paths,
         external_file_access=external_file_access,
+        executor=executor,
+        fetcher=fetcher,
+        part_cache=part_cache,
     )
+    read_referents = _read_referents(zip_file, create_body_reader, part_paths, executor)
+
+    def read_children():
+        body_reader = create_body_reader(part_paths.main_document)
+        with zip_file.open(part_paths.main_document) as document_fileobj:
+            for children_result in read_document_xml_body_children(_read_body_children(document_fileobj), body_reader):
+                yield children_result
+
+    return read_referents, read_children()
 
-    return results.combine([
-        _read_notes(read_part_with_body, part_paths),
-        _read_comments(read_part_with_body, part_paths),
-    ]).bind(lambda referents:
-        _read_document(zip_file, read_part_with_body, notes=referents[0], comments=referents[1], part_paths=part_paths)
-    )
+
+class _SynchronousExecutor(object):
+    def submit(self, func, *args, **kwargs):
+        return _CompletedFuture(func(*args, **kwargs))
+
+
+class _CompletedFuture(object):
+    def __init__(self, value):
+        self._value = value
+
+    def result(self):
+        return self._value
+
+
+_synchronous_executor = _SynchronousExecutor()
+
+
+def _read_body_children(fileobj):
+    return office_xml.read_children(fileobj, ["w:body"])
 
 
 @cobble.data
@@ -47,13 +121,14 @@ class _PartPaths(object):
     styles = cobble.field()
 
 
-def _find_part_paths(zip_file):
-    package_relationships = _read_relationships(zip_file, "_rels/.rels")
+def _find_part_paths(zip_file, part_cache=None):
+    package_relationships = _read_relationships(zip_file, "_rels/.rels", part_cache=part_cache)
     document_filename = _find_document_filename(zip_file, package_relationships)
 
     document_relationships = _read_relationships(
         zip_file,
         _find_relationships_path_for(document_filename),
+        part_cache=part_cache,
     )
 
     def find(name):
@@ -101,71 +176,131 @@ def _find_part_path(zip_file, relationships, relationship_type, base_path, fallb
         return valid_targets[0]
 
 
-def _read_notes(read_part_with_body, part_paths):
-    footnotes = read_part_with_body(
-        part_paths.footnotes,
-        lambda root, body_reader: read_footnotes_xml_element(root, body_reader=body_reader),
-        default=_empty_result,
-    )
-    endnotes = read_part_with_body(
-        part_paths.endnotes,
-        lambda root, body_reader: read_endnotes_xml_element(root, body_reader=body_reader),
-        default=_empty_result,
-    )
+def _read_referents(zip_file, create_body_reader, part_paths, executor):
+    # Notes and comments are each read when first found.
+    def read_part(name):
+        if zip_file.exists(name):
+            with zip_file.open(name) as fileobj:
+                return _ReferentsPart(fileobj.read(), create_body_reader(name))
+        else:
+            return None
 
-    return results.combine([footnotes, endnotes]).map(lists.flatten)
+    footnotes = executor.submit(read_part, part_paths.footnotes)
+    endnotes = executor.submit(read_part, part_paths.endnotes)
+    comments = executor.submit(read_part, part_paths.comments)
 
+    def read_referents():
+        footnotes_part = footnotes.result()
+        endnotes_part = endnotes.result()
+        comments_part = comments.result()
 
-def _read_comments(read_part_with_body, part_paths):
-    return read_part_with_body(
-        part_paths.comments,
-        lambda root, body_reader: read_comments_xml_element(root, body_reader=body_reader),
-        default=_empty_result,
-    )
+        def find_notes():
+            notes = _find_referents(footnotes_part, find_footnotes_in_xml_index, read_footnotes_xml_element, _note_key)
+            notes.update(_find_referents(endnotes_part, find_endnotes_in_xml_index, read_endnotes_xml_element, _note_key))
+            return notes
+
+        def find_comments():
+            return _find_referents(comments_part, find_comments_in_xml_index, read_comments_xml_element, _comment_key)
+
+        return results.success(documents.document(
+            [],
+            notes=LazyNotes(find_notes),
+            comments=LazyComments(find_comments),
+        ))
 
+    return read_referents
 
-def _read_document(zip_file, read_part_with_body, notes, comments, part_paths):
-    return read_part_with_body(
-        part_paths.main_document,
-        partial(
-            read_document_xml_element,
-            notes=notes,
-            comments=comments,
-        ),
+
+_ReferentsPart = collections.namedtuple("_ReferentsPart", ["data", "body_reader"])
+
+
+def _find_referents(part, find_in_index, read_element, key):
+    if part is None:
+        return collections.OrderedDict()
+
+    index = office_xml.index_children(part.data)
+    if index is not None:
+        return find_in_index(index, body_reader=part.body_reader)
+
+    # Parts that can't be indexed are read all at once, and any messages are
+    # included when reading each referent.
+    parts_result = read_element(office_xml.read(io.BytesIO(part.data)), body_reader=part.body_reader)
+    return collections.OrderedDict(
+        (key(referent), partial(_referent_result, referent, parts_result.messages))
+        for referent in parts_result.value
     )
 
 
-def _part_with_body_reader(document_path, zip_file, part_paths, external_file_access):
-    content_types = _try_read_entry_or_default(
+def _referent_result(referent, messages):
+    return results.Result(referent, list(messages))
+
+
+def _note_key(note):
+    return (note.note_type, note.note_id)
+
+
+def _comment_key(comment):
+    return comment.comment_id
+
+
+def _body_reader_factory(document_path, zip_file, part_paths, external_file_access, executor, fetcher, part_cache=None):
+    content_types_future = executor.submit(
+        _try_read_cached_entry_or_default,
         zip_file,
         "[Content_Types].xml",
         read_content_types_xml_element,
         empty_content_types,
+        part_cache=part_cache,
     )
 
-    styles = _try_read_entry_or_default(
+    styles_future = executor.submit(
+        _try_read_cached_entry_or_default,
         zip_file,
         part_paths.styles,
         read_styles_xml_element,
         Styles.EMPTY,
+        part_cache=part_cache,
     )
 
-    numbering = _try_read_entry_or_default(
-        zip_file,
-        part_paths.numbering,
-        lambda element: read_numbering_xml_element(element, styles=styles),
-        default=Numbering.EMPTY,
-    )
+    if part_cache is None:
+        # Reading numbering depends on styles, but parsing the XML doesn't.
+        numbering_element_future = executor.submit(
+            _try_read_entry_or_default,
+            zip_file,
+            part_paths.numbering,
+            lambda element: element,
+            default=None,
+        )
+
+    content_types = content_types_future.result()
+    styles = styles_future.result()
+    if part_cache is None:
+        numbering_element = numbering_element_future.result()
+        if numbering_element is None:
+            numbering = Numbering.EMPTY
+        else:
+            numbering = read_numbering_xml_element(numbering_element, styles=styles)
+    else:
+        # Numbering refers to styles, so the styles are part of the key.
+        numbering = _try_read_cached_entry_or_default(
+            zip_file,
+            part_paths.numbering,
+            partial(read_numbering_xml_element, styles=styles),
+            default=Numbering.EMPTY,
+            part_cache=part_cache,
+            key=(read_numbering_xml_element, styles),
+        )
 
     files = Files(
         None if document_path is None else os.path.dirname(document_path),
         external_file_access=external_file_access,
+        fetcher=fetcher,
     )
 
-    def read_part(name, reader, default=_undefined):
-        relationships = _read_relationships(zip_file, _find_relationships_path_for(name))
+    def create_body_reader(name):
+        relationships = _read_relationships(zip_file, _find_relationships_path_for(name), part_cache=part_cache)
 
-        body_reader = body_xml.reader(
+        return body_xml.reader(
             numbering=numbering,
             content_types=content_types,
             relationships=relationships,
@@ -174,13 +309,7 @@ def _part_with_body_reader(document_path, zip_file, part_paths, external_file_ac
             files=files,
         )
 
-        if default is _undefined:
-            return _read_entry(zip_file, name, partial(reader, body_reader=body_reader))
-        else:
-            return _try_read_entry_or_default(zip_file, name, partial(reader, body_reader=body_reader), default=default)
-
-    return read_part
-
+    return create_body_reader
 
 
 def _find_relationships_path_for(name):
@@ -188,12 +317,30 @@ def _find_relationships_path_for(name):
     return zips.join_path(dirname, "_rels", basename + ".rels")
 
 
-def _read_relationships(zip_file, name):
-    return _try_read_entry_or_default(
+def _read_relationships(zip_file, name, part_cache=None):
+    return _try_read_cached_entry_or_default(
         zip_file,
         name,
         read_relationships_xml_element,
         default=Relationships.EMPTY,
+        part_cache=part_cache,
+    )
+
+
+def _try_read_cached_entry_or_default(zip_file, name, reader, default, part_cache, key=None):
+    if part_cache is None:
+        return _try_read_entry_or_default(zip_file, name, reader, default)
+
+    if not zip_file.exists(name):
+        return default
+
+    # The CRC-32 in the zip file isn't used, since a document could copy it
+    # from another document.
+    with zip_file.open(name) as fileobj:
+        data = fileobj.read()
+    return part_cache.read(
+        (reader if key is None else key, hashlib.sha256(data).digest()),
+        lambda: reader(office_xml.read(io.BytesIO(data))),
     )
 
 def _try_read_entry_or_default(zip_file, name, reader, default):
@@ -1,13 +1,13 @@
+import collections
 import contextlib
 import re
 import sys
 
 from .. import documents
 from .. import results
-from .. import lists
 from .. import transforms
+from ..caches import LruCache
 from . import complex_fields
-from .dingbats import dingbats
 from .xmlparser import node_types, XmlElement, null_xml_element
 from .styles_xml import Styles
 from .uris import replace_fragment, uri_to_zip_entry_name
@@ -28,6 +28,10 @@ def reader(
     if styles is None:
         styles = Styles.EMPTY
 
+    properties_caches = {
+        "run": _PropertiesCache(),
+        "paragraph": _PropertiesCache(),
+    }
     read_all = _create_reader(
         numbering=numbering,
         content_types=content_types,
@@ -35,21 +39,28 @@ def reader(
         styles=styles,
         docx_file=docx_file,
         files=files,
+        properties_caches=properties_caches,
     )
-    return _BodyReader(read_all)
+    return _BodyReader(read_all, properties_caches)
 
 
 
 class _BodyReader(object):
-    def __init__(self, read_all):
+    def __init__(self, read_all, properties_caches):
         self._read_all = read_all
+        self._properties_caches = properties_caches
 
     def read_all(self, elements):
-        result = self._read_all(elements)
-        return results.Result(result.elements, result.messages)
+        return self._read_all(elements)
+
+    def properties_cache_info(self):
+        return dict(
+            (name, cache.info())
+            for name, cache in self._properties_caches.items()
+        )
 
 
-def _create_reader(numbering, content_types, relationships, styles, docx_file, files):
+def _create_reader(numbering, content_types, relationships, styles, docx_file, files, properties_caches):
     current_instr_text = []
     complex_field_stack = []
 
@@ -58,6 +69,17 @@ def _create_reader(numbering, content_types, relationships, styles, docx_file, f
     # ECMA-376 4th edition Part 1.
     deleted_paragraph_contents = []
 
+    # Messages are collected in the order that elements are read, rather than
+    # being passed up through every level of the read results.
+    read_messages = []
+
+    def _add_messages(messages):
+        read_messages.extend(messages)
+
+    def _empty_result_with_message(message):
+        read_messages.append(message)
+        return _empty_result
+
     _ignored_elements = set([
         "office-word:wrap",
         "v:shadow",
@@ -83,8 +105,29 @@ def _create_reader(numbering, content_types, relationships, styles, docx_file, f
     def text(element):
         return _success(documents.Text(_inner_text(element)))
 
+    run_properties_cache = properties_caches["run"]
+
     def run(element):
         properties = element.find_child_or_null("w:rPr")
+        style, run_properties = run_properties_cache.get(properties, _read_run_properties)
+        _add_messages(style.messages)
+
+        def add_complex_field_hyperlink(children):
+            hyperlink_kwargs = current_hyperlink_kwargs()
+            if hyperlink_kwargs is None:
+                return children
+            else:
+                return [documents.hyperlink(children=children, **hyperlink_kwargs)]
+
+        return _read_xml_elements(element.children).map(
+            lambda children: documents.run(
+                children=add_complex_field_hyperlink(children),
+                style_id=style.style_id,
+                style_name=style.style_name,
+                **run_properties
+            ))
+
+    def _read_run_properties(properties):
         vertical_alignment = properties \
             .find_child_or_null("w:vertAlign") \
             .attributes.get("w:val")
@@ -97,39 +140,19 @@ def _create_reader(numbering, content_types, relationships, styles, docx_file, f
         else:
             font_size = None
 
-        is_bold = read_boolean_element(properties.find_child("w:b"))
-        is_italic = read_boolean_element(properties.find_child("w:i"))
-        is_underline = read_underline_element(properties.find_child("w:u"))
-        is_strikethrough = read_boolean_element(properties.find_child("w:strike"))
-        is_all_caps = read_boolean_element(properties.find_child("w:caps"))
-        is_small_caps = read_boolean_element(properties.find_child("w:smallCaps"))
-        highlight = read_highlight_value(properties.find_child_or_null("w:highlight").attributes.get("w:val"))
-
-        def add_complex_field_hyperlink(children):
-            hyperlink_kwargs = current_hyperlink_kwargs()
-            if hyperlink_kwargs is None:
-                return children
-            else:
-                return [documents.hyperlink(children=children, **hyperlink_kwargs)]
-
-        return _ReadResult.map_results(
-            _read_run_style(properties),
-            _read_xml_elements(element.children).map(add_complex_field_hyperlink),
-            lambda style, children: documents.run(
-                children=children,
-                style_id=style[0],
-                style_name=style[1],
-                is_bold=is_bold,
-                is_italic=is_italic,
-                is_underline=is_underline,
-                is_strikethrough=is_strikethrough,
-                is_all_caps=is_all_caps,
-                is_small_caps=is_small_caps,
-                vertical_alignment=vertical_alignment,
-                font=font,
-                font_size=font_size,
-                highlight=highlight,
-            ))
+        run_properties = dict(
+            is_bold=read_boolean_element(properties.find_child("w:b")),
+            is_italic=read_boolean_element(properties.find_child("w:i")),
+            is_underline=read_underline_element(properties.find_child("w:u")),
+            is_strikethrough=read_boolean_element(properties.find_child("w:strike")),
+            is_all_caps=read_boolean_element(properties.find_child("w:caps")),
+            is_small_caps=read_boolean_element(properties.find_child("w:smallCaps")),
+            vertical_alignment=vertical_alignment,
+            font=font,
+            font_size=font_size,
+            highlight=read_highlight_value(properties.find_child_or_null("w:highlight").attributes.get("w:val")),
+        )
+        return _read_run_style(properties), run_properties
 
     def _read_run_style(properties):
         return _read_style(properties, "w:rStyle", "Run", styles.find_character_style_by_id)
@@ -152,40 +175,51 @@ def _create_reader(numbering, content_types, relationships, styles, docx_file, f
         else:
             return value
 
+    paragraph_properties_cache = properties_caches["paragraph"]
+
     def paragraph(element):
         properties = element.find_child_or_null("w:pPr")
+        paragraph_properties = paragraph_properties_cache.get(properties, _read_paragraph_properties)
 
-        is_deleted = properties.find_child_or_null("w:rPr").find_child("w:del")
-
-        if is_deleted is not None:
+        if paragraph_properties is None:
             for child in element.children:
                 deleted_paragraph_contents.append(child)
             return _empty_result
 
         else:
-            alignment = properties.find_child_or_null("w:jc").attributes.get("w:val")
-            indent = _read_paragraph_indent(properties.find_child_or_null("w:ind"))
+            style, numbering_level, alignment, indent = paragraph_properties
+            _add_messages(style.messages)
 
             children_xml = element.children
             if deleted_paragraph_contents:
                 children_xml = deleted_paragraph_contents + children_xml
                 del deleted_paragraph_contents[:]
 
-            return _ReadResult.map_results(
-                _read_paragraph_style(properties),
-                _read_xml_elements(children_xml),
-                lambda style, children: documents.paragraph(
+            return _read_xml_elements(children_xml).map(
+                lambda children: documents.paragraph(
                     children=children,
-                    style_id=style[0],
-                    style_name=style[1],
-                    numbering=_read_numbering_properties(
-                        paragraph_style_id=style[0],
-                        element=properties.find_child_or_null("w:numPr"),
-                    ),
+                    style_id=style.style_id,
+                    style_name=style.style_name,
+                    numbering=numbering_level,
                     alignment=alignment,
                     indent=indent,
                 )).append_extra()
 
+    def _read_paragraph_properties(properties):
+        # Deleted paragraphs are represented by None
+        is_deleted = properties.find_child_or_null("w:rPr").find_child("w:del")
+        if is_deleted is not None:
+            return None
+
+        style = _read_paragraph_style(properties)
+        numbering_level = _read_numbering_properties(
+            paragraph_style_id=style.style_id,
+            element=properties.find_child_or_null("w:numPr"),
+        )
+        alignment = properties.find_child_or_null("w:jc").attributes.get("w:val")
+        indent = _read_paragraph_indent(properties.find_child_or_null("w:ind"))
+        return style, numbering_level, alignment, indent
+
     def _read_paragraph_style(properties):
         return _read_style(properties, "w:pStyle", "Paragraph", styles.find_paragraph_style_by_id)
 
@@ -278,7 +312,7 @@ def _create_reader(numbering, content_types, relationships, styles, docx_file, f
             else:
                 style_name = style.name
 
-        return _ReadResult([style_id, style_name], [], messages)
+        return _Style(style_id, style_name, messages)
 
     def _undefined_style_warning(style_type, style_id):
         return results.warning("{0} style with ID {1} was referenced but not defined in the document".format(style_type, style_id))
@@ -324,6 +358,9 @@ def _create_reader(numbering, content_types, relationships, styles, docx_file, f
 
     def symbol(element):
         # See 17.3.3.30 sym (Symbol Character) of ECMA-376 4th edition Part 1
+        # The dingbats table is large, so only import it when it's needed.
+        from .dingbats import dingbats
+
         font = element.attributes.get("w:font")
         char = element.attributes.get("w:char")
 
@@ -344,17 +381,15 @@ def _create_reader(numbering, content_types, relationships, styles, docx_file, f
 
     def table(element):
         properties = element.find_child_or_null("w:tblPr")
-        return _ReadResult.map_results(
-            read_table_style(properties),
-            _read_xml_elements(element.children)
-                .flat_map(calculate_row_spans),
-
-            lambda style, children: documents.table(
+        style = read_table_style(properties)
+        _add_messages(style.messages)
+        return _read_xml_elements(element.children) \
+            .flat_map(calculate_row_spans) \
+            .map(lambda children: documents.table(
                 children=children,
-                style_id=style[0],
-                style_name=style[1],
-            ),
-        )
+                style_id=style.style_id,
+                style_name=style.style_name,
+            ))
 
 
     def read_table_style(properties):
@@ -412,9 +447,10 @@ def _create_reader(numbering, content_types, relationships, styles, docx_file, f
         )
         if unexpected_non_rows:
             rows = remove_unmerged_table_cells(rows)
-            return _elements_result_with_messages(rows, [results.warning(
+            read_messages.append(results.warning(
                 "unexpected non-row element in table, cell merging may be incorrect"
-            )])
+            ))
+            return _success(rows)
 
         unexpected_non_cells = any(
             not isinstance(cell, documents.TableCellUnmerged)
@@ -423,9 +459,10 @@ def _create_reader(numbering, content_types, relationships, styles, docx_file, f
         )
         if unexpected_non_cells:
             rows = remove_unmerged_table_cells(rows)
-            return _elements_result_with_messages(rows, [results.warning(
+            read_messages.append(results.warning(
                 "unexpected non-cell element in table row, cell merging may be incorrect"
-            )])
+            ))
+            return _success(rows)
 
         columns = {}
         for row in rows:
@@ -545,7 +582,7 @@ def _create_reader(numbering, content_types, relationships, styles, docx_file, f
         return _read_blips(blips, alt_text=alt_text, href=href)
 
     def _read_blips(blips, alt_text, href):
-        return _ReadResult.concat(lists.map(lambda blip: _read_blip(blip, alt_text=alt_text, href=href), blips))
+        return _ReadResult.concat([_read_blip(blip, alt_text=alt_text, href=href) for blip in blips])
 
     def _read_blip(element, alt_text, href):
         blip_image = _find_blip_image(element)
@@ -564,16 +601,19 @@ def _create_reader(numbering, content_types, relationships, styles, docx_file, f
             ))
 
     def _read_image(image_file, alt_text):
-        image_path, open_image = image_file
+        image_path, open_image, is_embedded = image_file
         content_type = content_types.find_content_type(image_path)
-        image = documents.image(alt_text=alt_text, content_type=content_type, open=open_image)
+        image = documents.image(
+            alt_text=alt_text,
+            content_type=content_type,
+            open=open_image,
+            is_embedded=is_embedded,
+        )
 
-        if content_type in ["image/png", "image/gif", "image/jpeg", "image/svg+xml", "image/tiff"]:
-            messages = []
-        else:
-            messages = [results.warning("Image of type {0} is unlikely to display in web browsers".format(content_type))]
+        if content_type not in ["image/png", "image/gif", "image/jpeg", "image/svg+xml", "image/tiff"]:
+            read_messages.append(results.warning("Image of type {0} is unlikely to display in web browsers".format(content_type)))
 
-        return _element_result_with_messages(image, messages)
+        return _success(image)
 
     def _find_blip_image(element):
         embed_relationship_id = element.attributes.get("r:embed")
@@ -596,7 +636,7 @@ def _create_reader(numbering, content_types, relationships, styles, docx_file, f
             else:
                 return contextlib.closing(image_file)
 
-        return image_path, open_image
+        return image_path, open_image, True
 
 
     def _find_linked_image(relationship_id):
@@ -605,7 +645,7 @@ def _create_reader(numbering, content_types, relationships, styles, docx_file, f
         def open_image():
             return files.open(image_path)
 
-        return image_path, open_image
+        return image_path, open_image, False
 
     def read_imagedata(element):
         relationship_id = element.attributes.get("r:id")
@@ -723,10 +763,24 @@ def _create_reader(numbering, content_types, relationships, styles, docx_file, f
 
 
     def _read_xml_elements(nodes):
-        elements = filter(lambda node: isinstance(node, XmlElement), nodes)
-        return _ReadResult.concat(lists.map(read, elements))
-
-    return _read_xml_elements
+        elements = []
+        extra = []
+        for node in nodes:
+            if isinstance(node, XmlElement):
+                result = read(node)
+                elements.extend(result.elements)
+                if result.extra:
+                    extra.extend(result.extra)
+        return _ReadResult(elements, extra)
+
+    def read_all(nodes):
+        try:
+            result = _read_xml_elements(nodes)
+            return results.Result(result.elements, read_messages[:])
+        finally:
+            del read_messages[:]
+
+    return read_all
 
 
 def _inner_text(node):
@@ -737,65 +791,91 @@ def _inner_text(node):
 
 
 
-class _ReadResult(object):
-    @staticmethod
-    def concat(results):
-        return _ReadResult(
-            lists.flat_map(lambda result: result.elements, results),
-            lists.flat_map(lambda result: result.extra, results),
-            lists.flat_map(lambda result: result.messages, results))
+# Cached values are shared, so must not be modified.
+class _PropertiesCache(object):
+    def __init__(self, max_size=4096):
+        self._values = LruCache(max_size)
+        self.hits = 0
+        self.misses = 0
 
+    def get(self, element, read):
+        key = _fingerprint(element)
+        value = self._values.get(key, _missing)
+        if value is _missing:
+            self.misses += 1
+            value = read(element)
+            self._values[key] = value
+        else:
+            self.hits += 1
+        return value
 
-    @staticmethod
-    def map_results(first, second, func):
-        return _ReadResult(
-            [func(first.elements, second.elements)],
-            first.extra + second.extra,
-            first.messages + second.messages)
+    def info(self):
+        return _CacheInfo(hits=self.hits, misses=self.misses, currsize=len(self._values))
+
+
+_CacheInfo = collections.namedtuple("_CacheInfo", ["hits", "misses", "currsize"])
 
-    def __init__(self, elements, extra, messages):
+_missing = object()
+
+
+def _fingerprint(node):
+    if node is null_xml_element:
+        return None
+    elif isinstance(node, XmlElement):
+        return (
+            node.name,
+            tuple(node.attributes.items()),
+            tuple(_fingerprint(child) for child in node.children),
+        )
+    else:
+        return node.value
+
+
+_Style = collections.namedtuple("_Style", ["style_id", "style_name", "messages"])
+
+
+class _ReadResult(object):
+    __slots__ = ("elements", "extra")
+
+    @staticmethod
+    def concat(results):
+        elements = []
+        extra = []
+        for result in results:
+            elements.extend(result.elements)
+            if result.extra:
+                extra.extend(result.extra)
+        return _ReadResult(elements, extra)
+
+    def __init__(self, elements, extra):
         self.elements = elements
         self.extra = extra
-        self.messages = messages
 
     def map(self, func):
         elements = func(self.elements)
         if not isinstance(elements, list):
             elements = [elements]
-        return _ReadResult(
-            elements,
-            self.extra,
-            self.messages)
+        return _ReadResult(elements, self.extra)
 
     def flat_map(self, func):
         result = func(self.elements)
-        return _ReadResult(
-            result.elements,
-            self.extra + result.extra,
-            self.messages + result.messages)
-
+        return _ReadResult(result.elements, _concat(self.extra, result.extra))
 
     def to_extra(self):
-        return _ReadResult([], _concat(self.extra, self.elements), self.messages)
+        return _ReadResult([], _concat(self.extra, self.elements))
 
     def append_extra(self):
-        return _ReadResult(_concat(self.elements, self.extra), [], self.messages)
+        if self.extra:
+            return _ReadResult(_concat(self.elements, self.extra), [])
+        else:
+            return self
 
 def _success(elements):
     if not isinstance(elements, list):
         elements = [elements]
-    return _ReadResult(elements, [], [])
-
-def _element_result_with_messages(element, messages):
-    return _elements_result_with_messages([element], messages)
-
-def _elements_result_with_messages(elements, messages):
-    return _ReadResult(elements, [], messages)
-
-_empty_result = _ReadResult([], [], [])
+    return _ReadResult(elements, [])
 
-def _empty_result_with_message(message):
-    return _ReadResult([], [], [message])
+_empty_result = _ReadResult([], [])
 
 def _concat(*values):
     result = []
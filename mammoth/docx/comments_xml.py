@@ -1,6 +1,9 @@
+import collections
+
 from .. import lists
 from .. import documents
 from .. import results
+from . import office_xml
 
 
 def read_comments_xml_element(element, body_reader):
@@ -10,15 +13,67 @@ def read_comments_xml_element(element, body_reader):
 
 
     def _read_comment_element(element):
-        def read_optional_attribute(name):
-            return element.attributes.get(name, "").strip() or None
-
-        return body_reader.read_all(element.children).map(lambda body:
-            documents.comment(
-                comment_id=element.attributes["w:id"],
-                body=body,
-                author_name=read_optional_attribute("w:author"),
-                author_initials=read_optional_attribute("w:initials"),
-            ))
+        return _read_comment(element, body_reader)
 
     return read_comments_xml_element(element)
+
+
+def find_comments_in_xml_index(index, body_reader):
+    def reader(position):
+        def read():
+            return _read_comment(office_xml.read_indexed_child(index, position), body_reader)
+
+        return read
+
+    return collections.OrderedDict(
+        (element.attributes["w:id"], reader(position))
+        for position, element in enumerate(index.children)
+        if element.name == "w:comment"
+    )
+
+
+def _read_comment(element, body_reader):
+    def read_optional_attribute(name):
+        return element.attributes.get(name, "").strip() or None
+
+    return body_reader.read_all(element.children).map(lambda body:
+        documents.comment(
+            comment_id=element.attributes["w:id"],
+            body=body,
+            author_name=read_optional_attribute("w:author"),
+            author_initials=read_optional_attribute("w:initials"),
+        ))
+
+
+class LazyComments(documents.Comments):
+    def __init__(self, find_comments):
+        self._find_comments = find_comments
+        self._comment_readers = None
+        self._comment_results = {}
+
+    def find_comment(self, comment_id):
+        return self.read(comment_id).value
+
+    def read(self, comment_id):
+        result = self._comment_results.get(comment_id)
+        if result is None:
+            result = self._comment_results[comment_id] = self._readers()[comment_id]()
+        return result
+
+    def __getitem__(self, index):
+        comment_ids = list(self._readers())
+        if isinstance(index, slice):
+            return [self.find_comment(comment_id) for comment_id in comment_ids[index]]
+        else:
+            return self.find_comment(comment_ids[index])
+
+    def __iter__(self):
+        return (self.find_comment(comment_id) for comment_id in self._readers())
+
+    def __len__(self):
+        return len(self._readers())
+
+    def _readers(self):
+        if self._comment_readers is None:
+            self._comment_readers = self._find_comments()
+        return self._comment_readers
@@ -23,3 +23,16 @@ def read_document_xml_element(
             notes=documents.notes(notes),
             comments=comments
         ))
+
+
+def read_document_xml_body_children(events, body_reader):
+    has_body_element = False
+
+    for event, node in events:
+        if event == "start":
+            has_body_element = True
+        else:
+            yield body_reader.read_all([node])
+
+    if not has_body_element:
+        raise ValueError("Could not find the body element: are you sure this is a docx file?")
@@ -1,9 +1,5 @@
 import os
 import contextlib
-try:
-    from urllib2 import urlopen
-except ImportError:
-    from urllib.request import urlopen
 try:
     from urllib.parse import urlparse
 except ImportError:
@@ -11,9 +7,10 @@ except ImportError:
 
 
 class Files(object):
-    def __init__(self, base, external_file_access):
+    def __init__(self, base, external_file_access, fetcher=None):
         self._base = base
         self._external_file_access = external_file_access
+        self._fetcher = fetcher
 
     def open(self, uri):
         if not self._external_file_access:
@@ -23,7 +20,10 @@ class Files(object):
 
         try:
             if _is_absolute(uri):
-                return contextlib.closing(urlopen(uri))
+                if self._fetcher is None:
+                    return contextlib.closing(_urlopen(uri))
+                else:
+                    return self._fetcher.open(uri)
             elif self._base is not None:
                 return open(os.path.join(self._base, uri), "rb")
             else:
@@ -34,6 +34,19 @@ class Files(object):
             raise InvalidFileReferenceError(message)
 
 
+def _urlopen(uri, timeout=None):
+    # urllib.request is slow to import, and is rarely needed
+    try:
+        from urllib2 import urlopen
+    except ImportError:
+        from urllib.request import urlopen
+
+    if timeout is None:
+        return urlopen(uri)
+    else:
+        return urlopen(uri, timeout=timeout)
+
+
 def _is_absolute(url):
     return urlparse(url).scheme != ""
 
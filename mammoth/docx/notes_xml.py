@@ -3,6 +3,7 @@ import functools
 from .. import lists
 from .. import documents
 from .. import results
+from . import office_xml
 
 
 def _read_notes(note_type, element, body_reader):
@@ -14,19 +15,70 @@ def _read_notes(note_type, element, body_reader):
         return results.combine(lists.map(_read_note_element, note_elements))
 
 
-    def _is_note_element(element):
-        return element.attributes.get("w:type") not in ["continuationSeparator", "separator"]
-
-
     def _read_note_element(element):
-        return body_reader.read_all(element.children).map(lambda body: 
-            documents.note(
-                note_type=note_type,
-                note_id=element.attributes["w:id"],
-                body=body
-            ))
+        return _read_note(note_type, element, body_reader)
     
     return read_notes_xml_element(element)
 
 read_footnotes_xml_element = functools.partial(_read_notes, "footnote")
 read_endnotes_xml_element = functools.partial(_read_notes, "endnote")
+
+
+def _find_notes(note_type, index, body_reader):
+    def reader(position):
+        def read():
+            return _read_note(note_type, office_xml.read_indexed_child(index, position), body_reader)
+
+        return read
+
+    return dict(
+        ((note_type, element.attributes["w:id"]), reader(position))
+        for position, element in enumerate(index.children)
+        if element.name == "w:" + note_type and _is_note_element(element)
+    )
+
+find_footnotes_in_xml_index = functools.partial(_find_notes, "footnote")
+find_endnotes_in_xml_index = functools.partial(_find_notes, "endnote")
+
+
+def _is_note_element(element):
+    return element.attributes.get("w:type") not in ["continuationSeparator", "separator"]
+
+
+def _read_note(note_type, element, body_reader):
+    return body_reader.read_all(element.children).map(lambda body: 
+        documents.note(
+            note_type=note_type,
+            note_id=element.attributes["w:id"],
+            body=body
+        ))
+
+
+class LazyNotes(documents.Notes):
+    def __init__(self, find_notes):
+        self._find_notes = find_notes
+        self._note_readers = None
+        self._note_results = {}
+
+    def find_note(self, note_type, note_id):
+        return self._read((note_type, note_id)).value
+
+    def read(self, reference):
+        return self._read((reference.note_type, reference.note_id))
+
+    def __iter__(self):
+        return (self._read(key).value for key in self._readers())
+
+    def _items(self):
+        return ((key, self._read(key).value) for key in self._readers())
+
+    def _read(self, key):
+        result = self._note_results.get(key)
+        if result is None:
+            result = self._note_results[key] = self._readers()[key]()
+        return result
+
+    def _readers(self):
+        if self._note_readers is None:
+            self._note_readers = self._find_notes()
+        return self._note_readers
@@ -1,5 +1,5 @@
 from ..lists import flat_map
-from .xmlparser import parse_xml, XmlElement
+from .xmlparser import index_xml_children, parse_xml, parse_xml_children, XmlElement
 
 
 _namespaces = [
@@ -34,6 +34,27 @@ def read(fileobj):
     return _collapse_alternate_content(parse_xml(fileobj, _namespaces))[0]
 
 
+def read_children(fileobj, parent_path):
+    for event, node in parse_xml_children(fileobj, parent_path, _namespaces):
+        if event == "child":
+            for collapsed_node in _collapse_alternate_content(node):
+                yield event, collapsed_node
+        else:
+            yield event, node
+
+
+def index_children(data):
+    index = index_xml_children(data, _namespaces)
+    if index is None or any(child.name == "mc:AlternateContent" for child in index.children):
+        return None
+    else:
+        return index
+
+
+def read_indexed_child(index, position):
+    return _collapse_alternate_content(index.parse_child(position))[0]
+
+
 def _collapse_alternate_content(node):
     if isinstance(node, XmlElement):
         if node.name == "mc:AlternateContent":
@@ -9,7 +9,7 @@ _relationships_path = "word/_rels/document.xml.rels"
 _content_types_path = "[Content_Types].xml"
 
 
-def write_style_map(fileobj, style_map):
+def write_style_map(fileobj, style_map, in_place=False):
     with open_zip(fileobj, "r") as zip_file:
         relationships_xml = _generate_relationships_xml(zip_file.read_str(_relationships_path))
         content_types_xml = _generate_content_types_xml(zip_file.read_str(_content_types_path))
@@ -18,7 +18,7 @@ def write_style_map(fileobj, style_map):
         _style_map_path: style_map.encode("utf8"),
         _relationships_path: relationships_xml,
         _content_types_path: content_types_xml,
-    })
+    }, in_place=in_place)
 
 def _generate_relationships_xml(relationships_xml):
     schema = "http://schemas.zwobble.org/mammoth/style-map"
@@ -64,7 +64,11 @@ def _find_child(parent, name, identifying_attribute, attributes):
 
 def read_style_map(fileobj):
     with open_zip(fileobj, "r") as zip_file:
-        if zip_file.exists(_style_map_path):
-            return zip_file.read_str(_style_map_path)
+        return read_zip_style_map(zip_file)
+
+
+def read_zip_style_map(zip_file):
+    if zip_file.exists(_style_map_path):
+        return zip_file.read_str(_style_map_path)
 
 
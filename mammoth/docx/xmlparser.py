@@ -1,28 +1,85 @@
-import xml.dom.minidom
+import io
+import sys
+import xml.parsers.expat
 
-import cobble
 
-
-@cobble.data
 class XmlElement(object):
-    name = cobble.field()
-    attributes = cobble.field()
-    children = cobble.field()
+    __slots__ = ("name", "attributes", "_children", "_children_by_name")
+
+    def __init__(self, name, attributes, children):
+        self.name = name
+        self.attributes = attributes
+        self._children = children
+        self._children_by_name = None
+
+    @property
+    def children(self):
+        return self._children
+
+    @children.setter
+    def children(self, children):
+        self._children = children
+        self._children_by_name = None
 
     def find_child_or_null(self, name):
         return self.find_child(name) or null_xml_element
 
     def find_child(self, name):
-        for child in self.children:
-            if isinstance(child, XmlElement) and child.name == name:
-                return child
-
+        if len(self._children) < _min_indexed_children:
+            for child in self._children:
+                if isinstance(child, XmlElement) and child.name == name:
+                    return child
+        else:
+            children = self._index_children().get(name)
+            if children is not None:
+                return children[0]
 
     def find_children(self, name):
-        return XmlElementList(filter(
-            lambda child: child.node_type == node_types.element and child.name == name,
-            self.children
-        ))
+        if len(self._children) < _min_indexed_children:
+            return XmlElementList([
+                child
+                for child in self._children
+                if isinstance(child, XmlElement) and child.name == name
+            ])
+        else:
+            return XmlElementList(self._index_children().get(name, ()))
+
+    def _index_children(self):
+        # The index is built when first used, and discarded if the children are
+        # replaced.
+        children_by_name = self._children_by_name
+        if children_by_name is None:
+            children_by_name = {}
+            for child in self._children:
+                if isinstance(child, XmlElement):
+                    children_by_name.setdefault(child.name, []).append(child)
+            self._children_by_name = children_by_name
+        return children_by_name
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, XmlElement) and
+            self.name == other.name and
+            self.attributes == other.attributes and
+            self._children == other._children
+        )
+
+    def __ne__(self, other):
+        return not (self == other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "XmlElement(name={0!r}, attributes={1!r}, children={2!r})".format(
+            self.name,
+            self.attributes,
+            self._children,
+        )
+
+
+# Elements with fewer children than this are scanned, since building an index
+# costs more than the few comparisons it would save.
+_min_indexed_children = 8
 
 
 class XmlElementList(object):
@@ -54,9 +111,22 @@ class NullXmlElement(object):
 null_xml_element = NullXmlElement()
 
 
-@cobble.data
 class XmlText(object):
-    value = cobble.field()
+    __slots__ = ("value", )
+
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other):
+        return isinstance(other, XmlText) and self.value == other.value
+
+    def __ne__(self, other):
+        return not (self == other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "XmlText(value={0!r})".format(self.value)
 
 
 def element(name, attributes=None, children=None):
@@ -76,46 +146,278 @@ XmlText.node_type = node_types.text
 
 
 def parse_xml(fileobj, namespace_mapping=None):
-    if namespace_mapping is None:
-        namespace_prefixes = {}
-    else:
-        namespace_prefixes = dict((uri, prefix) for prefix, uri in namespace_mapping)
+    builder = _XmlTreeBuilder(_namespace_prefixes(namespace_mapping))
+    for _ in _parse(fileobj, builder):
+        pass
+    return builder.root
+
+
+# Yields ("start", element) once the element at parent_path is found,
+# then ("child", element) as each of its children is completely parsed.
+def parse_xml_children(fileobj, parent_path, namespace_mapping=None):
+    builder = _XmlTreeBuilder(_namespace_prefixes(namespace_mapping), streamed_path=tuple(parent_path))
+    for event in _parse(fileobj, builder):
+        yield event
 
-    document = xml.dom.minidom.parse(fileobj)
 
-    def convert_node(node):
-        if node.nodeType == xml.dom.Node.ELEMENT_NODE:
-            return convert_element(node)
-        elif node.nodeType == xml.dom.Node.TEXT_NODE:
-            return XmlText(node.nodeValue)
+# Returns None if the children can't be parsed separately, such as when
+# the document is encoded using UTF-16.
+def index_xml_children(data, namespace_mapping=None):
+    if data.startswith(_utf16_boms):
+        return None
+
+    scanner = _ChildScanner(data, _namespace_prefixes(namespace_mapping))
+    parser = xml.parsers.expat.ParserCreate(namespace_separator=" ")
+    parser.ordered_attributes = True
+    scanner.parser = parser
+    parser.StartNamespaceDeclHandler = scanner.start_namespace_declaration
+    parser.StartElementHandler = scanner.start_element
+    parser.EndElementHandler = scanner.end_element
+    parser.Parse(data, True)
+
+    return XmlChildIndex(
+        data,
+        namespace_mapping,
+        root=scanner.root,
+        children=scanner.children,
+        namespace_declarations=scanner.root_namespace_declarations,
+    )
+
+
+_utf16_boms = (b"\xff\xfe", b"\xfe\xff")
+_utf8_bom = b"\xef\xbb\xbf"
+
+
+class XmlChildIndex(object):
+    def __init__(self, data, namespace_mapping, root, children, namespace_declarations):
+        self._data = data
+        self._namespace_mapping = namespace_mapping
+        self._namespace_declarations = namespace_declarations
+        self.root = root
+        self._children = children
+
+    @property
+    def children(self):
+        return [child for child, start, end in self._children]
+
+    def parse_child(self, index):
+        child, start, end = self._children[index]
+        if start is None:
+            # Elements without child elements are fully described by the scan
+            return child
+
+        wrapper = parse_xml(io.BytesIO(b"".join([
+            self._xml_declaration(),
+            b"<mammoth-index",
+            self._namespace_declarations,
+            b">",
+            self._data[start:end],
+            b"</mammoth-index>",
+        ])), self._namespace_mapping)
+        return wrapper.children[0]
+
+    def _xml_declaration(self):
+        # The declaration specifies the encoding of the document, so is
+        # needed to parse the child's bytes correctly.
+        data = self._data
+        offset = len(_utf8_bom) if data.startswith(_utf8_bom) else 0
+        if data.startswith(b"<?xml", offset):
+            return data[:data.index(b"?>", offset) + 2]
         else:
-            return None
+            return b""
+
+
+class _ChildScanner(object):
+    def __init__(self, data, namespace_prefixes):
+        self._data = data
+        self._names = _XmlTreeBuilder(namespace_prefixes)
+        self._depth = 0
+        self._child_start = None
+        self._child_has_elements = False
+        self.parser = None
+        self.root = None
+        self.children = []
+        self._root_namespace_declarations = []
+
+    @property
+    def root_namespace_declarations(self):
+        return b"".join(self._root_namespace_declarations)
+
+    def start_namespace_declaration(self, prefix, uri):
+        if self._depth == 0:
+            name = "xmlns" if prefix is None else "xmlns:" + prefix
+            self._root_namespace_declarations.append(
+                ' {0}="{1}"'.format(name, _escape_attribute_value(uri)).encode("utf-8"),
+            )
+
+    def start_element(self, name, attributes):
+        depth = self._depth
+        self._depth = depth + 1
+        if depth == 0:
+            self.root = self._element(name, attributes)
+        elif depth == 1:
+            self._child_start = self.parser.CurrentByteIndex
+            self._child_has_elements = False
+            self.children.append(self._element(name, attributes))
+        elif depth == 2:
+            self._child_has_elements = True
+
+    def end_element(self, name):
+        self._depth -= 1
+        if self._depth == 1:
+            child = self.children[-1]
+            if self._child_has_elements:
+                # The end tag starts at the current index, and has no
+                # attributes that could contain ">"
+                end = self._data.index(b">", self.parser.CurrentByteIndex) + 1
+                self.children[-1] = (child, self._child_start, end)
+            else:
+                # Text directly inside the element is ignored
+                self.children[-1] = (child, None, None)
 
-    def convert_element(element):
-        converted_name = convert_name(element)
+    def _element(self, name, attributes):
+        converted_name = self._names._convert_name(name)
+        converted_attributes = {}
+        for index in range(0, len(attributes), 2):
+            converted_attributes[self._names._convert_name(attributes[index])] = attributes[index + 1]
+        return XmlElement(converted_name, converted_attributes, [])
 
-        converted_attributes = dict(
-            (convert_name(attribute), attribute.value)
-            for attribute in element.attributes.values()
-            if attribute.namespaceURI != "http://www.w3.org/2000/xmlns/"
-        )
 
-        converted_children = []
-        for child_node in element.childNodes:
-            converted_child_node = convert_node(child_node)
-            if converted_child_node is not None:
-                converted_children.append(converted_child_node)
+def _escape_attribute_value(value):
+    return value.replace("&", "&amp;").replace("<", "&lt;").replace('"', "&quot;")
 
-        return XmlElement(converted_name, converted_attributes, converted_children)
 
-    def convert_name(node):
-        if node.namespaceURI is None:
-            return node.localName
+def _namespace_prefixes(namespace_mapping):
+    if namespace_mapping is None:
+        return {}
+    else:
+        return dict((uri, prefix) for prefix, uri in namespace_mapping)
+
+
+def _parse(fileobj, builder):
+    parser = xml.parsers.expat.ParserCreate(namespace_separator=" ")
+    parser.buffer_text = True
+    parser.ordered_attributes = True
+    parser.StartElementHandler = builder.start_element
+    parser.EndElementHandler = builder.end_element
+    parser.CharacterDataHandler = builder.character_data
+    parser.StartCdataSectionHandler = builder.start_cdata_section
+    parser.EndCdataSectionHandler = builder.end_cdata_section
+    parser.CommentHandler = builder.split_text
+    parser.ProcessingInstructionHandler = builder.split_text
+
+    while True:
+        buffer = fileobj.read(_read_buffer_size)
+        if not buffer:
+            break
+        parser.Parse(buffer, False)
+        for event in builder.pop_events():
+            yield event
+    parser.Parse(b"", True)
+    for event in builder.pop_events():
+        yield event
+
+
+_read_buffer_size = 16 * 1024
+
+_no_attributes = {}
+
+
+class _XmlTreeBuilder(object):
+    # Text handling mirrors xml.dom.minidom: CDATA sections are discarded, and
+    # comments and processing instructions separate adjacent text nodes.
+
+    def __init__(self, namespace_prefixes, streamed_path=None):
+        self._namespace_prefixes = namespace_prefixes
+        self._names = {}
+        self._stack = []
+        self._in_cdata_section = False
+        self._last_text = None
+        self._streamed_path = streamed_path
+        self._streamed_element = None
+        self._events = []
+        self.root = None
+
+    def start_element(self, name, attributes):
+        if attributes:
+            converted_attributes = {}
+            for index in range(0, len(attributes), 2):
+                converted_attributes[self._convert_name(attributes[index])] = attributes[index + 1]
+        else:
+            # Most elements have no attributes, so they share a single empty
+            # dict. Attributes of parsed elements are never modified.
+            converted_attributes = _no_attributes
+
+        element = XmlElement(self._convert_name(name), converted_attributes, [])
+        if not self._stack:
+            self.root = element
+        elif self._stack[-1] is not self._streamed_element:
+            self._stack[-1].children.append(element)
+        self._stack.append(element)
+        self._last_text = None
+
+        if self._streamed_element is None and self._is_streamed_path():
+            self._streamed_element = element
+            self._events.append(("start", element))
+
+    def end_element(self, name):
+        element = self._stack.pop()
+        self._last_text = None
+
+        if self._stack and self._stack[-1] is self._streamed_element:
+            self._events.append(("child", element))
+
+    def pop_events(self):
+        events = self._events
+        self._events = []
+        return events
+
+    def _is_streamed_path(self):
+        streamed_path = self._streamed_path
+        return (
+            streamed_path is not None and
+            len(self._stack) == len(streamed_path) + 1 and
+            all(
+                element.name == name
+                for element, name in zip(self._stack[1:], streamed_path)
+            )
+        )
+
+    def character_data(self, data):
+        if self._in_cdata_section or not self._stack or self._stack[-1] is self._streamed_element:
+            return
+
+        if self._last_text is None:
+            self._last_text = XmlText(data)
+            self._stack[-1].children.append(self._last_text)
         else:
-            prefix = namespace_prefixes.get(node.namespaceURI)
+            self._last_text.value += data
+
+    def start_cdata_section(self):
+        self._in_cdata_section = True
+        self._last_text = None
+
+    def end_cdata_section(self):
+        self._in_cdata_section = False
+
+    def split_text(self, *args):
+        self._last_text = None
+
+    def _convert_name(self, name):
+        converted_name = self._names.get(name)
+        if converted_name is None:
+            converted_name = self._names[name] = self._convert_uncached_name(name)
+        return converted_name
+
+    def _convert_uncached_name(self, name):
+        # Names are interned so that the same names share a string across
+        # documents, and comparisons with names in the reader are quick.
+        namespace_uri, separator, local_name = name.rpartition(" ")
+        if not separator:
+            return sys.intern(name)
+        else:
+            prefix = self._namespace_prefixes.get(namespace_uri)
             if prefix is None:
-                return "{%s}%s" % (node.namespaceURI, node.localName)
+                return sys.intern("{%s}%s" % (namespace_uri, local_name))
             else:
-                return "%s:%s" % (prefix, node.localName)
-
-    return convert_node(document.documentElement)
+                return sys.intern("%s:%s" % (prefix, local_name))
@@ -0,0 +1,291 @@
+import collections
+import contextlib
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+
+from urllib.parse import urljoin, urlsplit
+
+from .caches import LruCache
+from .docx.files import _urlopen
+
+
+FetcherInfo = collections.namedtuple("FetcherInfo", ["hits", "revalidated", "misses"])
+
+
+class CachingFetcher(object):
+    def __init__(
+        self,
+        timeout=10,
+        max_age=60,
+        max_file_size=16 * 1024 * 1024,
+        memory_cache_size=64 * 1024 * 1024,
+        cache_dir=None,
+        max_idle_connections_per_host=4,
+        on_fetch=None,
+    ):
+        self._timeout = timeout
+        self._max_age = max_age
+        self._max_file_size = max_file_size
+        self._memory_cache = LruCache(memory_cache_size, size=lambda entry: len(entry.contents))
+        self._disk_cache = None if cache_dir is None else _DiskCache(cache_dir)
+        self._connections = _ConnectionPool(
+            timeout=timeout,
+            max_idle_connections_per_host=max_idle_connections_per_host,
+        )
+        self._on_fetch = on_fetch
+        self._lock = threading.Lock()
+        self._counts = {"hit": 0, "revalidated": 0, "miss": 0}
+
+    def open(self, uri):
+        if urlsplit(uri).scheme.lower() in ("http", "https"):
+            return io.BytesIO(self._fetch(uri))
+        else:
+            return contextlib.closing(_urlopen(uri, timeout=self._timeout))
+
+    def info(self):
+        with self._lock:
+            return FetcherInfo(
+                hits=self._counts["hit"],
+                revalidated=self._counts["revalidated"],
+                misses=self._counts["miss"],
+            )
+
+    def close(self):
+        self._connections.close()
+
+    def _fetch(self, uri):
+        entry = self._memory_cache.get(uri)
+        if entry is None and self._disk_cache is not None:
+            entry = self._disk_cache.get(uri)
+            if entry is not None:
+                self._memory_cache[uri] = entry
+
+        if entry is not None and time.time() - entry.fetched_at < self._max_age:
+            self._record(uri, "hit")
+            return entry.contents
+
+        headers = {}
+        if entry is not None:
+            if entry.etag is not None:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified is not None:
+                headers["If-Modified-Since"] = entry.last_modified
+
+        response = self._connections.get(uri, headers=headers, max_size=self._max_file_size)
+        if response.status == 304 and entry is not None:
+            entry = entry._replace(fetched_at=time.time())
+            outcome = "revalidated"
+        else:
+            entry = _CacheEntry(
+                contents=response.contents,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+                fetched_at=time.time(),
+            )
+            outcome = "miss"
+
+        self._memory_cache[uri] = entry
+        if self._disk_cache is not None:
+            self._disk_cache.put(uri, entry)
+
+        self._record(uri, outcome)
+        return entry.contents
+
+    def _record(self, uri, outcome):
+        with self._lock:
+            self._counts[outcome] += 1
+        if self._on_fetch is not None:
+            self._on_fetch(uri, outcome)
+
+
+_CacheEntry = collections.namedtuple("_CacheEntry", ["contents", "etag", "last_modified", "fetched_at"])
+
+_Response = collections.namedtuple("_Response", ["status", "headers", "contents"])
+
+
+class _ConnectionPool(object):
+    _max_redirects = 5
+
+    def __init__(self, timeout, max_idle_connections_per_host):
+        self._timeout = timeout
+        self._max_idle_connections_per_host = max_idle_connections_per_host
+        self._idle_connections = collections.defaultdict(list)
+        self._lock = threading.Lock()
+
+    def get(self, uri, headers, max_size):
+        for _ in range(self._max_redirects + 1):
+            status, response_headers, contents = self._request(uri, headers, max_size)
+            location = response_headers.get("Location")
+            if status in (301, 302, 303, 307, 308) and location is not None:
+                redirect_uri = urljoin(uri, location)
+                # Only HTTP redirects are followed, so that a server can't
+                # redirect to a file or some other kind of URI.
+                if urlsplit(redirect_uri).scheme.lower() not in ("http", "https"):
+                    raise IOError("redirect to unsupported URI {0} when fetching {1}".format(redirect_uri, uri))
+                uri = redirect_uri
+            elif status in (200, 304):
+                return _Response(status, response_headers, contents)
+            else:
+                raise IOError("HTTP error {0} when fetching {1}".format(status, uri))
+
+        raise IOError("more than {0} redirects when fetching {1}".format(self._max_redirects, uri))
+
+    def _request(self, uri, headers, max_size):
+        parts = urlsplit(uri)
+        key = (parts.scheme.lower(), parts.netloc)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+
+        connection, is_reused = self._connection(key)
+        try:
+            return self._send(connection, key, path, headers, max_size)
+        except _ConnectionLostError as error:
+            # The server may have closed an idle connection, so retry once
+            # using a new connection.
+            if not is_reused:
+                raise IOError(str(error.cause))
+
+        try:
+            return self._send(self._new_connection(key), key, path, headers, max_size)
+        except _ConnectionLostError as error:
+            raise IOError(str(error.cause))
+
+    def _send(self, connection, key, path, headers, max_size):
+        try:
+            connection.request("GET", path, headers=headers)
+            response = connection.getresponse()
+
+            content_length = response.getheader("Content-Length")
+            if content_length is not None and content_length.isdigit() and int(content_length) > max_size:
+                raise IOError("file is larger than {0} bytes".format(max_size))
+
+            contents = response.read(max_size + 1)
+            if len(contents) > max_size:
+                raise IOError("file is larger than {0} bytes".format(max_size))
+        except (ConnectionError, _http_client().BadStatusLine) as error:
+            connection.close()
+            raise _ConnectionLostError(error)
+        except _http_client().HTTPException as error:
+            connection.close()
+            raise IOError(str(error))
+        except BaseException:
+            connection.close()
+            raise
+
+        if response.will_close or not response.isclosed():
+            connection.close()
+        else:
+            self._release(key, connection)
+
+        return response.status, response.headers, contents
+
+    def _connection(self, key):
+        with self._lock:
+            idle_connections = self._idle_connections[key]
+            if idle_connections:
+                return idle_connections.pop(), True
+
+        return self._new_connection(key), False
+
+    def _new_connection(self, key):
+        http_client = _http_client()
+        scheme, netloc = key
+        if scheme == "https":
+            return http_client.HTTPSConnection(netloc, timeout=self._timeout)
+        else:
+            return http_client.HTTPConnection(netloc, timeout=self._timeout)
+
+    def _release(self, key, connection):
+        with self._lock:
+            idle_connections = self._idle_connections[key]
+            if len(idle_connections) < self._max_idle_connections_per_host:
+                idle_connections.append(connection)
+                return
+
+        connection.close()
+
+    def close(self):
+        with self._lock:
+            connections = [
+                connection
+                for idle_connections in self._idle_connections.values()
+                for connection in idle_connections
+            ]
+            self._idle_connections.clear()
+
+        for connection in connections:
+            connection.close()
+
+
+class _ConnectionLostError(Exception):
+    def __init__(self, cause):
+        super(_ConnectionLostError, self).__init__(str(cause))
+        self.cause = cause
+
+
+def _http_client():
+    import http.client
+    return http.client
+
+
+# Metadata is written after the contents, so files are only used once
+# they've been completely written.
+class _DiskCache(object):
+    def __init__(self, directory):
+        self._directory = directory
+
+    def get(self, uri):
+        path = self._path(uri)
+        try:
+            with open(path + ".json", "r") as metadata_file:
+                metadata = json.load(metadata_file)
+            with open(path, "rb") as contents_file:
+                contents = contents_file.read()
+        except (IOError, ValueError):
+            return None
+
+        if metadata.get("uri") != uri:
+            return None
+
+        return _CacheEntry(
+            contents=contents,
+            etag=metadata.get("etag"),
+            last_modified=metadata.get("last_modified"),
+            fetched_at=metadata.get("fetched_at", 0),
+        )
+
+    def put(self, uri, entry):
+        path = self._path(uri)
+        try:
+            if not os.path.isdir(self._directory):
+                os.makedirs(self._directory)
+            _write_atomically(path, entry.contents)
+            _write_atomically(path + ".json", json.dumps({
+                "uri": uri,
+                "etag": entry.etag,
+                "last_modified": entry.last_modified,
+                "fetched_at": entry.fetched_at,
+            }).encode("utf-8"))
+        except (IOError, OSError):
+            # Failing to cache a file shouldn't stop it from being used.
+            pass
+
+    def _path(self, uri):
+        return os.path.join(self._directory, hashlib.sha256(uri.encode("utf-8")).hexdigest())
+
+
+def _write_atomically(path, contents):
+    fd, partial_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".partial")
+    try:
+        with os.fdopen(fd, "wb") as partial_file:
+            partial_file.write(contents)
+        os.replace(partial_path, path)
+    except BaseException:
+        os.remove(partial_path)
+        raise
@@ -1,5 +1,5 @@
 from ..lists import flat_map
-from .nodes import TextNode, Tag, Element, ForceWrite, NodeVisitor
+from .nodes import TextNode, Tag, Element, ForceWrite, NodeVisitor, StreamedAttributeValue
 
 
 def text(value):
@@ -29,6 +29,10 @@ def collapsible_element(tag_names, attributes=None, children=None):
 force_write = ForceWrite()
 
 
+def streamed_attribute_value(prefix, iter_chunks):
+    return StreamedAttributeValue(prefix, iter_chunks)
+
+
 def strip_empty(nodes):
     return flat_map(_strip_empty_node, nodes)
 
@@ -57,12 +61,55 @@ class StripEmpty(NodeVisitor):
 
 def collapse(nodes):
     collapsed = []
-    
+    collapse_onto(collapsed, nodes)
+    return collapsed
+
+
+def collapse_onto(collapsed, nodes):
     for node in nodes:
         _collapsing_add(collapsed, node)
-    
+
+
+# Equivalent to collapse(strip_empty(nodes)), but in a single pass.
+def strip_empty_and_collapse(nodes):
+    collapsed = []
+    strip_empty_and_collapse_onto(collapsed, nodes)
     return collapsed
 
+
+def strip_empty_and_collapse_onto(collapsed, nodes):
+    # Dispatching on type directly rather than using a visitor avoids a
+    # method call per node, which is noticeable on large documents.
+    for node in nodes:
+        node_type = type(node)
+        if node_type is Element:
+            children = []
+            strip_empty_and_collapse_onto(children, node.children)
+            if children or node.is_void():
+                _add_collapsed(collapsed, Element(node.tag, children))
+        elif node_type is TextNode:
+            if node.value:
+                collapsed.append(node)
+        else:
+            collapsed.append(node)
+
+
+def _add_collapsed(collapsed, node):
+    # Unlike _collapsing_add, node and its descendants must already be
+    # collapsed, and elements must not be shared with the original nodes,
+    # since they may be modified when later nodes are collapsed into them.
+    if collapsed and type(node) is Element and node.collapsible:
+        last = collapsed[-1]
+        if type(last) is Element and _is_match(last, node):
+            if node.separator:
+                last.children.append(text(node.separator))
+            for child in node.children:
+                _add_collapsed(last.children, child)
+            return
+
+    collapsed.append(node)
+
+
 class _CollapseNode(NodeVisitor):
     def visit_text_node(self, node):
         return node
@@ -53,6 +53,16 @@ class Element(Node):
         return not self.children and self.tag_name in self._VOID_TAG_NAMES
 
 
+# Chunks are written as-is, so must already be escaped.
+class StreamedAttributeValue(object):
+    def __init__(self, prefix, iter_chunks):
+        self.prefix = prefix
+        self.iter_chunks = iter_chunks
+
+    def __str__(self):
+        return self.prefix + "".join(self.iter_chunks())
+
+
 @cobble.visitable
 class ForceWrite(Node):
     pass
@@ -1,4 +1,6 @@
 import base64
+import contextlib
+import hashlib
 
 from . import html
 
@@ -18,11 +20,90 @@ def img_element(func):
 inline = img_element
 
 
-@img_element
-def data_uri(image):
-    with image.open() as image_bytes:
-        encoded_src = base64.b64encode(image_bytes.read()).decode("ascii")
+def memoize(func, cache=None):
+    if cache is None:
+        cache = {}
+
+    def convert_image(image):
+        key = (image.content_type, _content_key(image))
+        attributes = cache.get(key)
+        if attributes is None:
+            attributes = func(image)
+            cache[key] = attributes
+        return attributes
+
+    return convert_image
+
+
+def _content_key(image):
+    with _open_buffer(image) as image_bytes:
+        return ("sha256", hashlib.sha256(image_bytes).hexdigest())
+
+
+def _data_uri_attributes(image):
+    with _open_buffer(image) as image_bytes:
+        encoded_src = base64.b64encode(image_bytes).decode("ascii")
 
     return {
         "src": "data:{0};base64,{1}".format(image.content_type, encoded_src)
     }
+
+
+data_uri = img_element(_data_uri_attributes)
+
+
+@img_element
+def streaming_data_uri(image):
+    # Linked images may fail to open when written, so are read immediately
+    if not image.is_embedded:
+        return _data_uri_attributes(image)
+
+    return {
+        "src": html.streamed_attribute_value(
+            "data:{0};base64,".format(image.content_type),
+            lambda: _iter_base64_chunks(image),
+        ),
+    }
+
+
+# A multiple of three, so that the base64 encoding of each chunk can be
+# concatenated without padding.
+_base64_read_size = 3 * 16 * 1024
+
+
+def _iter_base64_chunks(image):
+    with image.open() as image_file:
+        if hasattr(image_file, "getbuffer"):
+            with image_file.getbuffer() as image_bytes:
+                for start in range(0, len(image_bytes), _base64_read_size):
+                    yield base64.b64encode(image_bytes[start:start + _base64_read_size]).decode("ascii")
+            return
+
+        remainder = b""
+        while True:
+            chunk = image_file.read(_base64_read_size)
+            if not chunk:
+                break
+
+            chunk = remainder + chunk
+            encodable_length = len(chunk) - len(chunk) % 3
+            remainder = chunk[encodable_length:]
+            yield base64.b64encode(chunk[:encodable_length]).decode("ascii")
+
+        if remainder:
+            yield base64.b64encode(remainder).decode("ascii")
+
+
+@contextlib.contextmanager
+def _open_buffer(image):
+    # Images in memory-mapped zip files can be used without copying them
+    with image.open() as image_file:
+        if hasattr(image_file, "getbuffer"):
+            with image_file.getbuffer() as image_bytes:
+                yield image_bytes
+        else:
+            yield image_file.read()
+
+
+def _memoized_data_uri():
+    return img_element(memoize(_data_uri_attributes))
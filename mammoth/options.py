@@ -1,29 +1,48 @@
-from .styles.parser import read_style_mapping
+import functools
+
+from .styles import CompiledStyleMap, combine as combine_style_maps
 from . import lists, results
 
 
-def read_options(options):
-    custom_style_map_text = options.pop("style_map", "") or ""
-    embedded_style_map_text = options.pop("embedded_style_map", "") or ""
-    include_default_style_map = options.pop("include_default_style_map", True)
+def compile_style_map(style_text):
+    result = _read_style_map(style_text)
+    return CompiledStyleMap(result.value, result.messages)
 
-    read_style_map_result = results.combine([
-        _read_style_map(custom_style_map_text),
-        _read_style_map(embedded_style_map_text),
-    ])
 
-    custom_style_map, embedded_style_map = read_style_map_result.value
-    style_map = custom_style_map + embedded_style_map
+def read_options(options):
+    custom_style_map = _read_compiled_style_map(options.pop("style_map", "") or "")
+    embedded_style_map = _read_compiled_style_map(options.pop("embedded_style_map", "") or "")
+    include_default_style_map = options.pop("include_default_style_map", True)
 
+    style_maps = [custom_style_map, embedded_style_map]
     if include_default_style_map:
-        style_map += _default_style_map
+        style_maps.append(_default_style_map())
 
     options["ignore_empty_paragraphs"] = options.get("ignore_empty_paragraphs", True)
-    options["style_map"] = style_map
-    return read_style_map_result.map(lambda _: options)
+    options["style_map"] = _combine_style_maps(tuple(style_maps))
+    return results.Result(options, custom_style_map.messages + embedded_style_map.messages)
+
+
+def _read_compiled_style_map(style_map):
+    if isinstance(style_map, CompiledStyleMap):
+        return style_map
+    else:
+        return _compile_style_map_cached(style_map)
+
+
+# The same style map is often used for many conversions, so compiled style
+# maps are cached by their text.
+_compile_style_map_cached = functools.lru_cache(maxsize=32)(compile_style_map)
+
+
+# Compiled style maps are compared by identity, so combinations of the same
+# compiled style maps can reuse the same combined style map and index.
+_combine_style_maps = functools.lru_cache(maxsize=32)(combine_style_maps)
 
 
 def _read_style_map(style_text):
+    from .styles.parser import read_style_mapping
+
     lines = filter(None, map(_get_line, style_text.split("\n")))
     return results.combine(lists.map(read_style_mapping, lines)) \
         .map(lambda style_mappings: lists.filter(None, style_mappings))
@@ -37,7 +56,14 @@ def _get_line(line):
         return line
 
 
-_default_style_map_result = _read_style_map("""
+@functools.lru_cache(maxsize=None)
+def _default_style_map():
+    style_map = compile_style_map(_default_style_map_text)
+    assert not style_map.messages
+    return style_map
+
+
+_default_style_map_text = """
 p.Heading1 => h1:fresh
 p.Heading2 => h2:fresh
 p.Heading3 => h3:fresh
@@ -94,8 +120,4 @@ p[style-name='Normal'] => p:fresh
 # Apple Pages
 p.Body => p:fresh
 p[style-name='Body'] => p:fresh
-""")
-
-
-assert not _default_style_map_result.messages
-_default_style_map = _default_style_map_result.value
+"""
@@ -6,14 +6,35 @@ from .lists import unique
 class Result(object):
     def __init__(self, value, messages):
         self.value = value
-        self.messages = unique(messages)
-    
+        if not isinstance(messages, list):
+            messages = list(messages)
+        self._messages = messages
+        self._messages_are_unique = False
+
+    @property
+    def messages(self):
+        # Duplicates are removed when the messages are first used, rather
+        # than whenever results are combined.
+        if not self._messages_are_unique:
+            self._messages = unique(self._messages)
+            self._messages_are_unique = True
+        return self._messages
+
     def map(self, func):
-        return Result(func(self.value), self.messages)
-    
+        return Result(func(self.value), self._messages)
+
     def bind(self, func):
         result = func(self.value)
-        return Result(result.value, self.messages + result.messages)
+        return Result(result.value, _concat_messages(self._messages, result._messages))
+
+
+def _concat_messages(first, second):
+    if not first:
+        return second
+    elif not second:
+        return first
+    else:
+        return first + second
 
 
 Message = collections.namedtuple("Message", ["type", "message"])
@@ -32,9 +53,8 @@ def combine(results):
     messages = []
     for result in results:
         values.append(result.value)
-        for message in result.messages:
-            messages.append(message)
-        
+        messages.extend(result._messages)
+
     return Result(values, messages)
 
 
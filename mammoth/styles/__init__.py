@@ -1,8 +1,48 @@
 import collections
 
+from .index import StyleIndex
+
 
 def style(document_matcher, html_path):
     return Style(document_matcher, html_path)
 
 
 Style = collections.namedtuple("Style", ["document_matcher", "html_path"])
+
+
+class CompiledStyleMap(object):
+    __slots__ = ["_styles", "_messages", "_index"]
+
+    def __init__(self, styles, messages):
+        self._styles = tuple(styles)
+        self._messages = tuple(messages)
+        self._index = StyleIndex(self._styles)
+
+    @property
+    def styles(self):
+        return self._styles
+
+    @property
+    def messages(self):
+        return list(self._messages)
+
+    def find_style(self, element, element_type):
+        return self._index.find_style(element, element_type)
+
+    def __repr__(self):
+        return "CompiledStyleMap(styles={0!r}, messages={1!r})".format(list(self._styles), list(self._messages))
+
+
+def combine(style_maps):
+    return CompiledStyleMap(
+        styles=[
+            style
+            for style_map in style_maps
+            for style in style_map.styles
+        ],
+        messages=[
+            message
+            for style_map in style_maps
+            for message in style_map.messages
+        ],
+    )
@@ -0,0 +1,172 @@
+from .. import document_matchers
+from ..caches import LruCache
+
+
+_styled_element_types = set(["paragraph", "run", "table"])
+
+_not_found = object()
+
+_max_cached_lookups = 1024
+
+
+# Styles are indexed by the values that their matchers require, rather than
+# being checked in turn.
+class StyleIndex(object):
+    def __init__(self, styles):
+        self._styles = styles
+        # Maps each distinct set of matching criteria to the position of the
+        # first style with those criteria. Later styles with the same
+        # criteria can never be the first match, so aren't indexed.
+        self._positions = {}
+        # Lengths of the starts_with style name matchers for each element
+        # type, so that only prefixes of those lengths need to be checked.
+        self._prefix_lengths = {}
+        # Styles with matchers that can't be indexed, such as string matchers
+        # using unknown operators, are checked one by one.
+        self._unindexed = []
+        # Only the most recently used lookups are memoized.
+        self._cache = LruCache(_max_cached_lookups)
+
+        for position, style in enumerate(styles):
+            key = _index_key(style.document_matcher)
+            if key is None:
+                self._unindexed.append((position, style))
+            else:
+                self._positions.setdefault(key, position)
+                if key[0] in _styled_element_types and key[2] == "prefix":
+                    self._prefix_lengths.setdefault(key[0], set()).add(len(key[3]))
+
+    def find_style(self, element, element_type):
+        cache_key = _cache_key(element, element_type)
+        style = self._cache.get(cache_key, _not_found)
+        if style is _not_found:
+            style = self._find_uncached_style(element, element_type)
+            self._cache[cache_key] = style
+        return style
+
+    def _find_uncached_style(self, element, element_type):
+        positions = [
+            self._positions[key]
+            for key in self._candidate_keys(element, element_type)
+            if key in self._positions
+        ]
+        first_position = min(positions) if positions else None
+
+        for position, style in self._unindexed:
+            if first_position is not None and position > first_position:
+                break
+            if _matches(style.document_matcher, element, element_type):
+                return style
+
+        if first_position is None:
+            return None
+        else:
+            return self._styles[first_position]
+
+    def _candidate_keys(self, element, element_type):
+        if element_type in _styled_element_types:
+            style_ids = _none_and(element.style_id)
+            if element_type == "paragraph":
+                numberings = _none_and(element.numbering)
+            else:
+                numberings = [None]
+
+            style_name_keys = [(None, None)]
+            if element.style_name is not None:
+                style_name = element.style_name.upper()
+                style_name_keys.append(("equal", style_name))
+                for length in self._prefix_lengths.get(element_type, ()):
+                    if length <= len(style_name):
+                        style_name_keys.append(("prefix", style_name[:length]))
+
+            return [
+                (element_type, style_id, style_name_kind, style_name_value, numbering)
+                for style_id in style_ids
+                for style_name_kind, style_name_value in style_name_keys
+                for numbering in numberings
+            ]
+        elif element_type == "highlight":
+            return [(element_type, color) for color in _none_and(element.color)]
+        elif element_type == "break":
+            return [(element_type, element.break_type)]
+        else:
+            return [(element_type, )]
+
+
+def _none_and(value):
+    if value is None:
+        return [None]
+    else:
+        return [None, value]
+
+
+def _index_key(matcher):
+    element_type = matcher.element_type
+    if element_type in _styled_element_types:
+        style_name = matcher.style_name
+        if style_name is None:
+            style_name_kind = None
+            style_name_value = None
+        elif style_name.operator is document_matchers._operator_equal_to:
+            style_name_kind = "equal"
+            style_name_value = style_name.value.upper()
+        elif style_name.operator is document_matchers._operator_starts_with:
+            style_name_kind = "prefix"
+            style_name_value = style_name.value.upper()
+        else:
+            return None
+
+        if element_type == "paragraph":
+            numbering = matcher.numbering
+        else:
+            numbering = None
+
+        return (element_type, matcher.style_id, style_name_kind, style_name_value, numbering)
+    elif element_type == "highlight":
+        return (element_type, matcher.color)
+    elif element_type == "break":
+        return (element_type, matcher.break_type)
+    else:
+        return (element_type, )
+
+
+def _cache_key(element, element_type):
+    if element_type == "paragraph":
+        return (element_type, element.style_id, element.style_name, element.numbering)
+    elif element_type in _styled_element_types:
+        return (element_type, element.style_id, element.style_name)
+    elif element_type == "highlight":
+        return (element_type, element.color)
+    elif element_type == "break":
+        return (element_type, element.break_type)
+    else:
+        return (element_type, )
+
+
+def _matches(matcher, element, element_type):
+    if matcher.element_type in ["underline", "strikethrough", "all_caps", "small_caps", "bold", "italic", "comment_reference"]:
+        return matcher.element_type == element_type
+    elif matcher.element_type == "highlight":
+        return (
+            matcher.element_type == element_type and
+            (matcher.color is None or matcher.color == element.color)
+        )
+    elif matcher.element_type == "break":
+        return (
+            matcher.element_type == element_type and
+            matcher.break_type == element.break_type
+        )
+    else: # matcher.element_type in ["paragraph", "run", "table"]:
+        return (
+            matcher.element_type == element_type and (
+                matcher.style_id is None or
+                matcher.style_id == element.style_id
+            ) and (
+                matcher.style_name is None or
+                element.style_name is not None and (matcher.style_name.matches(element.style_name))
+            ) and (
+                element_type != "paragraph" or
+                matcher.numbering is None or
+                matcher.numbering == element.numbering
+            )
+        )
@@ -1,12 +1,13 @@
-from .html import HtmlWriter
-from .markdown import MarkdownWriter
+import importlib
 
 
-def writer(output_format=None):
+def writer(output_format=None, output=None):
     if output_format is None:
         output_format = "html"
     
-    return _writers[output_format]()
+    module_name, class_name = _writers[output_format]
+    module = importlib.import_module(module_name, __name__)
+    return getattr(module, class_name)(output=output)
 
 
 def formats():
@@ -14,6 +15,6 @@ def formats():
 
 
 _writers = {
-    "html": HtmlWriter,
-    "markdown": MarkdownWriter,
+    "html": (".html", "HtmlWriter"),
+    "markdown": (".markdown", "MarkdownWriter"),
 }
@@ -2,42 +2,48 @@ from __future__ import unicode_literals
 from xml.sax.saxutils import escape
 
 from .abc import Writer
+from .output import fragments as output_fragments
+from ..html.nodes import StreamedAttributeValue
 
 
 class HtmlWriter(Writer):
-    def __init__(self):
-        self._fragments = []
+    def __init__(self, output=None):
+        self._fragments = output_fragments(output)
     
     def text(self, text):
         self._fragments.append(_escape_html(text))
     
     def start(self, name, attributes=None):
-        attribute_string = _generate_attribute_string(attributes)
-        self._fragments.append("<{0}{1}>".format(name, attribute_string))
+        self._fragments.append("<" + name)
+        _write_attributes(self._fragments, attributes)
+        self._fragments.append(">")
 
     def end(self, name):
         self._fragments.append("</{0}>".format(name))
     
     def self_closing(self, name, attributes=None):
-        attribute_string = _generate_attribute_string(attributes)
-        self._fragments.append("<{0}{1} />".format(name, attribute_string))
+        self._fragments.append("<" + name)
+        _write_attributes(self._fragments, attributes)
+        self._fragments.append(" />")
     
     def append(self, html):
         self._fragments.append(html)
     
     def as_string(self):
-        return "".join(self._fragments)
+        return self._fragments.value()
 
 
 def _escape_html(text):
     return escape(text, {'"': "&quot;"})
 
 
-def _generate_attribute_string(attributes):
-    if attributes is None:
-        return ""
-    else:
-        return "".join(
-            ' {0}="{1}"'.format(key, _escape_html(attributes[key]))
-            for key in sorted(attributes)
-        )
+def _write_attributes(fragments, attributes):
+    if attributes is not None:
+        for key in sorted(attributes):
+            value = attributes[key]
+            if isinstance(value, StreamedAttributeValue):
+                fragments.append(' {0}="{1}'.format(key, _escape_html(value.prefix)))
+                fragments.extend(value.iter_chunks())
+                fragments.append('"')
+            else:
+                fragments.append(' {0}="{1}"'.format(key, _escape_html(value)))
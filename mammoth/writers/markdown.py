@@ -1,6 +1,7 @@
 from __future__ import unicode_literals
 
 from .abc import Writer
+from .output import fragments as output_fragments
 
 import re
 
@@ -152,8 +153,8 @@ def _default_writer(attributes, markdown_state):
 
 
 class MarkdownWriter(Writer):
-    def __init__(self):
-        self._fragments = []
+    def __init__(self, output=None):
+        self._fragments = output_fragments(output)
         self._element_stack = []
         self._markdown_state = _MarkdownState()
     
@@ -191,7 +192,7 @@ class MarkdownWriter(Writer):
         self._fragments.append(other)
     
     def as_string(self):
-        return "".join(self._fragments)
+        return self._fragments.value()
     
     def _write_anchor(self, attributes):
         html_id = attributes.get("id")
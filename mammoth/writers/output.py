@@ -0,0 +1,52 @@
+import io
+
+
+# If output is set, fragments are written to output, which may be a binary
+# or text file, instead of being joined by value().
+def fragments(output=None):
+    if output is None:
+        return _StringFragments()
+    else:
+        return _FileFragments(output)
+
+
+class _StringFragments(list):
+    def value(self):
+        return "".join(self)
+
+
+# The number of characters to buffer before writing to the output, so that
+# the output isn't written to for every fragment.
+_buffer_size = 64 * 1024
+
+
+class _FileFragments(object):
+    def __init__(self, output):
+        self._output = output
+        self._encode = not isinstance(output, io.TextIOBase)
+        self._buffer = []
+        self._buffered_length = 0
+
+    def append(self, fragment):
+        self._buffer.append(fragment)
+        self._buffered_length += len(fragment)
+        if self._buffered_length >= _buffer_size:
+            self._flush()
+
+    def extend(self, fragments):
+        for fragment in fragments:
+            self.append(fragment)
+
+    def value(self):
+        self._flush()
+        return None
+
+    def _flush(self):
+        if self._buffer:
+            text = "".join(self._buffer)
+            self._buffer = []
+            self._buffered_length = 0
+            if self._encode:
+                self._output.write(text.encode("utf-8"))
+            else:
+                self._output.write(text)
@@ -1,17 +1,53 @@
+import bisect
+import collections
 import contextlib
+import copy
 import io
+import mmap
+import os
 import shutil
+import struct
+import tempfile
+import time
+import zlib
 
-from zipfile import ZipFile
+from zipfile import BadZipFile, ZipFile, ZipInfo, ZIP_DEFLATED, ZIP_STORED
 
 
 def open_zip(fileobj, mode):
+    if mode == "r":
+        mapping = _map_file(fileobj)
+        if mapping is not None:
+            return _MappedZip(ZipFile(mapping, mode), mapping)
+
     return _Zip(ZipFile(fileobj, mode))
 
 
+def _map_file(fileobj):
+    # Other file objects may have a descriptor for a different file, such as
+    # the compressed file underneath a GzipFile.
+    if isinstance(fileobj, (io.BufferedReader, io.BufferedRandom)):
+        raw = fileobj.raw
+    else:
+        raw = fileobj
+    if not isinstance(raw, io.FileIO):
+        return None
+
+    try:
+        # Mappings raise ValueError rather than OSError when ZipFile seeks
+        # before the start of a file too short to be a zip file.
+        if fileobj.tell() != 0 or os.fstat(fileobj.fileno()).st_size < _end_of_central_directory_size:
+            return None
+        return mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        # Such as empty files, pipes and other files that can't be mapped
+        return None
+
+
 class _Zip(object):
     def __init__(self, zip_file):
         self._zip_file = zip_file
+        self._names = frozenset(zip_file.namelist())
     
     def __enter__(self):
         return self
@@ -23,37 +59,461 @@ class _Zip(object):
         return contextlib.closing(self._zip_file.open(name))
 
     def exists(self, name):
-        try:
-            self._zip_file.getinfo(name)
-            return True
-        except KeyError:
-            return False
+        return name in self._names
 
     def read_str(self, name):
         return self._zip_file.read(name).decode("utf8")
 
 
-def update_zip(fileobj, files):
-    source = ZipFile(fileobj, "r")
-    try:
-        destination_fileobj = io.BytesIO()
-        destination = ZipFile(destination_fileobj, "w")
+# Stored entries are read directly from the mapping without being copied.
+class _MappedZip(_Zip):
+    def __init__(self, zip_file, mapping):
+        super(_MappedZip, self).__init__(zip_file)
+        self._mapping = mapping
+        self._view = memoryview(mapping)
+
+    def __exit__(self, *args):
+        super(_MappedZip, self).__exit__(*args)
+        self._view.release()
         try:
-            names = set(source.namelist()) | set(files.keys())
-            for name in names:
-                if name in files:
-                    contents = files[name]
-                else:
-                    contents = source.read(name)
-                destination.writestr(name, contents)
-        finally:
-            destination.close()
+            self._mapping.close()
+        except BufferError:
+            # Entries that are still open, or their buffers, refer to the
+            # mapping, so it'll be closed once they're no longer used.
+            pass
+
+    def open(self, name):
+        info = self._zip_file.getinfo(name)
+        is_encrypted = info.flag_bits & 0x1
+        if is_encrypted:
+            return super(_MappedZip, self).open(name)
+        elif info.compress_type == ZIP_STORED:
+            return _EntryFile(self._compressed_data(info), name=name, crc=info.CRC)
+        elif info.compress_type == ZIP_DEFLATED:
+            return _InflatingEntryFile(self._compressed_data(info), name=name, size=info.file_size, crc=info.CRC)
+        else:
+            return super(_MappedZip, self).open(name)
+
+    def read_str(self, name):
+        with self.open(name) as entry:
+            with entry.getbuffer() as contents:
+                return str(contents, "utf8")
+
+    def _compressed_data(self, info):
+        header_start = info.header_offset
+        header = self._view[header_start:header_start + _local_header_size]
+        if len(header) != _local_header_size or header[:4] != _local_header_signature:
+            raise BadZipFile("Bad magic number for file header")
+        name_length, extra_length = struct.unpack("<HH", header[26:30])
+        data_start = header_start + _local_header_size + name_length + extra_length
+        data = self._view[data_start:data_start + info.compress_size]
+        if len(data) != info.compress_size:
+            raise BadZipFile("Truncated file data for {0!r}".format(info.filename))
+        return data
+
+
+_local_header_signature = b"PK\x03\x04"
+_end_of_central_directory_size = 22
+_local_header_size = 30
+
+
+class _EntryFile(io.BufferedIOBase):
+    def __init__(self, buffer, name, crc):
+        if crc is not None and zlib.crc32(buffer) != crc:
+            raise BadZipFile("Bad CRC-32 for file {0!r}".format(name))
+        self.name = name
+        self._buffer = buffer
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def read(self, size=-1):
+        start = self._position
+        if size is None or size < 0:
+            end = len(self._buffer)
+        else:
+            end = min(start + size, len(self._buffer))
+        self._position = end
+        return bytes(self._buffer[start:end])
+
+    read1 = read
+
+    def readinto(self, buffer):
+        start = self._position
+        end = min(start + len(buffer), len(self._buffer))
+        buffer[:end - start] = self._buffer[start:end]
+        self._position = end
+        return end - start
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        else:
+            position = len(self._buffer) + offset
+        self._position = max(0, min(position, len(self._buffer)))
+        return self._position
+
+    def tell(self):
+        return self._position
+
+    def getbuffer(self):
+        return self._buffer[:]
+
+    def close(self):
+        if not self.closed:
+            # Release the view so that the mapping can be closed
+            self._buffer.release()
+        super(_EntryFile, self).close()
+
+
+class _InflatingEntryFile(io.BufferedIOBase):
+    # The amount of compressed data to decompress at once when the entry is
+    # read in parts.
+    _input_size = 64 * 1024
+
+    def __init__(self, compressed, name, size, crc):
+        self.name = name
+        self._compressed = compressed
+        self._size = size
+        self._crc = crc
+        self._decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+        self._input_position = 0
+        self._running_crc = 0
+        self._position = 0
+        self._contents = None
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        if self._contents is not None:
+            return self._contents.read(size)
+        elif size is None or size < 0:
+            if self._position == 0:
+                return self._decompress_all().read()
+            else:
+                return b"".join(iter(lambda: self.read(self._input_size), b""))
+        else:
+            return self._read_part(size)
+
+    read1 = read
+
+    def readinto(self, buffer):
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def tell(self):
+        if self._contents is None:
+            return self._position
+        else:
+            return self._contents.tell()
+
+    def seekable(self):
+        return True
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        # Seeking decompresses the whole entry, after which reads come from
+        # the decompressed contents.
+        if self._contents is None:
+            position = self._position
+            self._decompress_all().seek(position)
+        return self._contents.seek(offset, whence)
+
+    def getbuffer(self):
+        if self._contents is None:
+            if self._position != 0:
+                raise io.UnsupportedOperation("getbuffer() of partly read entry")
+            self._decompress_all()
+        return self._contents.getbuffer()
+
+    def close(self):
+        if not self.closed:
+            self._compressed.release()
+            if self._contents is not None:
+                self._contents.close()
+        super(_InflatingEntryFile, self).close()
+
+    def _decompress_all(self):
+        # The size comes from the zip file, so isn't trusted to allocate the
+        # buffer up front.
+        decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+        try:
+            contents = decompressor.decompress(self._compressed, self._size + 1)
+        except zlib.error as error:
+            raise BadZipFile("Error decompressing {0!r}: {1}".format(self.name, error))
+        if not decompressor.eof and len(contents) <= self._size:
+            raise BadZipFile("Error decompressing {0!r}: incomplete or truncated stream".format(self.name))
+        if len(contents) != self._size:
+            raise BadZipFile("Bad size for file {0!r}".format(self.name))
+        self._contents = _EntryFile(memoryview(contents), name=self.name, crc=self._crc)
+        return self._contents
+
+    def _read_part(self, size):
+        parts = []
+        remaining = size
+        decompressor = self._decompressor
+        while remaining > 0 and not decompressor.eof:
+            if decompressor.unconsumed_tail:
+                data = decompressor.unconsumed_tail
+            else:
+                start = self._input_position
+                data = self._compressed[start:start + self._input_size]
+                self._input_position += len(data)
+                if not data:
+                    break
+            try:
+                part = decompressor.decompress(data, remaining)
+            except zlib.error as error:
+                raise BadZipFile("Error decompressing {0!r}: {1}".format(self.name, error))
+            parts.append(part)
+            remaining -= len(part)
+
+        result = b"".join(parts)
+        self._position += len(result)
+        self._running_crc = zlib.crc32(result, self._running_crc)
+        if not result and size > 0 and self._running_crc != self._crc:
+            raise BadZipFile("Bad CRC-32 for file {0!r}".format(self.name))
+        return result
+
+
+# If in_place is True, only new and replaced entries and the central
+# directory are written, so fileobj is left corrupt if interrupted.
+def update_zip(fileobj, files, in_place=False):
+    with ZipFile(fileobj, "r") as source:
+        infos = source.infolist()
+        central_directory_start = source.start_dir
+        comment = source.comment
+
+    if _requires_zip64(infos, central_directory_start, files):
+        _rewrite_zip(fileobj, files)
+        return
+
+    regions = _entry_regions(infos, central_directory_start)
+    kept_regions = [region for region in regions if region.info.filename not in files]
+
+    if in_place:
+        destination = fileobj
+        destination.seek(max(
+            [region.end for region in kept_regions],
+            default=min([region.start for region in regions], default=0),
+        ))
+        central_directory = [region.info for region in kept_regions]
+    else:
+        destination = tempfile.SpooledTemporaryFile(max_size=_max_in_memory_size)
+        central_directory = [
+            _copy_region(fileobj, region, destination)
+            for region in kept_regions
+        ]
+
+    try:
+        new_names = [name for name in _ordered_names(infos) if name in files]
+        new_names += [name for name in files if name not in new_names]
+        for name in new_names:
+            central_directory.append(_write_entry(destination, name, files[name]))
+
+        _write_central_directory(destination, central_directory, comment)
+
+        if not in_place:
+            destination.seek(0)
+            fileobj.seek(0)
+            shutil.copyfileobj(destination, fileobj)
+        fileobj.truncate()
     finally:
-        source.close()
-    
-    fileobj.seek(0)
-    destination_fileobj.seek(0)
-    shutil.copyfileobj(destination_fileobj, fileobj)
+        if not in_place:
+            destination.close()
+
+
+# Updated zip files smaller than this are written to memory rather than to
+# a temporary file on disk.
+_max_in_memory_size = 16 * 1024 * 1024
+
+_zip64_limit = 0xFFFFFFFF
+_zip64_count_limit = 0xFFFF
+
+
+def _requires_zip64(infos, central_directory_start, files):
+    # Zip64 records aren't written when copying entries, so leave the rare
+    # zip files that need them to ZipFile.
+    size = central_directory_start + sum(len(contents) for contents in files.values())
+    return (
+        len(infos) + len(files) >= _zip64_count_limit or
+        size >= _zip64_limit or
+        any(info.file_size >= _zip64_limit or info.compress_size >= _zip64_limit for info in infos)
+    )
+
+
+def _rewrite_zip(fileobj, files):
+    with tempfile.SpooledTemporaryFile(max_size=_max_in_memory_size) as destination_fileobj:
+        with ZipFile(fileobj, "r") as source:
+            with ZipFile(destination_fileobj, "w", allowZip64=True) as destination:
+                for name in _ordered_names(source.infolist()):
+                    if name not in files:
+                        destination.writestr(source.getinfo(name), source.read(name))
+                for name, contents in files.items():
+                    destination.writestr(name, contents, compress_type=ZIP_DEFLATED)
+
+        fileobj.seek(0)
+        destination_fileobj.seek(0)
+        shutil.copyfileobj(destination_fileobj, fileobj)
+        fileobj.truncate()
+
+
+def _ordered_names(infos):
+    names = []
+    seen_names = set()
+    for info in infos:
+        if info.filename not in seen_names:
+            seen_names.add(info.filename)
+            names.append(info.filename)
+    return names
+
+
+_Region = collections.namedtuple("_Region", ["info", "start", "end"])
+
+
+# Each entry runs until the next entry or the central directory, so that
+# any data descriptor is included.
+def _entry_regions(infos, central_directory_start):
+    offsets = sorted(set(info.header_offset for info in infos))
+    offsets.append(central_directory_start)
+    return [
+        _Region(info, info.header_offset, offsets[bisect.bisect_right(offsets, info.header_offset)])
+        for info in sorted(infos, key=lambda info: info.header_offset)
+    ]
+
+
+_copy_buffer_size = 1024 * 1024
+
+
+def _copy_region(source, region, destination):
+    info = copy.copy(region.info)
+    info.header_offset = destination.tell()
+
+    source.seek(region.start)
+    remaining = region.end - region.start
+    while remaining > 0:
+        chunk = source.read(min(remaining, _copy_buffer_size))
+        if not chunk:
+            raise BadZipFile("Truncated file data for {0!r}".format(info.filename))
+        destination.write(chunk)
+        remaining -= len(chunk)
+
+    return info
+
+
+_local_header_struct = struct.Struct("<4sBBHHHHLLLHH")
+_central_directory_header_struct = struct.Struct("<4sBBBBHHHHLLLHHHHHLL")
+_end_of_central_directory_struct = struct.Struct("<4sHHHHLLH")
+
+
+def _write_entry(destination, name, contents):
+    info = ZipInfo(name, time.localtime(time.time())[:6])
+    info.compress_type = ZIP_DEFLATED
+    info.external_attr = 0o600 << 16
+    if not _is_ascii(name):
+        info.flag_bits |= _utf8_flag
+    info.CRC = zlib.crc32(contents)
+    info.file_size = len(contents)
+    compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -zlib.MAX_WBITS)
+    compressed = compressor.compress(contents) + compressor.flush()
+    info.compress_size = len(compressed)
+    info.header_offset = destination.tell()
+
+    encoded_name = _encode_name(info)
+    dos_date, dos_time = _dos_date_time(info.date_time)
+    destination.write(_local_header_struct.pack(
+        _local_header_signature,
+        info.extract_version,
+        info.reserved,
+        info.flag_bits,
+        info.compress_type,
+        dos_time,
+        dos_date,
+        info.CRC,
+        info.compress_size,
+        info.file_size,
+        len(encoded_name),
+        0,
+    ))
+    destination.write(encoded_name)
+    destination.write(compressed)
+    return info
+
+
+def _write_central_directory(destination, infos, comment):
+    start = destination.tell()
+    for info in infos:
+        encoded_name = _encode_name(info)
+        dos_date, dos_time = _dos_date_time(info.date_time)
+        destination.write(_central_directory_header_struct.pack(
+            _central_directory_header_signature,
+            info.create_version,
+            info.create_system,
+            info.extract_version,
+            info.reserved,
+            info.flag_bits,
+            info.compress_type,
+            dos_time,
+            dos_date,
+            info.CRC,
+            info.compress_size,
+            info.file_size,
+            len(encoded_name),
+            len(info.extra),
+            len(info.comment),
+            0,
+            info.internal_attr,
+            info.external_attr,
+            info.header_offset,
+        ))
+        destination.write(encoded_name)
+        destination.write(info.extra)
+        destination.write(info.comment)
+
+    size = destination.tell() - start
+    destination.write(_end_of_central_directory_struct.pack(
+        _end_of_central_directory_signature,
+        0,
+        0,
+        len(infos),
+        len(infos),
+        size,
+        start,
+        len(comment),
+    ))
+    destination.write(comment)
+
+
+_central_directory_header_signature = b"PK\x01\x02"
+_end_of_central_directory_signature = b"PK\x05\x06"
+_utf8_flag = 0x800
+
+
+def _encode_name(info):
+    return info.filename.encode("utf-8" if info.flag_bits & _utf8_flag else "cp437")
+
+
+def _is_ascii(name):
+    try:
+        name.encode("ascii")
+        return True
+    except UnicodeEncodeError:
+        return False
+
+
+def _dos_date_time(date_time):
+    year, month, day, hour, minute, second = date_time
+    return (
+        (year - 1980) << 9 | month << 5 | day,
+        hour << 11 | minute << 5 | second // 2,
+    )
 
 
 def split_path(path):
@@ -0,0 +1,213 @@
+import asyncio
+import contextlib
+import http.server
+import io
+import threading
+import time
+
+import mammoth
+from mammoth import documents, results
+from mammoth.aio import fetch_linked_images, _find_linked_images
+from mammoth.docx.files import InvalidFileReferenceError
+from .testing import assert_equal, assert_raises, external_picture_docx, generate_test_path
+
+
+_tiny_picture_html = """<p><img src="data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAoAAAAKCAIAAAACUFjqAAAAAXNSR0IArs4c6QAAAAlwSFlzAAAOvgAADr4B6kKxwAAAABNJREFUKFNj/M+ADzDhlWUYqdIAQSwBE8U+X40AAAAASUVORK5CYII=" /></p>"""
+
+
+def test_document_is_converted_in_the_same_way_as_convert_to_html():
+    with open(generate_test_path("tables.docx"), "rb") as fileobj:
+        expected_result = mammoth.convert_to_html(fileobj, style_map="p => h1")
+
+    with open(generate_test_path("tables.docx"), "rb") as fileobj:
+        result = asyncio.run(mammoth.aconvert_to_html(fileobj, style_map="p => h1"))
+
+    assert_equal(expected_result.value, result.value)
+    assert_equal(expected_result.messages, result.messages)
+
+
+def test_warnings_from_reading_and_converting_are_combined():
+    with open(generate_test_path("single-paragraph.docx"), "rb") as fileobj:
+        result = asyncio.run(mammoth.aconvert_to_html(fileobj, style_map="!!!!"))
+
+    assert_equal("<p>Walking on imported air</p>", result.value)
+    assert_equal([results.warning("Did not understand this style mapping, so ignored it: !!!!")], result.messages)
+
+
+def test_linked_images_are_fetched_over_http():
+    with _serve_test_data() as base_url:
+        fileobj = external_picture_docx(base_url + "tiny-picture.png")
+        result = asyncio.run(mammoth.aconvert_to_html(fileobj, external_file_access=True))
+
+    assert_equal(_tiny_picture_html, result.value)
+    assert_equal([], result.messages)
+
+
+def test_linked_images_are_ignored_with_warning_if_fetching_them_times_out():
+    with _serve_test_data(delay=1) as base_url:
+        fileobj = external_picture_docx(base_url + "tiny-picture.png")
+        result = asyncio.run(mammoth.aconvert_to_html(fileobj, external_file_access=True, fetch_timeout=0.1))
+
+    assert_equal("", result.value)
+    assert_equal([results.warning("could not open external image: timed out after 0.1 seconds")], result.messages)
+
+
+def test_reads_of_linked_images_that_time_out_are_stopped_using_socket_timeout():
+    with _serve_test_data(delay=2) as base_url:
+        fileobj = external_picture_docx(base_url + "tiny-picture.png")
+        start = time.monotonic()
+        # asyncio.run() waits for the default executor's threads to finish
+        asyncio.run(mammoth.aconvert_to_html(fileobj, external_file_access=True, fetch_timeout=0.1))
+        elapsed = time.monotonic() - start
+
+    assert elapsed < 1, elapsed
+
+
+def test_linked_images_are_found_without_blocking_event_loop():
+    iterating_threads = set()
+
+    class ThreadRecordingList(list):
+        def __iter__(self):
+            iterating_threads.add(threading.current_thread())
+            return super().__iter__()
+
+    def transform_document(document):
+        return document.copy(children=ThreadRecordingList(document.children))
+
+    with _serve_test_data() as base_url:
+        fileobj = external_picture_docx(base_url + "tiny-picture.png")
+        result = asyncio.run(mammoth.aconvert_to_html(
+            fileobj,
+            external_file_access=True,
+            transform_document=transform_document,
+        ))
+
+    assert_equal(_tiny_picture_html, result.value)
+    assert iterating_threads
+    assert threading.current_thread() not in iterating_threads
+
+
+def test_linked_images_are_not_fetched_when_external_file_access_is_disabled():
+    with _serve_test_data() as base_url:
+        fileobj = external_picture_docx(base_url + "tiny-picture.png")
+        result = asyncio.run(mammoth.aconvert_to_html(fileobj))
+
+    assert_equal("", result.value)
+    expected_warning = "could not open external image '{0}tiny-picture.png', external file access is disabled".format(base_url)
+    assert_equal([results.warning(expected_warning)], result.messages)
+
+
+def test_number_of_images_fetched_at_once_is_limited():
+    lock = threading.Lock()
+    fetching = [0]
+    max_fetching = [0]
+
+    def open_image():
+        with lock:
+            fetching[0] += 1
+            max_fetching[0] = max(max_fetching[0], fetching[0])
+        time.sleep(0.05)
+        with lock:
+            fetching[0] -= 1
+        return io.BytesIO(b"image")
+
+    images = [_image(open_image) for _ in range(8)]
+
+    asyncio.run(fetch_linked_images(images, executor=None, max_concurrent_fetches=2, timeout=10))
+
+    assert_equal(2, max_fetching[0])
+    for image in images:
+        with image.open() as image_file:
+            assert_equal(b"image", image_file.read())
+
+
+def test_images_that_time_out_count_towards_limit_until_they_are_read():
+    lock = threading.Lock()
+    fetching = [0]
+    max_fetching = [0]
+
+    def open_image():
+        with lock:
+            fetching[0] += 1
+            max_fetching[0] = max(max_fetching[0], fetching[0])
+        time.sleep(0.1)
+        with lock:
+            fetching[0] -= 1
+        return io.BytesIO(b"image")
+
+    images = [_image(open_image) for _ in range(4)]
+
+    asyncio.run(fetch_linked_images(images, executor=None, max_concurrent_fetches=1, timeout=0.01))
+
+    assert_equal(1, max_fetching[0])
+    for image in images:
+        assert_raises(InvalidFileReferenceError, image.open)
+
+
+def test_only_linked_images_in_referenced_notes_are_fetched():
+    referenced_image = _image(None)
+    document = documents.document(
+        [documents.paragraph([documents.note_reference("footnote", "1")])],
+        notes=documents.notes([
+            documents.note("footnote", "1", [documents.paragraph([referenced_image])]),
+            documents.note("footnote", "2", [documents.paragraph([_image(None)])]),
+        ]),
+    )
+
+    images = _find_linked_images(document, mammoth.compile_style_map(""))
+
+    assert_equal([referenced_image], images)
+
+
+def test_linked_images_in_comments_are_only_fetched_if_comment_references_are_converted():
+    comment_image = _image(None)
+    document = documents.document(
+        [documents.paragraph([documents.comment_reference("1")])],
+        comments=[documents.comment("1", [documents.paragraph([comment_image])])],
+    )
+
+    assert_equal([], _find_linked_images(document, mammoth.compile_style_map("")))
+    assert_equal([comment_image], _find_linked_images(document, mammoth.compile_style_map("comment-reference => sup")))
+
+
+def test_errors_from_fetching_images_are_raised_when_images_are_opened():
+    error = InvalidFileReferenceError("could not open external image")
+
+    def open_image():
+        raise error
+
+    image = _image(open_image)
+
+    asyncio.run(fetch_linked_images([image], executor=None, max_concurrent_fetches=2, timeout=10))
+
+    raised_error = assert_raises(InvalidFileReferenceError, image.open)
+    assert raised_error is error
+
+
+def _image(open_image):
+    return documents.image(alt_text=None, content_type="image/png", open=open_image)
+
+
+@contextlib.contextmanager
+def _serve_test_data(delay=0):
+    class Handler(http.server.SimpleHTTPRequestHandler):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, directory=generate_test_path(""), **kwargs)
+
+        def do_GET(self):
+            time.sleep(delay)
+            super().do_GET()
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01})
+    thread.start()
+    try:
+        yield "http://127.0.0.1:{0}/".format(server.server_address[1])
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
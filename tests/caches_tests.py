@@ -0,0 +1,87 @@
+from mammoth.caches import LruCache, PartCache, PartCacheInfo
+from .testing import assert_equal
+
+
+def test_missing_keys_have_default_value():
+    cache = LruCache(2)
+
+    assert_equal(None, cache.get("a"))
+    assert_equal(0, cache.get("a", 0))
+
+
+def test_values_can_be_read_after_being_set():
+    cache = LruCache(2)
+    cache["a"] = 1
+
+    assert_equal(1, cache.get("a"))
+
+
+def test_least_recently_used_value_is_discarded_when_cache_is_full():
+    cache = LruCache(2)
+    cache["a"] = 1
+    cache["b"] = 2
+    cache.get("a")
+    cache["c"] = 3
+
+    assert_equal(2, len(cache))
+    assert_equal(1, cache.get("a"))
+    assert_equal(None, cache.get("b"))
+    assert_equal(3, cache.get("c"))
+
+
+def test_setting_existing_key_replaces_value_without_discarding_other_values():
+    cache = LruCache(2)
+    cache["a"] = 1
+    cache["b"] = 2
+    cache["a"] = 3
+
+    assert_equal(3, cache.get("a"))
+    assert_equal(2, cache.get("b"))
+
+
+def test_cache_can_be_limited_by_size_of_values():
+    cache = LruCache(5, size=len)
+    cache["a"] = "aa"
+    cache["b"] = "bb"
+    cache["c"] = "cc"
+
+    assert_equal(None, cache.get("a"))
+    assert_equal("bb", cache.get("b"))
+    assert_equal("cc", cache.get("c"))
+
+
+def test_values_larger_than_cache_are_not_cached():
+    cache = LruCache(2, size=len)
+    cache["a"] = "a"
+    cache["b"] = "bbb"
+
+    assert_equal("a", cache.get("a"))
+    assert_equal(None, cache.get("b"))
+
+
+def test_part_cache_only_reads_each_part_once():
+    cache = PartCache(2)
+    reads = []
+
+    def read(value):
+        def read_part():
+            reads.append(value)
+            return value
+
+        return read_part
+
+    assert_equal(1, cache.read("a", read(1)))
+    assert_equal(1, cache.read("a", read(2)))
+    assert_equal(3, cache.read("b", read(3)))
+
+    assert_equal([1, 3], reads)
+    assert_equal(PartCacheInfo(hits=1, misses=2, size=2), cache.info())
+
+
+def test_part_cache_discards_least_recently_used_parts_when_full():
+    cache = PartCache(1)
+    cache.read("a", lambda: 1)
+    cache.read("b", lambda: 2)
+
+    assert_equal(3, cache.read("a", lambda: 3))
+    assert_equal(PartCacheInfo(hits=0, misses=3, size=1), cache.info())
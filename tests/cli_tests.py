@@ -1,5 +1,6 @@
 import os
 import base64
+import shutil
 
 import spur
 import tempman
@@ -69,3 +70,59 @@ def test_output_format_markdown_option_generates_markdown_output():
     result = _local.run(["mammoth", docx_path, "--output-format=markdown"])
     assert_equal(b"", result.stderr_output)
     assert_equal(b"Walking on imported air\n\n", result.output)
+
+
+def test_batch_mode_converts_each_docx_file_in_directory_tree():
+    with tempman.create_temp_dir() as input_dir, tempman.create_temp_dir() as output_dir:
+        os.mkdir(os.path.join(input_dir.path, "nested"))
+        shutil.copy(generate_test_path("single-paragraph.docx"), os.path.join(input_dir.path, "first.docx"))
+        shutil.copy(generate_test_path("tiny-picture.docx"), os.path.join(input_dir.path, "nested", "second.docx"))
+        with open(os.path.join(input_dir.path, "notes.txt"), "w") as notes_file:
+            notes_file.write("Not a docx file")
+
+        result = _local.run(["mammoth", "--batch", input_dir.path, "--output-dir", output_dir.path, "--jobs", "2"])
+        assert_equal(b"", result.stderr_output)
+
+        with open(os.path.join(output_dir.path, "first.html")) as output_file:
+            assert_equal("<p>Walking on imported air</p>", output_file.read())
+        with open(os.path.join(output_dir.path, "nested", "second.html")) as output_file:
+            assert_equal("""<p><img src="second-1.png" /></p>""", output_file.read())
+        with open(os.path.join(output_dir.path, "nested", "second-1.png"), "rb") as image_file:
+            assert_equal(_image_base_64, base64.b64encode(image_file.read()))
+        assert_equal(["first.html", "nested"], sorted(os.listdir(output_dir.path)))
+
+
+def test_batch_mode_skips_files_with_output_newer_than_input():
+    with tempman.create_temp_dir() as input_dir, tempman.create_temp_dir() as output_dir:
+        docx_path = os.path.join(input_dir.path, "document.docx")
+        shutil.copy(generate_test_path("single-paragraph.docx"), docx_path)
+        output_path = os.path.join(output_dir.path, "document.html")
+        with open(output_path, "w") as output_file:
+            output_file.write("Existing output")
+
+        docx_mtime = os.path.getmtime(docx_path)
+        os.utime(output_path, (docx_mtime + 10, docx_mtime + 10))
+        _local.run(["mammoth", "--batch", input_dir.path, "--output-dir", output_dir.path, "--jobs", "1"])
+        with open(output_path) as output_file:
+            assert_equal("Existing output", output_file.read())
+
+        os.utime(output_path, (docx_mtime - 10, docx_mtime - 10))
+        _local.run(["mammoth", "--batch", input_dir.path, "--output-dir", output_dir.path, "--jobs", "1"])
+        with open(output_path) as output_file:
+            assert_equal("<p>Walking on imported air</p>", output_file.read())
+
+
+def test_batch_mode_reports_failures_with_path_and_continues():
+    with tempman.create_temp_dir() as input_dir, tempman.create_temp_dir() as output_dir:
+        with open(os.path.join(input_dir.path, "broken.docx"), "w") as broken_file:
+            broken_file.write("Not a zip file")
+        shutil.copy(generate_test_path("single-paragraph.docx"), os.path.join(input_dir.path, "valid.docx"))
+
+        result = _local.run(
+            ["mammoth", "--batch", input_dir.path, "--output-dir", output_dir.path, "--jobs", "1"],
+            allow_error=True,
+        )
+
+        assert_equal(1, result.return_code)
+        assert b"broken.docx: conversion failed: " in result.stderr_output
+        assert_equal(["valid.html"], os.listdir(output_dir.path))
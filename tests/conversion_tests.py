@@ -5,7 +5,7 @@ from __future__ import unicode_literals
 import io
 
 from mammoth import documents, results, html
-from mammoth.conversion import convert_document_element_to_html, _comment_author_label
+from mammoth.conversion import convert_document_element_to_html, iter_convert_document_to_html, _comment_author_label
 from mammoth.docx.xmlparser import parse_xml
 from mammoth.styles.parser import read_style_mapping
 from .testing import assert_equal
@@ -259,6 +259,42 @@ def test_highlighted_runs_can_be_configured_with_style_mapping_for_all_highlight
     assert_equal("<mark>Hello</mark>", result.value)
 
 
+def test_runs_with_the_same_properties_are_wrapped_in_the_same_elements():
+    result = convert_document_element_to_html(
+        documents.paragraph(children=[
+            documents.run(children=[documents.text("One")], is_bold=True, is_italic=True),
+            documents.run(children=[documents.text("Two")], is_bold=True),
+            documents.run(children=[documents.text("Three")], is_bold=True, is_italic=True),
+        ]),
+    )
+    assert_equal("<p><strong><em>One</em>Two<em>Three</em></strong></p>", result.value)
+
+
+def test_warning_is_emitted_if_run_style_is_unrecognised():
+    result = convert_document_element_to_html(
+        documents.paragraph(children=[
+            documents.run(children=[documents.text("One")], style_id="Emphasis", style_name="Emphasis"),
+            documents.run(children=[documents.text("Two")], style_id="Emphasis", style_name="Emphasis"),
+        ]),
+    )
+    assert_equal("<p>OneTwo</p>", result.value)
+    warning = results.warning("Unrecognised run style: Emphasis (Style ID: Emphasis)")
+    assert_equal([warning], result.messages)
+
+
+def test_when_run_property_is_ignored_then_run_contents_are_not_converted():
+    result = convert_document_element_to_html(
+        documents.paragraph(children=[
+            documents.run(children=[documents.text("Hidden"), documents.note_reference("footnote", "4")], highlight="yellow", is_bold=True),
+            documents.run(children=[documents.text("Shown")], is_bold=True),
+        ]),
+        style_map=[
+            _style_mapping("highlight => !"),
+        ],
+    )
+    assert_equal("<p><strong>Shown</strong></p>", result.value)
+
+
 def test_highlighted_runs_can_be_configured_with_style_mapping_for_specific_highlight_color():
     result = convert_document_element_to_html(
         documents.paragraph(children=[
@@ -549,6 +585,27 @@ def test_images_have_alt_tags_if_available():
     assert_equal('It\'s a hat', image_html.attributes["alt"])
 
 
+def test_images_with_the_same_contents_are_only_encoded_once():
+    opened = []
+
+    def open_image():
+        opened.append(True)
+        return io.BytesIO(b"abc")
+
+    images = [
+        documents.image(alt_text=None, content_type="image/png", open=open_image, is_embedded=True),
+        documents.image(alt_text="Hat", content_type="image/png", open=open_image, is_embedded=True),
+    ]
+    result = convert_document_element_to_html(documents.paragraph(images))
+    assert_equal(
+        '<p><img src="data:image/png;base64,YWJj" /><img alt="Hat" src="data:image/png;base64,YWJj" /></p>',
+        result.value,
+    )
+    # Each image is opened to hash its contents, but only the first image is
+    # opened again to be encoded.
+    assert_equal(3, len(opened))
+
+
 def test_can_define_custom_conversion_for_images():
     def convert_image(image):
         with image.open() as image_file:
@@ -635,6 +692,64 @@ def test_comment_references_are_linked_to_comment_after_main_body():
     assert_equal(expected_html, result.value)
 
 
+class IterConvertDocumentToHtmlTests(object):
+    def test_each_top_level_element_is_yielded_once_it_cannot_be_collapsed(self):
+        chunks = self._convert([
+            results.success([_paragraph_with_text("One")]),
+            results.success([_paragraph_with_text("Two")]),
+        ])
+
+        assert_equal(["<p>One</p>", "<p>Two</p>"], [chunk.value for chunk in chunks])
+
+    def test_pending_element_is_collapsed_with_elements_in_later_chunks(self):
+        list_item = lambda text: documents.paragraph(
+            children=[_run_with_text(text)],
+            numbering=documents.numbering_level(level_index=0, is_ordered=False),
+        )
+
+        chunks = self._convert(
+            [
+                results.success([list_item("One")]),
+                results.success([list_item("Two")]),
+                results.success([_paragraph_with_text("Three")]),
+            ],
+            style_map=[_style_mapping("p:unordered-list(1) => ul > li:fresh")],
+        )
+
+        assert_equal(
+            "<ul><li>One</li><li>Two</li></ul><p>Three</p>",
+            "".join(chunk.value for chunk in chunks),
+        )
+        assert_equal("<ul><li>One</li><li>Two</li></ul>", chunks[-2].value)
+
+    def test_notes_are_written_at_end(self):
+        note = documents.note("footnote", "4", [_paragraph_with_text("Note")])
+        chunks = self._convert(
+            [
+                results.success([documents.paragraph([documents.note_reference("footnote", "4")])]),
+                results.success([_paragraph_with_text("Two")]),
+            ],
+            notes=documents.notes([note]),
+        )
+
+        assert_equal(
+            '<p>Two</p><ol><li id="footnote-4"><p>Note <a href="#footnote-ref-4">↑</a></p></li></ol>',
+            chunks[-1].value,
+        )
+
+    def test_messages_are_included_in_next_chunk_after_they_are_generated(self):
+        chunks = self._convert([
+            results.success([_paragraph_with_text("One")]),
+            results.Result([_paragraph_with_text("Two")], [results.warning("Two warning")]),
+        ])
+
+        assert_equal([[results.warning("Two warning")], []], [chunk.messages for chunk in chunks])
+
+    def _convert(self, children_results, notes=None, **kwargs):
+        document = documents.document([], notes=notes)
+        return list(iter_convert_document_to_html(document, children_results, **kwargs))
+
+
 def test_when_initials_are_not_blank_then_comment_author_label_is_initials():
     assert_equal("TP", _comment_author_label(documents.comment(
         comment_id="0",
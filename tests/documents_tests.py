@@ -0,0 +1,81 @@
+import pickle
+
+from mammoth import documents
+from .testing import assert_equal
+
+
+def test_document_elements_do_not_have_instance_dictionaries():
+    elements = [
+        documents.paragraph([]),
+        documents.run([]),
+        documents.text("Hello"),
+        documents.table_cell([]),
+        documents.hyperlink([], href="http://example.com"),
+    ]
+    for element in elements:
+        assert not hasattr(element, "__dict__"), element
+
+
+def test_runs_with_the_same_formatting_share_run_properties():
+    first = documents.run([documents.text("One")], is_bold=True, font="Arial")
+    second = documents.run([documents.text("Two")], is_bold=True, font="Arial")
+    assert first.properties is second.properties
+
+
+def test_runs_with_unhashable_formatting_are_not_interned():
+    run = documents.run([], font=["Arial"])
+    assert_equal(["Arial"], run.font)
+
+
+def test_run_properties_are_available_as_attributes():
+    run = documents.run([], style_id="Emphasis", is_italic=True, highlight="yellow")
+    assert_equal("Emphasis", run.style_id)
+    assert_equal(True, run.is_italic)
+    assert_equal(False, run.is_bold)
+    assert_equal("yellow", run.highlight)
+
+
+def test_copying_run_replaces_properties_and_children():
+    run = documents.run([documents.text("One")], is_bold=True)
+
+    copied = run.copy(is_italic=True, children=[documents.text("Two")])
+
+    assert_equal(documents.run([documents.text("Two")], is_bold=True, is_italic=True), copied)
+    assert_equal(documents.run([documents.text("One")], is_bold=True), run)
+
+
+def test_runs_are_equal_if_children_and_properties_are_equal():
+    assert_equal(documents.run([documents.text("One")], is_bold=True), documents.run([documents.text("One")], is_bold=True))
+    assert documents.run([documents.text("One")], is_bold=True) != documents.run([documents.text("One")])
+    assert documents.run([documents.text("One")]) != documents.run([documents.text("Two")])
+
+
+def test_documents_can_be_pickled():
+    document = documents.document([
+        documents.paragraph([documents.run([documents.text("Hello")], is_bold=True)]),
+    ])
+    assert_equal(document, pickle.loads(pickle.dumps(document)))
+
+
+def test_comments_can_be_used_as_a_list_of_comments():
+    first = documents.comment("1", [])
+    second = documents.comment("2", [])
+    comments = documents.document([], comments=[first, second]).comments
+
+    assert_equal(2, len(comments))
+    assert_equal(second, comments[-1])
+    assert_equal([first], comments[:1])
+    assert_equal([first, second, first], comments + [first])
+    assert_equal([first, first, second], [first] + comments)
+    assert_equal(1, comments.index(second))
+    assert second in comments
+    assert_equal([first, second], comments)
+    assert_equal(first, comments.find_comment("1"))
+
+
+def test_comments_can_be_created_from_generator():
+    comment = documents.comment("1", [])
+    comments = documents.document([], comments=(comment for comment in [comment])).comments
+
+    assert_equal([comment], comments)
+    assert_equal(comment, comments.find_comment("1"))
@@ -427,6 +427,106 @@ class RunTests(object):
         return _read_and_get_document_xml_element(run_xml, styles=styles)
 
 
+class PropertiesCacheTests(object):
+    def test_runs_with_structurally_equal_properties_share_read_properties(self):
+        reader = _create_body_reader()
+        runs_xml = [
+            _run_with_properties([xml_element("w:b"), xml_element("w:sz", {"w:val": "28"})])
+            for _ in range(3)
+        ]
+
+        result = reader.read_all(runs_xml)
+
+        assert_equal([True, True, True], [run.is_bold for run in result.value])
+        assert_equal([14, 14, 14], [run.font_size for run in result.value])
+        assert_equal((2, 1, 1), reader.properties_cache_info()["run"])
+
+    def test_runs_with_different_properties_are_read_separately(self):
+        reader = _create_body_reader()
+        runs_xml = [
+            _run_with_properties([xml_element("w:sz", {"w:val": "28"})]),
+            _run_with_properties([xml_element("w:sz", {"w:val": "24"})]),
+            _run_with_properties([xml_element("w:i")]),
+            xml_element("w:r"),
+        ]
+
+        result = reader.read_all(runs_xml)
+
+        assert_equal([14, 12, None, None], [run.font_size for run in result.value])
+        assert_equal([False, False, True, False], [run.is_italic for run in result.value])
+        assert_equal((0, 4, 4), reader.properties_cache_info()["run"])
+
+    def test_least_recently_used_properties_are_discarded_when_cache_is_full(self):
+        cache = body_xml._PropertiesCache(max_size=2)
+        read = lambda element: element.attributes["w:val"]
+        properties = [xml_element("w:sz", {"w:val": str(size)}) for size in range(3)]
+
+        for element in [properties[0], properties[1], properties[0], properties[2], properties[0], properties[1]]:
+            cache.get(element, read)
+
+        assert_equal((2, 4, 2), cache.info())
+
+    def test_style_warnings_are_emitted_when_properties_are_read_from_cache(self):
+        reader = _create_body_reader(styles=Styles.EMPTY)
+        paragraph_xml = _paragraph_with_style_id("Heading1")
+
+        first_result = reader.read_all([paragraph_xml])
+        second_result = reader.read_all([paragraph_xml])
+
+        expected_warning = results.warning("Paragraph style with ID Heading1 was referenced but not defined in the document")
+        assert_equal([expected_warning], first_result.messages)
+        assert_equal([expected_warning], second_result.messages)
+        assert_equal("Heading1", second_result.value[0].style_id)
+        assert_equal((1, 1, 1), reader.properties_cache_info()["paragraph"])
+
+    def test_paragraphs_with_cached_properties_have_numbering(self):
+        numbering = _NumberingMap({
+            "42": {"1": documents.numbering_level("1", is_ordered=True)},
+        })
+        properties_xml = xml_element("w:pPr", {}, [
+            xml_element("w:numPr", {}, [
+                xml_element("w:ilvl", {"w:val": "1"}),
+                xml_element("w:numId", {"w:val": "42"}),
+            ]),
+        ])
+        paragraphs_xml = [xml_element("w:p", {}, [properties_xml]) for _ in range(2)]
+
+        reader = _create_body_reader(numbering=numbering)
+        result = reader.read_all(paragraphs_xml)
+
+        assert_equal(
+            [documents.numbering_level("1", is_ordered=True)] * 2,
+            [paragraph.numbering for paragraph in result.value],
+        )
+        assert_equal((1, 1, 1), reader.properties_cache_info()["paragraph"])
+
+    def test_deleted_paragraphs_with_cached_properties_are_still_deleted(self):
+        def deleted_paragraph(text):
+            return xml_element("w:p", {}, [
+                xml_element("w:pPr", {}, [
+                    xml_element("w:rPr", {}, [xml_element("w:del")]),
+                ]),
+                _run_element_with_text(text),
+            ])
+
+        reader = _create_body_reader()
+        result = reader.read_all([
+            deleted_paragraph("One"),
+            deleted_paragraph("Two"),
+            _paragraph_element_with_text("Three"),
+        ])
+
+        assert_equal(1, len(result.value))
+        assert_equal(
+            ["One", "Two", "Three"],
+            [run.children[0].value for run in result.value[0].children],
+        )
+
+
+def _run_with_properties(properties):
+    return xml_element("w:r", {}, [xml_element("w:rPr", {}, properties)])
+
+
 class ComplexFieldTests(object):
     _URI = "http://example.com"
     _BEGIN_COMPLEX_FIELD = xml_element("w:r", {}, [
@@ -1439,6 +1539,7 @@ class ImageTests(object):
         assert_equal("image/png", image.content_type)
         with image.open() as image_file:
             assert_equal(self.IMAGE_BYTES, image_file.read())
+        assert_equal(True, image.is_embedded)
 
     def test_when_imagedata_element_has_no_relationship_id_then_it_is_ignored_with_warning(self):
         imagedata_element = xml_element("v:imagedata")
@@ -1654,6 +1755,34 @@ def test_unrecognised_elements_emit_warning():
     expected_warning = results.warning("An unrecognised element was ignored: w:huh")
     assert_equal([expected_warning], result.messages)
 
+def test_messages_from_nested_elements_are_in_document_order():
+    table_xml = xml_element("w:tbl", {}, [
+        xml_element("w:tr", {}, [
+            xml_element("w:tc", {}, [
+                xml_element("w:p", {}, [xml_element("w:one")]),
+                xml_element("w:two"),
+            ]),
+        ]),
+    ])
+    reader = _create_body_reader()
+
+    result = reader.read_all([table_xml, xml_element("w:three")])
+
+    assert_equal([
+        results.warning("An unrecognised element was ignored: w:one"),
+        results.warning("An unrecognised element was ignored: w:two"),
+        results.warning("An unrecognised element was ignored: w:three"),
+    ], result.messages)
+
+def test_messages_are_not_shared_between_reads():
+    reader = _create_body_reader()
+
+    first_result = reader.read_all([xml_element("w:one")])
+    second_result = reader.read_all([xml_element("w:two")])
+
+    assert_equal([results.warning("An unrecognised element was ignored: w:one")], first_result.messages)
+    assert_equal([results.warning("An unrecognised element was ignored: w:two")], second_result.messages)
+
 def test_unrecognised_elements_are_ignored():
     element = xml_element("w:huh", {}, [])
     assert_equal(None, _read_document_xml_element(element).value)
@@ -2,7 +2,7 @@ import pytest
 
 from mammoth import documents
 from mammoth.docx.xmlparser import element as xml_element, text as xml_text
-from mammoth.docx.document_xml import read_document_xml_element
+from mammoth.docx.document_xml import read_document_xml_element, read_document_xml_body_children
 from mammoth.docx import body_xml
 from ..testing import assert_equal
 
@@ -44,6 +44,80 @@ def test_footnotes_of_document_are_read():
     assert isinstance(footnote.body[0], documents.Paragraph)
 
 
+class ReadDocumentXmlBodyChildrenTests(object):
+    def test_children_of_body_are_read(self):
+        text_xml = xml_element("w:t", {}, [xml_text("Hello!")])
+        run_xml = xml_element("w:r", {}, [text_xml])
+        paragraph_xml = xml_element("w:p", {}, [run_xml])
+
+        children = _read_and_get_document_xml_body_children([
+            ("start", xml_element("w:body")),
+            ("child", paragraph_xml),
+        ])
+
+        assert_equal(
+            [[documents.paragraph([documents.run([documents.text("Hello!")])])]],
+            children
+        )
+
+    def test_when_body_element_is_not_present_then_error_is_raised(self):
+        error = pytest.raises(ValueError, lambda: _read_and_get_document_xml_body_children([]))
+
+        assert_equal(str(error.value), "Could not find the body element: are you sure this is a docx file?")
+
+    def test_deleted_paragraph_contents_are_combined_with_next_child(self):
+        deleted_paragraph_xml = xml_element("w:p", {}, [
+            xml_element("w:pPr", {}, [
+                xml_element("w:rPr", {}, [xml_element("w:del")]),
+            ]),
+            xml_element("w:r", {}, [xml_element("w:t", {}, [xml_text("One")])]),
+        ])
+        paragraph_xml = xml_element("w:p", {}, [
+            xml_element("w:r", {}, [xml_element("w:t", {}, [xml_text("Two")])]),
+        ])
+
+        children = _read_and_get_document_xml_body_children([
+            ("start", xml_element("w:body")),
+            ("child", deleted_paragraph_xml),
+            ("child", paragraph_xml),
+        ])
+
+        assert_equal(
+            [
+                [],
+                [
+                    documents.paragraph([
+                        documents.run([documents.text("One")]),
+                        documents.run([documents.text("Two")]),
+                    ]),
+                ],
+            ],
+            children
+        )
+
+    def test_messages_are_included_in_result_for_each_child(self):
+        body_reader = body_xml.reader()
+        results = list(read_document_xml_body_children(
+            [
+                ("start", xml_element("w:body")),
+                ("child", xml_element("w:unknown")),
+            ],
+            body_reader=body_reader,
+        ))
+        assert_equal(
+            ["An unrecognised element was ignored: w:unknown"],
+            [message.message for message in results[0].messages],
+        )
+
+
+def _read_and_get_document_xml_body_children(*args, **kwargs):
+    body_reader = body_xml.reader()
+    results = list(read_document_xml_body_children(*args, body_reader=body_reader, **kwargs))
+    for result in results:
+        assert_equal([], result.messages)
+    return [result.value for result in results]
+
+
 def _read_and_get_document_xml_element(*args, **kwargs):
     body_reader = body_xml.reader()
     result = read_document_xml_element(*args, body_reader=body_reader, **kwargs)
@@ -1,8 +1,10 @@
+import concurrent.futures
 import io
 import textwrap
 import zipfile
 
 from mammoth import docx, documents, zips
+from mammoth.caches import PartCache, PartCacheInfo
 from ..testing import assert_equal, assert_raises, generate_test_path
 
 
@@ -19,6 +21,52 @@ class ReadTests(object):
             ])
             assert_equal(expected_document, result.value)
 
+    def test_parts_are_submitted_to_executor_if_set(self):
+        executor = _RecordingExecutor()
+        with open(generate_test_path("footnotes.docx"), "rb") as fileobj:
+            result = docx.read(fileobj=fileobj, executor=executor)
+
+        assert_equal(6, executor.submission_count)
+        assert_equal("1", result.value.notes.find_note("footnote", "1").note_id)
+
+    def test_can_read_document_incrementally(self):
+        with open(generate_test_path("single-paragraph.docx"), "rb") as fileobj:
+            parts = list(docx.iter_read(fileobj=fileobj))
+
+        assert_equal(documents.document([]), parts[0].value)
+        assert_equal(
+            [documents.paragraph([documents.run([documents.text("Walking on imported air")])])],
+            [element for part in parts[1:] for element in part.value],
+        )
+
+
+class PartCacheTests(object):
+    def test_parts_with_the_same_contents_are_read_once(self):
+        part_cache = PartCache()
+        for _ in range(2):
+            zip_file = zips.open_zip(_create_zip({"word/_rels/document.xml.rels": _relationships_xml("a.xml")}), "r")
+            relationships = docx._read_relationships(zip_file, "word/_rels/document.xml.rels", part_cache=part_cache)
+            assert_equal(["a.xml"], relationships.find_targets_by_type("t"))
+
+        assert_equal(PartCacheInfo(hits=1, misses=1, size=1), part_cache.info())
+
+    def test_parts_with_different_contents_are_read_separately(self):
+        part_cache = PartCache()
+        for target in ["a.xml", "b.xml"]:
+            zip_file = zips.open_zip(_create_zip({"word/_rels/document.xml.rels": _relationships_xml(target)}), "r")
+            relationships = docx._read_relationships(zip_file, "word/_rels/document.xml.rels", part_cache=part_cache)
+            assert_equal([target], relationships.find_targets_by_type("t"))
+
+        assert_equal(2, part_cache.info().misses)
+
+
+def _relationships_xml(target):
+    return (
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Type="t" Target="{0}" Id="rId1"/>'
+        '</Relationships>'
+    ).format(target)
+
 
 _relationship_namespaces = {
     "r": "http://schemas.openxmlformats.org/package/2006/relationships",
@@ -173,3 +221,14 @@ def _create_zip(files):
 
     fileobj.seek(0)
     return fileobj
+
+
+class _RecordingExecutor(object):
+    def __init__(self):
+        self.submission_count = 0
+
+    def submit(self, func, *args, **kwargs):
+        self.submission_count += 1
+        future = concurrent.futures.Future()
+        future.set_result(func(*args, **kwargs))
+        return future
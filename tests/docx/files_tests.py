@@ -1,3 +1,5 @@
+import io
+
 from mammoth.docx.files import ExternalFileAccessIsDisabledError, Files, InvalidFileReferenceError
 from ..testing import generate_test_path, assert_equal, assert_raises
 
@@ -54,3 +56,27 @@ def test_error_is_raised_if_file_uri_cannot_be_opened():
     error = assert_raises(InvalidFileReferenceError, lambda: files.open("file:///not-a-real-file.png"))
     expected_message = "could not open external image: 'file:///not-a-real-file.png' (document directory: '/tmp')\n"
     assert str(error).startswith(expected_message)
+
+
+def test_fetcher_is_used_to_open_absolute_uris():
+    class Fetcher(object):
+        def open(self, uri):
+            return io.BytesIO(uri.encode("ascii"))
+
+    files = Files(None, external_file_access=True, fetcher=Fetcher())
+    with files.open("http://example.com/image.png") as image_file:
+        assert_equal(b"http://example.com/image.png", image_file.read())
+
+
+def test_error_is_raised_if_fetcher_cannot_open_uri():
+    class Fetcher(object):
+        def open(self, uri):
+            raise IOError("HTTP error 404")
+
+    files = Files("/tmp", external_file_access=True, fetcher=Fetcher())
+    error = assert_raises(InvalidFileReferenceError, lambda: files.open("http://example.com/image.png"))
+    expected_message = (
+        "could not open external image: 'http://example.com/image.png' (document directory: '/tmp')\n" +
+        "HTTP error 404"
+    )
+    assert_equal(expected_message, str(error))
@@ -1,6 +1,6 @@
 import io
 
-from mammoth.docx.xmlparser import parse_xml, element as xml_element, text as xml_text
+from mammoth.docx.xmlparser import index_xml_children, parse_xml, parse_xml_children, element as xml_element, text as xml_text
 from ..testing import assert_equal
 
 
@@ -54,6 +54,104 @@ def test_whitespace_between_xml_declaration_and_root_tag_is_ignored():
     assert_equal("body", xml.name)
 
 
+def test_default_namespace_is_mapped_to_prefix():
+    xml = _parse_xml_string(b'<body xmlns="word"><p/></body>', [("x", "word")])
+    assert_equal(xml_element("x:body", {}, [xml_element("x:p")]), xml)
+
+
+def test_text_split_across_reads_is_combined_into_single_text_node():
+    xml = parse_xml(_ChunkedReader(b"<body>Hello world!</body>", chunk_size=3))
+    assert_equal(xml_element("body", {}, [xml_text("Hello world!")]), xml)
+
+
+def test_entity_references_are_combined_with_surrounding_text():
+    xml = _parse_xml_string(b"<body>1 &lt; 2 &amp; 3</body>")
+    assert_equal(xml_element("body", {}, [xml_text("1 < 2 & 3")]), xml)
+
+
+def test_cdata_sections_are_ignored():
+    xml = _parse_xml_string(b"<body>a<![CDATA[b]]>c</body>")
+    assert_equal(xml_element("body", {}, [xml_text("a"), xml_text("c")]), xml)
+
+
+def test_comments_and_processing_instructions_are_ignored_but_separate_text_nodes():
+    xml = _parse_xml_string(b"<body>a<!-- b -->c<?d e?>f</body>")
+    assert_equal(xml_element("body", {}, [xml_text("a"), xml_text("c"), xml_text("f")]), xml)
+
+
+class ParseXmlChildrenTests(object):
+    def test_start_of_parent_is_yielded_before_children(self):
+        events = _parse_xml_children_string(b"<document><body><p/><p/></body></document>", ["body"])
+        assert_equal(
+            [
+                ("start", xml_element("body")),
+                ("child", xml_element("p")),
+                ("child", xml_element("p")),
+            ],
+            events,
+        )
+
+    def test_children_include_their_descendants(self):
+        events = _parse_xml_children_string(b"<document><body><p><r>Hello</r></p></body></document>", ["body"])
+        assert_equal(
+            ("child", xml_element("p", {}, [xml_element("r", {}, [xml_text("Hello")])])),
+            events[1],
+        )
+
+    def test_text_directly_inside_parent_is_ignored(self):
+        events = _parse_xml_children_string(b"<document><body> <p/> </body></document>", ["body"])
+        assert_equal([("start", xml_element("body")), ("child", xml_element("p"))], events)
+
+    def test_when_parent_is_missing_then_no_events_are_yielded(self):
+        events = _parse_xml_children_string(b"<document><body2><p/></body2></document>", ["body"])
+        assert_equal([], events)
+
+    def test_only_first_matching_parent_is_streamed(self):
+        events = _parse_xml_children_string(b"<document><body><p/></body><body><p/></body></document>", ["body"])
+        assert_equal([("start", xml_element("body")), ("child", xml_element("p"))], events)
+
+    def test_names_in_path_are_mapped_using_namespace_map(self):
+        events = _parse_xml_children_string(
+            b'<w:document xmlns:w="word"><w:body><w:p/></w:body></w:document>',
+            ["x:body"],
+            [("x", "word")],
+        )
+        assert_equal([("start", xml_element("x:body")), ("child", xml_element("x:p"))], events)
+
+
+class IndexXmlChildrenTests(object):
+    def test_children_of_root_are_found_without_their_descendants(self):
+        index = index_xml_children(b'<body id="1"><p id="2"><r/></p><p id="3"/></body>')
+        assert_equal(xml_element("body", {"id": "1"}), index.root)
+        assert_equal([xml_element("p", {"id": "2"}), xml_element("p", {"id": "3"})], index.children)
+
+    def test_parsing_child_parses_its_descendants(self):
+        xml = b'<body><p id="1"><r>One</r></p><p id="2"><r>Two</r><r/></p><p/></body>'
+        index = index_xml_children(xml)
+        assert_equal(_parse_xml_string(xml).children, [index.parse_child(position) for position in range(3)])
+
+    def test_children_are_parsed_using_namespaces_declared_on_root(self):
+        index = index_xml_children(
+            b'<w:body xmlns:w="word" xmlns="default" xmlns:q="&quot;quoted&quot;"><w:p><r/><q:r/></w:p></w:body>',
+            [("w", "word")],
+        )
+        assert_equal(
+            xml_element("w:p", {}, [xml_element("{default}r"), xml_element('{"quoted"}r')]),
+            index.parse_child(0),
+        )
+
+    def test_children_are_parsed_using_encoding_of_document(self):
+        xml = '<?xml version="1.0" encoding="iso-8859-1"?><body><p><r>caf\u00e9 &gt; <![CDATA[>]]></r></p></body>'
+        index = index_xml_children(xml.encode("iso-8859-1"))
+        assert_equal(
+            xml_element("p", {}, [xml_element("r", {}, [xml_text("caf\u00e9 > ")])]),
+            index.parse_child(0),
+        )
+
+    def test_documents_encoded_using_utf16_are_not_indexed(self):
+        assert_equal(None, index_xml_children('<body><p/></body>'.encode("utf-16")))
+
+
 class FindChildTests(object):
     def test_returns_none_if_no_children(self):
         xml = xml_element("a")
@@ -71,6 +169,66 @@ class FindChildTests(object):
         xml = xml_element("a", {}, [xml_text("Hello!")])
         assert_equal(None, xml.find_child("b"))
 
+    def test_returns_first_matching_child_of_element_with_many_children(self):
+        xml = xml_element("a", {}, [xml_text("Hello!")] + [
+            xml_element("c{0}".format(index), {"id": index})
+            for index in range(20)
+        ] + [xml_element("c3", {"id": "repeated"})])
+        assert_equal(3, xml.find_child("c3").attributes["id"])
+        assert_equal(None, xml.find_child("d"))
+
+    def test_when_children_of_element_are_replaced_then_new_children_are_found(self):
+        xml = xml_element("a", {}, [xml_element("b{0}".format(index)) for index in range(20)])
+        assert_equal(xml_element("b1"), xml.find_child("b1"))
+
+        xml.children = [xml_element("b{0}".format(index), {"new": "true"}) for index in range(20)]
+
+        assert_equal(xml_element("b1", {"new": "true"}), xml.find_child("b1"))
+
+
+class FindChildrenTests(object):
+    def test_returns_matching_children_in_order(self):
+        xml = xml_element("a", {}, [
+            xml_element("b", {"id": 1}),
+            xml_text("Hello!"),
+            xml_element("c"),
+            xml_element("b", {"id": 2}),
+        ])
+        assert_equal([1, 2], [child.attributes["id"] for child in xml.find_children("b")])
+
+    def test_returns_matching_children_of_element_with_many_children_in_order(self):
+        xml = xml_element("a", {}, [
+            xml_element("b" if index % 3 == 0 else "c", {"id": index})
+            for index in range(20)
+        ])
+        assert_equal([0, 3, 6, 9, 12, 15, 18], [child.attributes["id"] for child in xml.find_children("b")])
+
+
+class NodeTests(object):
+    def test_parsed_nodes_do_not_have_instance_dictionaries(self):
+        xml = _parse_xml_string(b"<a><b>Hello</b></a>")
+        assert not hasattr(xml, "__dict__")
+        assert not hasattr(xml.children[0].children[0], "__dict__")
+
+    def test_names_are_interned(self):
+        first = _parse_xml_string(b'<body xmlns="word"><p id="1"/></body>', [("w", "word")])
+        second = _parse_xml_string(b'<body xmlns="word"><p id="2"/></body>', [("w", "word")])
+        assert first.children[0].name is second.children[0].name
+        assert list(first.children[0].attributes)[0] is list(second.children[0].attributes)[0]
+
 
 def _parse_xml_string(string, namespace_mapping=None):
     return parse_xml(io.BytesIO(string), namespace_mapping)
+
+
+def _parse_xml_children_string(string, parent_path, namespace_mapping=None):
+    return list(parse_xml_children(io.BytesIO(string), parent_path, namespace_mapping))
+
+
+class _ChunkedReader(object):
+    def __init__(self, value, chunk_size):
+        self._fileobj = io.BytesIO(value)
+        self._chunk_size = chunk_size
+
+    def read(self, size=-1):
+        return self._fileobj.read(self._chunk_size)
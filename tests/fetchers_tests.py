@@ -0,0 +1,215 @@
+import contextlib
+import hashlib
+import http.server
+import threading
+
+import tempman
+
+import mammoth
+from mammoth.fetchers import CachingFetcher, FetcherInfo
+from .testing import assert_equal, assert_raises, external_picture_docx, generate_test_path
+
+
+def test_file_is_fetched_over_http():
+    with _server({"/image.png": b"image"}) as server:
+        fetcher = CachingFetcher()
+        with fetcher.open(server.url("/image.png")) as image_file:
+            assert_equal(b"image", image_file.read())
+
+    assert_equal(FetcherInfo(hits=0, revalidated=0, misses=1), fetcher.info())
+
+
+def test_cached_file_is_used_without_request_until_max_age():
+    with _server({"/image.png": b"image"}) as server:
+        fetcher = CachingFetcher(max_age=60)
+        for _ in range(3):
+            with fetcher.open(server.url("/image.png")) as image_file:
+                assert_equal(b"image", image_file.read())
+
+    assert_equal(1, len(server.requests))
+    assert_equal(FetcherInfo(hits=2, revalidated=0, misses=1), fetcher.info())
+
+
+def test_cached_file_is_revalidated_using_etag_after_max_age():
+    with _server({"/image.png": b"image"}) as server:
+        fetcher = CachingFetcher(max_age=0)
+        for _ in range(2):
+            with fetcher.open(server.url("/image.png")) as image_file:
+                assert_equal(b"image", image_file.read())
+
+    assert_equal([None, _etag(b"image")], [request.headers.get("If-None-Match") for request in server.requests])
+    assert_equal(FetcherInfo(hits=0, revalidated=1, misses=1), fetcher.info())
+
+
+def test_changed_file_is_fetched_again_after_max_age():
+    with _server({"/image.png": b"image"}) as server:
+        fetcher = CachingFetcher(max_age=0)
+        fetcher.open(server.url("/image.png")).close()
+        server.files["/image.png"] = b"new image"
+        with fetcher.open(server.url("/image.png")) as image_file:
+            assert_equal(b"new image", image_file.read())
+
+    assert_equal(FetcherInfo(hits=0, revalidated=0, misses=2), fetcher.info())
+
+
+def test_connections_are_reused_for_requests_to_the_same_host():
+    with _server({"/one.png": b"one", "/two.png": b"two"}) as server:
+        fetcher = CachingFetcher()
+        for path in ["/one.png", "/two.png", "/one.png", "/two.png"]:
+            fetcher.open(server.url(path)).close()
+        fetcher.close()
+
+    assert_equal(2, len(server.requests))
+    assert_equal(1, len(set(request.client_address for request in server.requests)))
+
+
+def test_files_are_cached_on_disk_between_fetchers():
+    with tempman.create_temp_dir() as temp_dir:
+        with _server({"/image.png": b"image"}) as server:
+            CachingFetcher(cache_dir=temp_dir.path).open(server.url("/image.png")).close()
+
+            fetcher = CachingFetcher(cache_dir=temp_dir.path, max_age=0)
+            with fetcher.open(server.url("/image.png")) as image_file:
+                assert_equal(b"image", image_file.read())
+
+    assert_equal(FetcherInfo(hits=0, revalidated=1, misses=0), fetcher.info())
+
+
+def test_redirects_are_followed():
+    with _server({"/image.png": b"image"}, redirects={"/old.png": "/image.png"}) as server:
+        with CachingFetcher().open(server.url("/old.png")) as image_file:
+            assert_equal(b"image", image_file.read())
+
+
+def test_redirects_to_uris_other_than_http_are_not_followed():
+    with _server({}, redirects={"/old.png": "file:///etc/passwd"}) as server:
+        error = assert_raises(IOError, lambda: CachingFetcher().open(server.url("/old.png")))
+
+    expected_message = "redirect to unsupported URI file:///etc/passwd when fetching {0}".format(server.url("/old.png"))
+    assert_equal(expected_message, str(error))
+
+
+def test_error_is_raised_if_there_are_too_many_redirects():
+    redirects = dict(("/{0}.png".format(index), "/{0}.png".format(index + 1)) for index in range(10))
+    with _server({"/10.png": b"image"}, redirects=redirects) as server:
+        error = assert_raises(IOError, lambda: CachingFetcher().open(server.url("/0.png")))
+
+    assert_equal("more than 5 redirects when fetching {0}".format(server.url("/6.png")), str(error))
+
+
+def test_error_is_raised_if_file_is_not_found():
+    with _server({}) as server:
+        error = assert_raises(IOError, lambda: CachingFetcher().open(server.url("/image.png")))
+
+    assert_equal("HTTP error 404 when fetching {0}".format(server.url("/image.png")), str(error))
+
+
+def test_error_is_raised_if_file_is_larger_than_max_file_size():
+    with _server({"/image.png": b"image"}) as server:
+        error = assert_raises(IOError, lambda: CachingFetcher(max_file_size=4).open(server.url("/image.png")))
+
+    assert_equal("file is larger than 4 bytes", str(error))
+
+
+def test_on_fetch_is_called_with_uri_and_outcome():
+    fetches = []
+    with _server({"/image.png": b"image"}) as server:
+        fetcher = CachingFetcher(on_fetch=lambda uri, outcome: fetches.append((uri, outcome)))
+        for _ in range(2):
+            fetcher.open(server.url("/image.png")).close()
+
+    assert_equal([(server.url("/image.png"), "miss"), (server.url("/image.png"), "hit")], fetches)
+
+
+def test_file_uris_are_opened_without_caching():
+    path = generate_test_path("tiny-picture.png")
+    with CachingFetcher().open("file://" + path) as image_file:
+        with open(path, "rb") as source_file:
+            assert_equal(source_file.read(), image_file.read())
+
+
+def test_fetcher_is_used_to_fetch_linked_images_when_converting():
+    with open(generate_test_path("tiny-picture.png"), "rb") as image_file:
+        image = image_file.read()
+
+    with _server({"/tiny-picture.png": image}) as server:
+        fetcher = CachingFetcher()
+        for _ in range(2):
+            fileobj = external_picture_docx(server.url("/tiny-picture.png"))
+            result = mammoth.convert_to_html(fileobj, external_file_access=True, fetcher=fetcher)
+            assert_equal(True, result.value.startswith('<p><img src="data:image/png;base64,iVBORw0KGgo'))
+            assert_equal([], result.messages)
+
+    assert_equal(1, len(server.requests))
+    assert_equal(1, fetcher.info().misses)
+
+
+def _etag(contents):
+    return '"{0}"'.format(hashlib.sha256(contents).hexdigest())
+
+
+class _Server(object):
+    def __init__(self, files, redirects):
+        self.files = files
+        self.redirects = redirects
+        self.requests = []
+        self.port = None
+
+    def url(self, path):
+        return "http://127.0.0.1:{0}{1}".format(self.port, path)
+
+
+class _Request(object):
+    def __init__(self, path, headers, client_address):
+        self.path = path
+        self.headers = headers
+        self.client_address = client_address
+
+
+@contextlib.contextmanager
+def _server(files, redirects=None):
+    server = _Server(files, redirects or {})
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            server.requests.append(_Request(self.path, dict(self.headers), self.client_address))
+
+            if self.path in server.redirects:
+                self._respond(302, {"Location": server.redirects[self.path]})
+                return
+
+            contents = server.files.get(self.path)
+            if contents is None:
+                self._respond(404)
+                return
+
+            etag = _etag(contents)
+            if self.headers.get("If-None-Match") == etag:
+                self._respond(304, {"ETag": etag})
+            else:
+                self._respond(200, {"ETag": etag}, contents)
+
+        def _respond(self, status, headers=None, contents=b""):
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(contents)))
+            self.end_headers()
+            self.wfile.write(contents)
+
+        def log_message(self, *args):
+            pass
+
+    http_server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    http_server.daemon_threads = True
+    server.port = http_server.server_address[1]
+    thread = threading.Thread(target=http_server.serve_forever, kwargs={"poll_interval": 0.01})
+    thread.start()
+    try:
+        yield server
+    finally:
+        http_server.shutdown()
+        http_server.server_close()
+        thread.join()
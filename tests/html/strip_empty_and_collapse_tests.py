@@ -0,0 +1,70 @@
+import random
+
+from mammoth import html
+from ..testing import assert_equal
+
+
+def test_empty_elements_are_stripped_before_collapsing():
+    assert_equal(
+        [html.collapsible_element("p", {}, [html.text("One"), html.text("Two")])],
+        html.strip_empty_and_collapse([
+            html.collapsible_element("p", {}, [html.text("One")]),
+            html.element("div", {}, [html.text("")]),
+            html.collapsible_element("p", {}, [html.text("Two")]),
+        ]))
+
+
+def test_children_of_collapsed_elements_are_collapsed():
+    assert_equal(
+        [html.collapsible_element("ol", {}, [
+            html.collapsible_element("li", {}, [html.text("One"), html.text("Two")]),
+        ])],
+        html.strip_empty_and_collapse([
+            html.collapsible_element("ol", {}, [
+                html.collapsible_element("li", {}, [html.text("One")]),
+            ]),
+            html.collapsible_element("ol", {}, [
+                html.collapsible_element("li", {}, [html.text("Two")]),
+                html.element("span"),
+            ]),
+        ]))
+
+
+def test_original_nodes_are_not_modified():
+    first = html.collapsible_element("p", {}, [html.text("One")])
+    second = html.collapsible_element("p", {}, [html.text("Two")])
+
+    html.strip_empty_and_collapse([first, second])
+
+    assert_equal(html.collapsible_element("p", {}, [html.text("One")]), first)
+    assert_equal(html.collapsible_element("p", {}, [html.text("Two")]), second)
+
+
+def test_result_is_the_same_as_stripping_empty_nodes_then_collapsing():
+    generator = random.Random(42)
+    for _ in range(500):
+        nodes = _generate_nodes(generator, depth=4)
+        assert_equal(
+            html.collapse(html.strip_empty(nodes)),
+            html.strip_empty_and_collapse(nodes),
+        )
+
+
+def _generate_nodes(generator, depth):
+    return [_generate_node(generator, depth) for _ in range(generator.randint(0, 4))]
+
+
+def _generate_node(generator, depth):
+    kind = generator.choice(["text", "text", "element", "element", "element", "force_write"])
+    if kind == "text":
+        return html.text(generator.choice(["", "a", "b"]))
+    elif kind == "force_write" or depth == 0:
+        return html.force_write
+    else:
+        return html.element(
+            generator.choice([["p"], ["p", "div"], ["img"], ["br"], ["ol"]]),
+            generator.choice([{}, {"class": "x"}]),
+            _generate_nodes(generator, depth - 1),
+            collapsible=generator.choice([True, False]),
+            separator=generator.choice([None, "", "\n"]),
+        )
@@ -1,8 +1,10 @@
 import io
 
-from precisely import assert_that, has_attrs, is_sequence
+from precisely import anything, assert_that, equal_to, has_attrs, is_sequence
 
 import mammoth
+from mammoth.writers.html import HtmlWriter
+from .testing import assert_equal
 
 
 def test_inline_is_available_as_alias_of_img_element():
@@ -24,6 +26,46 @@ def test_data_uri_encodes_images_in_base64():
     ))
 
 
+class StreamingDataUriTests:
+    def test_written_output_matches_data_uri(self):
+        # Not a multiple of the read size or of three
+        image_bytes = bytes(bytearray(range(256))) * 1000 + b"x"
+        image = _image(is_embedded=True, image_bytes=image_bytes)
+
+        assert_equal(
+            _write_html(mammoth.images.data_uri(image)),
+            _write_html(mammoth.images.streaming_data_uri(image)),
+        )
+
+    def test_chunks_are_encoded_correctly_when_reads_return_fewer_bytes_than_requested(self):
+        image_bytes = b"abcdefghij" * 100
+
+        class ShortReader(io.BytesIO):
+            def read(self, size=-1):
+                return super(ShortReader, self).read(min(size, 7))
+
+        image = mammoth.documents.Image(
+            alt_text=None,
+            content_type="image/png",
+            open=lambda: ShortReader(image_bytes),
+            is_embedded=True,
+        )
+
+        assert_equal(
+            _write_html(mammoth.images.data_uri(image)),
+            _write_html(mammoth.images.streaming_data_uri(image)),
+        )
+
+    def test_images_that_are_not_embedded_are_encoded_immediately(self):
+        image = _image(is_embedded=False)
+
+        result = mammoth.images.streaming_data_uri(image)
+
+        assert_that(result, is_sequence(
+            has_attrs(attributes={"src": "data:image/png;base64,YWJj"}),
+        ))
+
+
 class ImgElementTests:
     def test_when_element_does_not_have_alt_text_then_alt_attribute_is_not_set(self):
         image_bytes = b"abc"
@@ -78,3 +120,53 @@ class ImgElementTests:
         assert_that(result, is_sequence(
             has_attrs(attributes={"alt": "<alt override>", "src": "<src>"}),
         ))
+
+
+class MemoizeTests:
+    def test_images_with_the_same_contents_and_type_are_converted_once(self):
+        converted = []
+
+        def convert_image(image):
+            converted.append(image)
+            return {"src": "{0}.png".format(len(converted))}
+
+        memoized = mammoth.images.memoize(convert_image)
+
+        first = _image(image_bytes=b"abc")
+        second = _image(image_bytes=b"abc")
+        third = _image(image_bytes=b"def")
+        svg = _image(image_bytes=b"abc", content_type="image/svg+xml")
+
+        assert_that(
+            [memoized(image) for image in [first, second, third, svg]],
+            is_sequence({"src": "1.png"}, {"src": "1.png"}, {"src": "2.png"}, {"src": "3.png"}),
+        )
+
+    def test_converted_images_can_be_shared_using_cache(self):
+        cache = {}
+        converted = []
+
+        def convert_image(image):
+            converted.append(image)
+            return {"src": "{0}.png".format(len(converted))}
+
+        mammoth.images.memoize(convert_image, cache=cache)(_image(image_bytes=b"abc"))
+        result = mammoth.images.memoize(convert_image, cache=cache)(_image(image_bytes=b"abc"))
+
+        assert_that(result, equal_to({"src": "1.png"}))
+        assert_that(converted, is_sequence(anything))
+
+
+def _write_html(nodes):
+    writer = HtmlWriter()
+    mammoth.html.write(writer, nodes)
+    return writer.as_string()
+
+
+def _image(is_embedded=False, content_type="image/png", image_bytes=b"abc"):
+    return mammoth.documents.Image(
+        alt_text=None,
+        content_type=content_type,
+        open=lambda: io.BytesIO(image_bytes),
+        is_embedded=is_embedded,
+    )
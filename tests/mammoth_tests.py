@@ -3,9 +3,15 @@
 from __future__ import unicode_literals
 
 import base64
+import concurrent.futures
 import io
 import shutil
 import os
+import subprocess
+import sys
+import tempfile
+import zipfile
+import zlib
 
 import tempman
 
@@ -22,6 +28,49 @@ def test_docx_containing_one_paragraph_is_converted_to_single_p_element():
         assert_equal([], result.messages)
 
 
+def test_docx_in_spooled_temporary_file_can_be_converted():
+    with tempfile.SpooledTemporaryFile() as fileobj:
+        with open(generate_test_path("single-paragraph.docx"), "rb") as source:
+            shutil.copyfileobj(source, fileobj)
+
+        fileobj.seek(0)
+        result = mammoth.convert_to_html(fileobj=fileobj)
+        assert_equal("<p>Walking on imported air</p>", result.value)
+
+        fileobj.seek(0)
+        result = mammoth.extract_raw_text(fileobj=fileobj)
+        assert_equal("Walking on imported air\n\n", result.value)
+
+
+def test_html_can_be_converted_incrementally():
+    with open(generate_test_path("tables.docx"), "rb") as fileobj:
+        expected_result = mammoth.convert_to_html(fileobj=fileobj)
+
+    with open(generate_test_path("tables.docx"), "rb") as fileobj:
+        chunks = list(mammoth.iter_convert_to_html(fileobj=fileobj))
+
+    assert len(chunks) > 1
+    assert_equal(expected_result.value, "".join(chunk.value for chunk in chunks))
+    assert_equal([], [message for chunk in chunks for message in chunk.messages])
+
+
+def test_importing_mammoth_does_not_load_modules_or_style_maps_until_they_are_needed():
+    program = (
+        "import sys\n"
+        "import mammoth\n"
+        "lazy_modules = [\n"
+        "    'mammoth.docx.dingbats',\n"
+        "    'mammoth.writers.markdown',\n"
+        "    'mammoth.styles.parser',\n"
+        "    'urllib.request',\n"
+        "]\n"
+        "print([name for name in lazy_modules if name in sys.modules])\n"
+        "print(mammoth.options._default_style_map.cache_info().currsize)\n"
+    )
+    output = subprocess.check_output([sys.executable, "-c", program])
+    assert_equal(["[]", "0"], output.decode("ascii").split())
+
+
 def test_can_read_xml_files_with_utf8_bom():
     with open(generate_test_path("utf8-bom.docx"), "rb") as fileobj:
         result = mammoth.convert_to_html(fileobj=fileobj)
@@ -50,6 +99,31 @@ def test_embedded_style_map_is_used_if_present():
         assert_equal([], result.messages)
 
 
+def test_zip_central_directory_is_only_read_once_when_converting():
+    with open(generate_test_path("embedded-style-map.docx"), "rb") as fileobj:
+        single_open_fileobj = _EndSeekCountingFile(fileobj)
+        zipfile.ZipFile(single_open_fileobj, "r")
+
+    with open(generate_test_path("embedded-style-map.docx"), "rb") as fileobj:
+        conversion_fileobj = _EndSeekCountingFile(fileobj)
+        result = mammoth.convert_to_html(fileobj=conversion_fileobj)
+
+    assert_equal("<h1>Walking on imported air</h1>", result.value)
+    assert_equal(single_open_fileobj.end_seek_count, conversion_fileobj.end_seek_count)
+
+
+def test_parts_can_be_read_concurrently_using_executor():
+    with open(generate_test_path("footnotes.docx"), "rb") as fileobj:
+        expected_result = mammoth.convert_to_html(fileobj=fileobj, id_prefix="doc-42-")
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+        with open(generate_test_path("footnotes.docx"), "rb") as fileobj:
+            result = mammoth.convert_to_html(fileobj=fileobj, id_prefix="doc-42-", executor=executor)
+
+    assert_equal(expected_result.value, result.value)
+    assert_equal(expected_result.messages, result.messages)
+
+
 def test_explicit_style_map_takes_precedence_over_embedded_style_map():
     with open(generate_test_path("embedded-style-map.docx"), "rb") as fileobj:
         result = mammoth.convert_to_html(fileobj=fileobj, style_map="p => p")
@@ -57,6 +131,14 @@ def test_explicit_style_map_takes_precedence_over_embedded_style_map():
         assert_equal([], result.messages)
 
 
+def test_compiled_style_map_can_be_used_in_place_of_string():
+    style_map = mammoth.compile_style_map("p => p.compiled")
+    with open(generate_test_path("single-paragraph.docx"), "rb") as fileobj:
+        result = mammoth.convert_to_html(fileobj=fileobj, style_map=style_map)
+        assert_equal('<p class="compiled">Walking on imported air</p>', result.value)
+        assert_equal([], result.messages)
+
+
 def test_explicit_style_map_is_combined_with_embedded_style_map():
     with open(generate_test_path("embedded-style-map.docx"), "rb") as fileobj:
         result = mammoth.convert_to_html(fileobj=fileobj, style_map="r => strong")
@@ -85,6 +167,36 @@ def test_embedded_style_map_can_be_retrieved():
         assert_equal("p => h1", mammoth.read_embedded_style_map(fileobj))
 
 
+def test_embedded_style_map_can_be_written_in_place_to_file_on_disk():
+    with tempman.create_temp_dir() as temp_dir:
+        path = os.path.join(temp_dir.path, "document.docx")
+        shutil.copyfile(generate_test_path("single-paragraph.docx"), path)
+
+        with open(path, "r+b") as fileobj:
+            mammoth.embed_style_map(fileobj, "p => h1", in_place=True)
+        with open(path, "r+b") as fileobj:
+            mammoth.embed_style_map(fileobj, "p => h2", in_place=True)
+
+        with open(path, "rb") as fileobj:
+            result = mammoth.convert_to_html(fileobj=fileobj)
+        assert_equal("<h2>Walking on imported air</h2>", result.value)
+
+
+def test_style_map_can_be_embedded_in_many_files():
+    with tempman.create_temp_dir() as temp_dir:
+        paths = [os.path.join(temp_dir.path, "{0}.docx".format(index)) for index in range(4)]
+        for path in paths:
+            shutil.copyfile(generate_test_path("single-paragraph.docx"), path)
+        missing_path = os.path.join(temp_dir.path, "missing.docx")
+
+        errors = mammoth.embed_style_map_in_files(paths + [missing_path], "p => h1")
+
+        assert_equal([missing_path], list(errors.keys()))
+        for path in paths:
+            with open(path, "rb") as fileobj:
+                assert_equal("p => h1", mammoth.read_embedded_style_map(fileobj))
+
+
 def test_warning_if_style_mapping_is_not_understood():
     style_map = """
 !!!!
@@ -96,6 +208,26 @@ p => h1"""
         assert_equal([results.warning(warning)], result.messages)
 
 
+def test_deflated_images_in_files_on_disk_can_be_seeked_by_custom_image_converters():
+    def convert_image(image):
+        with image.open() as image_file:
+            header = image_file.read(4)
+            image_file.seek(0)
+            return {"alt": "{0} {1}".format(header == image_file.read(4), len(image_file.read()))}
+
+    with tempman.create_temp_dir() as temp_dir:
+        path = os.path.join(temp_dir.path, "tiny-picture.docx")
+        with zipfile.ZipFile(generate_test_path("tiny-picture.docx")) as source_zip:
+            with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as destination_zip:
+                for info in source_zip.infolist():
+                    destination_zip.writestr(info.filename, source_zip.read(info))
+
+        with open(path, "rb") as fileobj:
+            result = mammoth.convert_to_html(fileobj=fileobj, convert_image=mammoth.images.img_element(convert_image))
+
+    assert_equal('<p><img alt="True 106" /></p>', result.value)
+
+
 def test_inline_images_referenced_by_path_relative_to_part_are_included_in_output():
     with open(generate_test_path("tiny-picture.docx"), "rb") as fileobj:
         result = mammoth.convert_to_html(fileobj=fileobj)
@@ -103,6 +235,22 @@ def test_inline_images_referenced_by_path_relative_to_part_are_included_in_outpu
         assert_equal([], result.messages)
 
 
+def test_images_can_be_streamed_into_output():
+    with open(generate_test_path("tiny-picture.docx"), "rb") as fileobj:
+        result = mammoth.convert_to_html(fileobj=fileobj, convert_image=mammoth.images.streaming_data_uri)
+        assert_equal("""<p><img src="data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAoAAAAKCAIAAAACUFjqAAAAAXNSR0IArs4c6QAAAAlwSFlzAAAOvgAADr4B6kKxwAAAABNJREFUKFNj/M+ADzDhlWUYqdIAQSwBE8U+X40AAAAASUVORK5CYII=" /></p>""", result.value)
+        assert_equal([], result.messages)
+
+
+def test_when_output_is_set_then_converted_document_is_written_to_output():
+    output = io.BytesIO()
+    with open(generate_test_path("tiny-picture.docx"), "rb") as fileobj:
+        result = mammoth.convert_to_html(fileobj=fileobj, output=output, convert_image=mammoth.images.streaming_data_uri)
+        assert_equal(None, result.value)
+        assert_equal([], result.messages)
+    assert_equal(b"""<p><img src="data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAoAAAAKCAIAAAACUFjqAAAAAXNSR0IArs4c6QAAAAlwSFlzAAAOvgAADr4B6kKxwAAAABNJREFUKFNj/M+ADzDhlWUYqdIAQSwBE8U+X40AAAAASUVORK5CYII=" /></p>""", output.getvalue())
+
+
 def test_inline_images_referenced_by_path_relative_to_base_are_included_in_output():
     with open(generate_test_path("tiny-picture-target-base-relative.docx"), "rb") as fileobj:
         result = mammoth.convert_to_html(fileobj=fileobj)
@@ -242,6 +390,83 @@ def test_when_style_mapping_is_defined_for_comment_references_then_comments_are_
         assert_equal(expected_html, result.value)
 
 
+def test_comments_are_only_read_when_included():
+    fileobj = _test_data_with_replacement(
+        "comments.docx",
+        "word/comments.xml",
+        b"<w:t>Fin.</w:t>",
+        b"<w:t>Fin.</w:t><w:bogus/>",
+    )
+
+    result = mammoth.convert_to_html(fileobj=fileobj)
+    assert_equal([], result.messages)
+
+    result = mammoth.convert_to_html(fileobj=fileobj, style_map="comment-reference => sup")
+    assert_equal([results.warning("An unrecognised element was ignored: w:bogus")], result.messages)
+
+
+def test_comments_can_be_indexed_and_sliced_when_transforming_document():
+    found = []
+
+    def transform_document(document):
+        found.append((document.comments[-1].comment_id, [comment.comment_id for comment in document.comments[:1]]))
+        return document
+
+    with open(generate_test_path("comments.docx"), "rb") as fileobj:
+        mammoth.convert_to_html(fileobj=fileobj, transform_document=transform_document)
+
+    assert_equal([("2", ["0"])], found)
+
+
+def test_comments_can_be_replaced_with_generator_when_transforming_document():
+    def transform_document(document):
+        return document.copy(comments=(comment for comment in document.comments))
+
+    with open(generate_test_path("comments.docx"), "rb") as fileobj:
+        result = mammoth.convert_to_html(
+            fileobj=fileobj,
+            transform_document=transform_document,
+            style_map="comment-reference => sup",
+        )
+
+    assert_equal([], result.messages)
+    assert '<dt id="comment-0">Comment [MW1]</dt>' in result.value
+
+
+def test_warnings_from_unreferenced_notes_are_not_reported():
+    fileobj = _test_data_with_replacement(
+        "footnotes.docx",
+        "word/footnotes.xml",
+        b'<w:footnote w:id="1">',
+        b'<w:footnote w:id="99"><w:p><w:r><w:bogus/></w:r></w:p></w:footnote><w:footnote w:id="1">',
+    )
+    result = mammoth.convert_to_html(fileobj=fileobj)
+    assert_equal([], result.messages)
+
+    fileobj = _test_data_with_replacement(
+        "footnotes.docx",
+        "word/footnotes.xml",
+        b'<w:footnote w:id="1">',
+        b'<w:footnote w:id="1"><w:p><w:r><w:bogus/></w:r></w:p>',
+    )
+    result = mammoth.convert_to_html(fileobj=fileobj)
+    assert_equal([results.warning("An unrecognised element was ignored: w:bogus")], result.messages)
+
+
+def test_only_referenced_notes_are_read():
+    fileobj = _test_data_with_replacement(
+        "footnotes.docx",
+        "word/footnotes.xml",
+        b'<w:footnote w:id="1">',
+        b'<w:footnote w:id="99"><w:p><w:r><w:bogus/></w:r></w:p></w:footnote><w:footnote w:id="1">',
+    )
+
+    result = mammoth.convert_to_html(fileobj=fileobj)
+
+    assert_equal([], result.messages)
+    assert 'id="footnote-99"' not in result.value
+
+
 def test_text_boxes_are_read():
     with open(generate_test_path("text-box.docx"), "rb") as fileobj:
         result = mammoth.convert_to_html(fileobj=fileobj)
@@ -300,6 +525,124 @@ def test_docx_containing_one_paragraph_can_be_converted_to_markdown():
         assert_equal([], result.messages)
 
 
+class ConverterTests(object):
+    def test_converter_converts_documents_in_the_same_way_as_convert_to_html(self):
+        converter = mammoth.Converter(style_map="u => em")
+
+        for name in ["underline.docx", "tables.docx", "footnotes.docx", "underline.docx"]:
+            with open(generate_test_path(name), "rb") as fileobj:
+                expected_result = mammoth.convert_to_html(fileobj=fileobj, style_map="u => em")
+            with open(generate_test_path(name), "rb") as fileobj:
+                result = converter.convert(fileobj)
+
+            assert_equal(expected_result.value, result.value)
+            assert_equal(expected_result.messages, result.messages)
+
+    def test_style_map_warnings_are_included_in_every_conversion(self):
+        converter = mammoth.Converter(style_map="!!!!\np => h1")
+        warning = results.warning("Did not understand this style mapping, so ignored it: !!!!")
+
+        for _ in range(2):
+            with open(generate_test_path("single-paragraph.docx"), "rb") as fileobj:
+                result = converter.convert(fileobj)
+            assert_equal("<h1>Walking on imported air</h1>", result.value)
+            assert_equal([warning], result.messages)
+
+    def test_converter_can_convert_to_markdown(self):
+        converter = mammoth.Converter(output_format="markdown")
+        with open(generate_test_path("single-paragraph.docx"), "rb") as fileobj:
+            result = converter.convert(fileobj)
+        assert_equal("Walking on imported air\n\n", result.value)
+
+    def test_images_are_cached_between_documents(self):
+        converter = mammoth.Converter()
+
+        for _ in range(2):
+            with open(generate_test_path("tiny-picture.docx"), "rb") as fileobj:
+                result = converter.convert(fileobj)
+            assert_equal(True, result.value.startswith('<p><img src="data:image/png;base64,iVBORw0KGgo'))
+
+        assert_equal(1, len(converter.image_cache))
+
+    def test_cached_images_are_not_reused_for_images_with_the_same_crc_and_size_but_different_contents(self):
+        converter = mammoth.Converter()
+        with zipfile.ZipFile(generate_test_path("tiny-picture.docx")) as zip_file:
+            original_image = zip_file.read("word/media/image1.png")
+        # An image with the same size and CRC-32 as the original image
+        forged_image = b"\0" * (len(original_image) - 4)
+        forged_image += _crc32_suffix(forged_image, zlib.crc32(original_image))
+
+        with open(generate_test_path("tiny-picture.docx"), "rb") as fileobj:
+            converter.convert(fileobj)
+        fileobj = _test_data_with_entry("tiny-picture.docx", "word/media/image1.png", forged_image)
+        result = converter.convert(fileobj)
+
+        expected_src = "data:image/png;base64," + base64.b64encode(forged_image).decode("ascii")
+        assert_equal('<p><img src="{0}" /></p>'.format(expected_src), result.value)
+
+    def test_image_cache_is_limited_by_size_of_data_uris(self):
+        with open(generate_test_path("tiny-picture.docx"), "rb") as fileobj:
+            data_uri_size = len(mammoth.Converter().convert(fileobj).value) - len('<p><img src="" /></p>')
+
+        converter = mammoth.Converter(image_cache_size=data_uri_size - 1)
+        with open(generate_test_path("tiny-picture.docx"), "rb") as fileobj:
+            converter.convert(fileobj)
+        assert_equal(0, len(converter.image_cache))
+
+        converter = mammoth.Converter(image_cache_size=data_uri_size)
+        with open(generate_test_path("tiny-picture.docx"), "rb") as fileobj:
+            converter.convert(fileobj)
+        assert_equal(1, len(converter.image_cache))
+
+    def test_parts_are_cached_between_documents_with_the_same_parts(self):
+        converter = mammoth.Converter()
+
+        with open(generate_test_path("simple-list.docx"), "rb") as fileobj:
+            expected_result = mammoth.convert_to_html(fileobj)
+        with open(generate_test_path("simple-list.docx"), "rb") as fileobj:
+            converter.convert(fileobj)
+        first_info = converter.part_cache.info()
+        with open(generate_test_path("simple-list.docx"), "rb") as fileobj:
+            result = converter.convert(fileobj)
+
+        assert_equal(expected_result.value, result.value)
+        second_info = converter.part_cache.info()
+        assert_equal(first_info.misses, second_info.misses)
+        assert second_info.hits > first_info.hits
+
+    def test_converter_can_be_used_from_multiple_threads(self):
+        converter = mammoth.Converter(style_map="u => em")
+        names = ["underline.docx", "tables.docx", "tiny-picture.docx", "footnotes.docx"] * 4
+
+        def convert(name):
+            with open(generate_test_path(name), "rb") as fileobj:
+                return converter.convert(fileobj).value
+
+        expected_values = [convert(name) for name in names]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+            values = list(executor.map(convert, names))
+
+        assert_equal(expected_values, values)
+
+
+def test_cached_numbering_is_only_reused_with_the_same_styles():
+    part_cache = mammoth.PartCache()
+    fileobj = _test_data_with_replacement(
+        "simple-list.docx",
+        "word/styles.xml",
+        b"</w:styles>",
+        b'<w:style w:type="paragraph" w:styleId="Extra"/></w:styles>',
+    )
+
+    with open(generate_test_path("simple-list.docx"), "rb") as original_fileobj:
+        mammoth.convert_to_html(original_fileobj, part_cache=part_cache)
+    misses = part_cache.info().misses
+    result = mammoth.convert_to_html(fileobj, part_cache=part_cache)
+
+    assert_equal("<ul><li>Apple</li><li>Banana</li></ul>", result.value)
+    assert_equal(misses + 2, part_cache.info().misses)
+
+
 def test_can_extract_raw_text():
     with open(generate_test_path("simple-list.docx"), "rb") as fileobj:
         result = mammoth.extract_raw_text(fileobj=fileobj)
@@ -314,8 +657,78 @@ def test_can_read_strict_format():
         assert_equal("<p>Test</p>", result.value)
 
 
+def _test_data_with_replacement(path, name, old, new):
+    destination = io.BytesIO()
+    with zipfile.ZipFile(generate_test_path(path)) as source_zip:
+        with zipfile.ZipFile(destination, "w") as destination_zip:
+            for info in source_zip.infolist():
+                contents = source_zip.read(info)
+                if info.filename == name:
+                    assert old in contents
+                    contents = contents.replace(old, new)
+                destination_zip.writestr(info, contents)
+    return destination
+
+
+def _test_data_with_entry(path, name, contents):
+    destination = io.BytesIO()
+    with zipfile.ZipFile(generate_test_path(path)) as source_zip:
+        with zipfile.ZipFile(destination, "w") as destination_zip:
+            for info in source_zip.infolist():
+                if info.filename == name:
+                    destination_zip.writestr(info, contents)
+                else:
+                    destination_zip.writestr(info, source_zip.read(info))
+    return destination
+
+
+def _crc32_suffix(data, crc):
+    # The CRC-32 of data followed by four bytes is an affine function of the
+    # bits of those bytes, so the bytes giving a particular CRC-32 are found
+    # by solving the linear equations over GF(2).
+    base = zlib.crc32(data + b"\0\0\0\0")
+    rows = []
+    for bit in range(32):
+        suffix = (1 << bit).to_bytes(4, "little")
+        rows.append([zlib.crc32(data + suffix) ^ base, 1 << bit])
+
+    target = crc ^ base
+    solution = 0
+    for crc_bit in range(32):
+        mask = 1 << crc_bit
+        pivot = next((row for row in rows if row[0] & mask), None)
+        if pivot is None:
+            continue
+        rows.remove(pivot)
+        for row in rows:
+            if row[0] & mask:
+                row[0] ^= pivot[0]
+                row[1] ^= pivot[1]
+        if target & mask:
+            target ^= pivot[0]
+            solution ^= pivot[1]
+
+    suffix = solution.to_bytes(4, "little")
+    assert zlib.crc32(data + suffix) == crc
+    return suffix
+
+
 def _copy_of_test_data(path):
     destination = io.BytesIO()
     with open(generate_test_path(path), "rb") as source:
         shutil.copyfileobj(source, destination)
     return destination
+
+
+class _EndSeekCountingFile(object):
+    def __init__(self, fileobj):
+        self._fileobj = fileobj
+        self.end_seek_count = 0
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_END:
+            self.end_seek_count += 1
+        return self._fileobj.seek(offset, whence)
+
+    def __getattr__(self, name):
+        return getattr(self._fileobj, name)
@@ -1,31 +1,55 @@
-from mammoth.options import read_options, _default_style_map
+from mammoth.options import read_options, compile_style_map, _default_style_map
 from mammoth.styles.parser import read_style_mapping
 from .testing import assert_equal
 
 
 def test_default_style_map_is_used_if_style_map_is_not_set():
-    assert_equal(_default_style_map, read_options({}).value["style_map"])
+    assert_equal(_default_style_map().styles, read_options({}).value["style_map"].styles)
 
 
 def test_custom_style_mappings_are_prepended_to_default_style_mappings():
     style_map = read_options({
         "style_map": "p.SectionTitle => h2"
-    }).value["style_map"]
+    }).value["style_map"].styles
     assert_equal(read_style_mapping("p.SectionTitle => h2").value, style_map[0])
-    assert_equal(_default_style_map, style_map[1:])
+    assert_equal(_default_style_map().styles, style_map[1:])
 
 
 def test_default_style_mappings_are_ignored_if_include_default_style_map_is_false():
     style_map = read_options({
         "style_map": "p.SectionTitle => h2",
         "include_default_style_map": False
-    }).value["style_map"]
-    assert_equal([read_style_mapping("p.SectionTitle => h2").value], style_map)
+    }).value["style_map"].styles
+    assert_equal((read_style_mapping("p.SectionTitle => h2").value, ), style_map)
 
 
 def test_lines_starting_with_hash_in_custom_style_map_are_ignored():
     style_map = read_options({
         "style_map": "#p.SectionTitle => h3\np.SectionTitle => h2",
         "include_default_style_map": False
-    }).value["style_map"]
-    assert_equal([read_style_mapping("p.SectionTitle => h2").value], style_map)
+    }).value["style_map"].styles
+    assert_equal((read_style_mapping("p.SectionTitle => h2").value, ), style_map)
+
+
+def test_compiled_style_map_can_be_used_as_custom_style_map():
+    compiled_style_map = compile_style_map("p.SectionTitle => h2")
+    style_map = read_options({
+        "style_map": compiled_style_map,
+        "include_default_style_map": False
+    }).value["style_map"].styles
+    assert_equal((read_style_mapping("p.SectionTitle => h2").value, ), style_map)
+
+
+def test_warnings_from_compiled_style_map_are_included_in_result():
+    compiled_style_map = compile_style_map("p.SectionTitle => h2\n!!!")
+    result = read_options({"style_map": compiled_style_map})
+    assert_equal(
+        ["Did not understand this style mapping, so ignored it: !!!"],
+        [message.message for message in result.messages],
+    )
+
+
+def test_identical_embedded_style_maps_are_only_compiled_once():
+    first_style_map = read_options({"embedded_style_map": "p.SectionTitle => h2"}).value["style_map"]
+    second_style_map = read_options({"embedded_style_map": "p.SectionTitle => h2"}).value["style_map"]
+    assert first_style_map is second_style_map
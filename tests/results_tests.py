@@ -0,0 +1,42 @@
+from mammoth import results
+from .testing import assert_equal
+
+
+def test_duplicate_messages_are_removed():
+    result = results.Result(None, [
+        results.warning("one"),
+        results.warning("two"),
+        results.warning("one"),
+    ])
+
+    assert_equal([results.warning("one"), results.warning("two")], result.messages)
+
+
+def test_bind_combines_messages_in_order_without_duplicates():
+    result = results.Result(1, [results.warning("one"), results.warning("two")]).bind(
+        lambda value: results.Result(value + 1, [results.warning("two"), results.warning("three")]),
+    )
+
+    assert_equal(2, result.value)
+    assert_equal(
+        [results.warning("one"), results.warning("two"), results.warning("three")],
+        result.messages,
+    )
+
+
+def test_combine_combines_values_and_messages_without_duplicates():
+    result = results.combine([
+        results.Result(1, [results.warning("one")]),
+        results.success(2),
+        results.Result(3, [results.warning("one"), results.warning("two")]),
+    ])
+
+    assert_equal([1, 2, 3], result.value)
+    assert_equal([results.warning("one"), results.warning("two")], result.messages)
+
+
+def test_messages_can_be_any_iterable():
+    result = results.Result(None, (message for message in [results.warning("one")]))
+
+    assert_equal([results.warning("one")], result.map(lambda value: value).messages)
+    assert_equal([results.warning("one")], result.messages)
@@ -0,0 +1,129 @@
+import itertools
+
+from mammoth import documents, document_matchers, html_paths, styles
+from mammoth.conversion import Highlight
+from mammoth.styles.index import StyleIndex, _matches, _max_cached_lookups
+from ..testing import assert_equal
+
+
+def test_when_no_styles_match_then_none_is_returned():
+    index = StyleIndex([_style(document_matchers.paragraph(style_id="Heading1"))])
+    assert_equal(None, index.find_style(documents.paragraph([], style_id="Heading2"), "paragraph"))
+
+
+def test_first_matching_style_in_style_map_is_returned():
+    first = _style(document_matchers.paragraph(style_name=document_matchers.starts_with("Heading")))
+    second = _style(document_matchers.paragraph(style_id="Heading1"))
+    index = StyleIndex([first, second])
+
+    paragraph = documents.paragraph([], style_id="Heading1", style_name="Heading 1")
+    assert_equal(first, index.find_style(paragraph, "paragraph"))
+
+
+def test_later_style_is_returned_when_earlier_styles_do_not_match():
+    first = _style(document_matchers.paragraph(style_name=document_matchers.starts_with("Heading")))
+    second = _style(document_matchers.paragraph(style_id="Heading1"))
+    index = StyleIndex([first, second])
+
+    paragraph = documents.paragraph([], style_id="Heading1", style_name="Title")
+    assert_equal(second, index.find_style(paragraph, "paragraph"))
+
+
+def test_style_names_are_matched_case_insensitively():
+    style = _style(document_matchers.run(style_name=document_matchers.equal_to("Strong")))
+    index = StyleIndex([style])
+    assert_equal(style, index.find_style(documents.run([], style_name="STRONG"), "run"))
+
+
+def test_numbering_is_only_matched_for_paragraphs():
+    numbering = documents.numbering_level(level_index=0, is_ordered=True)
+    style = _style(document_matchers.paragraph(numbering=numbering))
+    index = StyleIndex([style])
+
+    assert_equal(style, index.find_style(documents.paragraph([], numbering=numbering), "paragraph"))
+    assert_equal(None, index.find_style(documents.paragraph([]), "paragraph"))
+
+
+def test_string_matchers_with_unknown_operators_are_checked_in_order():
+    first = _style(document_matchers.run(
+        style_name=document_matchers.StringMatcher(lambda first, second: second.endswith(first), "ing"),
+    ))
+    second = _style(document_matchers.run())
+    index = StyleIndex([first, second])
+
+    assert_equal(first, index.find_style(documents.run([], style_name="Heading"), "run"))
+    assert_equal(second, index.find_style(documents.run([], style_name="Title"), "run"))
+
+
+def test_number_of_memoized_lookups_is_bounded():
+    style = _style(document_matchers.paragraph(style_name=document_matchers.starts_with("Heading")))
+    index = StyleIndex([style])
+
+    for number in range(_max_cached_lookups * 2):
+        paragraph = documents.paragraph([], style_name="Heading {0}".format(number))
+        assert_equal(style, index.find_style(paragraph, "paragraph"))
+
+    assert_equal(_max_cached_lookups, len(index._cache))
+
+
+def test_results_match_checking_each_style_in_order():
+    numbering = documents.numbering_level(level_index=0, is_ordered=False)
+    style_map = [
+        _style(document_matchers.paragraph(style_name=document_matchers.starts_with("Heading"))),
+        _style(document_matchers.paragraph(style_id="Heading1")),
+        _style(document_matchers.paragraph(style_id="Heading1", style_name=document_matchers.equal_to("Heading 1"))),
+        _style(document_matchers.paragraph(style_name=document_matchers.starts_with("Head"), numbering=numbering)),
+        _style(document_matchers.paragraph(numbering=numbering)),
+        _style(document_matchers.paragraph()),
+        _style(document_matchers.run(style_name=document_matchers.starts_with("H"))),
+        _style(document_matchers.run(style_id="Heading1")),
+        _style(document_matchers.table(style_name=document_matchers.equal_to("Heading 1"))),
+        _style(document_matchers.highlight(color="yellow")),
+        _style(document_matchers.highlight()),
+        _style(document_matchers.page_break),
+        _style(document_matchers.bold),
+        _style(document_matchers.bold),
+    ]
+    # Give each style a distinct HTML path so that equal matchers can be
+    # told apart.
+    style_map = [
+        styles.style(style.document_matcher, html_paths.path([html_paths.element(["p"], class_names=[str(position)])]))
+        for position, style in enumerate(style_map)
+    ]
+
+    elements = []
+    for style_id, style_name, element_numbering in itertools.product(
+        [None, "Heading1", "Title"],
+        [None, "Heading 1", "heading 2", "Head", "Title"],
+        [None, numbering],
+    ):
+        elements.append((documents.paragraph([], style_id=style_id, style_name=style_name, numbering=element_numbering), "paragraph"))
+        elements.append((documents.run([], style_id=style_id, style_name=style_name), "run"))
+        elements.append((documents.table([], style_id=style_id, style_name=style_name), "table"))
+    elements += [
+        (Highlight(color=None), "highlight"),
+        (Highlight(color="yellow"), "highlight"),
+        (Highlight(color="red"), "highlight"),
+        (documents.page_break, "break"),
+        (documents.line_break, "break"),
+        (None, "bold"),
+        (None, "italic"),
+    ]
+
+    for ordered_style_map in [style_map, list(reversed(style_map))]:
+        index = StyleIndex(ordered_style_map)
+        for element, element_type in elements:
+            expected = _find_style_by_checking_each_style(ordered_style_map, element, element_type)
+            assert_equal(expected, index.find_style(element, element_type))
+            # Check again to exercise the memoized path
+            assert_equal(expected, index.find_style(element, element_type))
+
+
+def _find_style_by_checking_each_style(style_map, element, element_type):
+    for style in style_map:
+        if _matches(style.document_matcher, element, element_type):
+            return style
+
+
+def _style(document_matcher):
+    return styles.style(document_matcher, html_paths.path([html_paths.element(["p"])]))
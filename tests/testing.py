@@ -1,4 +1,6 @@
+import io
 import os
+import zipfile
 
 from precisely import assert_that, equal_to
 
@@ -19,3 +21,18 @@ def assert_raises(exception, func):
     except exception as error:
         return error
 
+
+def external_picture_docx(target):
+    """
+    Create a copy of external-picture.docx with the picture linked to target.
+    """
+    fileobj = io.BytesIO()
+    with zipfile.ZipFile(generate_test_path("external-picture.docx")) as source_zip:
+        with zipfile.ZipFile(fileobj, "w") as output_zip:
+            for name in source_zip.namelist():
+                contents = source_zip.read(name)
+                if name == "word/_rels/document.xml.rels":
+                    contents = contents.replace(b'Target="tiny-picture.png"', 'Target="{0}"'.format(target).encode("utf-8"))
+                output_zip.writestr(name, contents)
+    fileobj.seek(0)
+    return fileobj
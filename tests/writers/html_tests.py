@@ -0,0 +1,55 @@
+from __future__ import unicode_literals
+
+import io
+
+from mammoth import html
+from mammoth.writers.html import HtmlWriter
+from ..testing import assert_equal
+
+
+def test_attribute_values_are_escaped():
+    writer = HtmlWriter()
+    writer.self_closing("img", {"src": "a&\"b", "alt": "<c>"})
+    assert_equal('<img alt="&lt;c&gt;" src="a&amp;&quot;b" />', writer.as_string())
+
+
+def test_streamed_attribute_values_escape_prefix_and_write_chunks_as_is():
+    writer = HtmlWriter()
+    writer.start("a", {
+        "href": html.streamed_attribute_value("&", lambda: iter(["one", "&amp;", "two"])),
+    })
+    writer.end("a")
+    assert_equal('<a href="&amp;one&amp;two"></a>', writer.as_string())
+
+
+def test_when_output_is_set_then_html_is_written_to_output_as_utf8():
+    output = io.BytesIO()
+    writer = HtmlWriter(output=output)
+    writer.start("p")
+    writer.text("Café & bar")
+    writer.end("p")
+
+    assert_equal(None, writer.as_string())
+    assert_equal("<p>Café &amp; bar</p>".encode("utf-8"), output.getvalue())
+
+
+def test_when_output_is_text_file_then_html_is_written_without_encoding():
+    output = io.StringIO()
+    writer = HtmlWriter(output=output)
+    writer.text("Café")
+
+    assert_equal(None, writer.as_string())
+    assert_equal("Café", output.getvalue())
+
+
+def test_output_is_written_before_writing_finishes_once_buffer_is_full():
+    output = io.BytesIO()
+    writer = HtmlWriter(output=output)
+    for index in range(10000):
+        writer.start("p")
+        writer.text("Paragraph {0}".format(index))
+        writer.end("p")
+
+    assert len(output.getvalue()) > 0
+    writer.as_string()
+    assert output.getvalue().endswith(b"<p>Paragraph 9999</p>")
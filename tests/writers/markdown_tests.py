@@ -1,5 +1,7 @@
 from __future__ import unicode_literals
 
+import io
+
 from mammoth.writers.markdown import MarkdownWriter
 from ..testing import assert_equal
 
@@ -183,3 +185,14 @@ def test_numbering_is_separate_for_nested_list_and_parent_list():
 
 def _create_writer():
     return MarkdownWriter()
+
+
+def test_when_output_is_set_then_markdown_is_written_to_output_as_utf8():
+    output = io.BytesIO()
+    writer = MarkdownWriter(output=output)
+    writer.start("p")
+    writer.text("Café")
+    writer.end("p")
+
+    assert_equal(None, writer.as_string())
+    assert_equal("Café\n\n".encode("utf-8"), output.getvalue())
@@ -1,5 +1,14 @@
+import contextlib
+import gzip
+import io
+import os
+import tempfile
+import zipfile
+
+import tempman
+
 from mammoth import zips
-from .testing import assert_equal
+from .testing import assert_equal, assert_raises
 
 
 def test_split_path_splits_zip_paths_on_last_forward_slash():
@@ -29,3 +38,262 @@ def test_when_joining_paths_then_absolute_paths_ignore_earlier_paths():
     assert_equal("/b/c", zips.join_path("a", "/b", "c"))
     assert_equal("/b", zips.join_path("/a", "/b"))
     assert_equal("/a", zips.join_path("/a"))
+
+
+def test_zip_entries_that_exist_are_found_by_name():
+    zip_file = _zip_with_entries(["a/b.xml"])
+    assert_equal(True, zip_file.exists("a/b.xml"))
+    assert_equal(False, zip_file.exists("a/c.xml"))
+    assert_equal(False, zip_file.exists("a"))
+
+
+def test_zip_files_with_file_descriptors_are_memory_mapped():
+    with _zip_file_on_disk({"a.xml": b"one"}) as zip_file:
+        assert isinstance(zip_file, zips._MappedZip)
+
+
+def test_zip_files_without_file_descriptors_are_not_memory_mapped():
+    zip_file = _zip_with_entries({"a.xml": b"one"})
+    assert not isinstance(zip_file, zips._MappedZip)
+    assert_equal("one", zip_file.read_str("a.xml"))
+
+
+def test_spooled_temporary_files_are_not_memory_mapped():
+    with tempfile.SpooledTemporaryFile() as fileobj:
+        fileobj.write(_zip_bytes({"a.xml": b"one"}).getvalue())
+        fileobj.seek(0)
+        with zips.open_zip(fileobj, "r") as zip_file:
+            assert not isinstance(zip_file, zips._MappedZip)
+            assert_equal("one", zip_file.read_str("a.xml"))
+        assert not isinstance(fileobj.name, int)
+
+
+def test_gzip_files_are_read_through_decompression_rather_than_memory_mapped():
+    with tempman.create_temp_dir() as temp_dir:
+        path = os.path.join(temp_dir.path, "file.zip.gz")
+        with gzip.open(path, "wb") as fileobj:
+            fileobj.write(_zip_bytes({"a.xml": b"one"}).getvalue())
+
+        with gzip.open(path, "rb") as fileobj:
+            with zips.open_zip(fileobj, "r") as zip_file:
+                assert not isinstance(zip_file, zips._MappedZip)
+                assert_equal("one", zip_file.read_str("a.xml"))
+
+
+def test_files_on_disk_are_not_memory_mapped_unless_at_start_of_file():
+    with tempman.create_temp_dir() as temp_dir:
+        path = os.path.join(temp_dir.path, "file.zip")
+        with open(path, "wb") as fileobj:
+            fileobj.write(_zip_bytes({"a.xml": b"one"}).getvalue())
+
+        with open(path, "rb") as fileobj:
+            fileobj.seek(1)
+            assert_equal(None, zips._map_file(fileobj))
+
+
+def test_error_is_raised_if_file_on_disk_is_too_short_to_be_zip_file():
+    with tempman.create_temp_dir() as temp_dir:
+        path = os.path.join(temp_dir.path, "file.zip")
+        with open(path, "wb") as fileobj:
+            fileobj.write(b"garbage\n")
+
+        with open(path, "rb") as fileobj:
+            assert_raises(zipfile.BadZipFile, lambda: zips.open_zip(fileobj, "r"))
+
+
+def test_stored_entries_of_memory_mapped_zip_files_can_be_read():
+    contents = b"0123456789" * 1000
+    with _zip_file_on_disk({"a.png": contents}, compression=zipfile.ZIP_STORED) as zip_file:
+        with zip_file.open("a.png") as entry:
+            assert_equal(contents[:5], entry.read(5))
+            assert_equal(contents[5:], entry.read())
+            assert_equal(b"", entry.read())
+
+        with zip_file.open("a.png") as entry:
+            with entry.getbuffer() as buffer:
+                assert_equal(contents, bytes(buffer))
+
+
+def test_deflated_entries_of_memory_mapped_zip_files_can_be_read():
+    contents = os.urandom(200000) + b"0123456789" * 100000
+    with _zip_file_on_disk({"a.png": contents}, compression=zipfile.ZIP_DEFLATED) as zip_file:
+        with zip_file.open("a.png") as entry:
+            assert_equal(contents, entry.read())
+
+        with zip_file.open("a.png") as entry:
+            assert_equal(contents, b"".join(iter(lambda: entry.read(1000), b"")))
+
+        with zip_file.open("a.png") as entry:
+            with entry.getbuffer() as buffer:
+                assert_equal(contents, bytes(buffer))
+
+
+def test_deflated_entries_of_memory_mapped_zip_files_can_be_seeked():
+    contents = os.urandom(1000) + b"0123456789" * 1000
+    with _zip_file_on_disk({"a.png": contents}, compression=zipfile.ZIP_DEFLATED) as zip_file:
+        with zip_file.open("a.png") as entry:
+            assert_equal(True, entry.seekable())
+            assert_equal(contents[:10], entry.read(10))
+            assert_equal(0, entry.seek(0))
+            assert_equal(contents[:20], entry.read(20))
+            assert_equal(15, entry.seek(-5, io.SEEK_CUR))
+            assert_equal(contents[15:], entry.read())
+
+        with zip_file.open("a.png") as entry:
+            entry.seek(len(contents) - 3)
+            assert_equal(contents[-3:], entry.read())
+
+
+def test_text_entries_of_memory_mapped_zip_files_are_decoded_as_utf8():
+    with _zip_file_on_disk({"a.xml": "caf\u00e9".encode("utf8")}) as zip_file:
+        assert_equal("caf\u00e9", zip_file.read_str("a.xml"))
+
+
+def test_error_is_raised_if_memory_mapped_entry_has_bad_crc():
+    with _zip_file_on_disk({"a.png": b"one"}, compression=zipfile.ZIP_STORED, corrupt=(b"one", b"two")) as zip_file:
+        error = assert_raises(zipfile.BadZipFile, lambda: zip_file.open("a.png"))
+        assert_equal("Bad CRC-32 for file 'a.png'", str(error))
+
+
+def test_error_is_raised_if_memory_mapped_entry_is_larger_than_its_declared_size():
+    with _zip_file_on_disk({"a.png": b"0" * 1000}, compression=zipfile.ZIP_DEFLATED) as zip_file:
+        info = zip_file._zip_file.getinfo("a.png")
+        info.file_size = 10
+        with zip_file.open("a.png") as entry:
+            error = assert_raises(zipfile.BadZipFile, lambda: entry.read())
+        assert_equal("Bad size for file 'a.png'", str(error))
+
+
+def test_declared_size_of_memory_mapped_entry_is_not_allocated_up_front():
+    with _zip_file_on_disk({"a.png": b"one"}, compression=zipfile.ZIP_DEFLATED) as zip_file:
+        info = zip_file._zip_file.getinfo("a.png")
+        info.file_size = 2 ** 62
+        with zip_file.open("a.png") as entry:
+            error = assert_raises(zipfile.BadZipFile, lambda: entry.read())
+        assert_equal("Bad size for file 'a.png'", str(error))
+
+
+def test_memory_mapped_entries_can_be_used_after_zip_file_is_closed_if_already_opened():
+    with _zip_file_on_disk({"a.png": b"one"}, compression=zipfile.ZIP_STORED) as zip_file:
+        entry = zip_file.open("a.png")
+
+    assert_equal(b"one", entry.read())
+
+
+def test_update_zip_replaces_and_adds_entries():
+    fileobj = _zip_bytes({"a.xml": b"one", "b.xml": b"two"})
+    zips.update_zip(fileobj, {"b.xml": b"three", "c.xml": b"four"})
+
+    with zipfile.ZipFile(fileobj) as zip_file:
+        assert_equal(["a.xml", "b.xml", "c.xml"], zip_file.namelist())
+        assert_equal(b"one", zip_file.read("a.xml"))
+        assert_equal(b"three", zip_file.read("b.xml"))
+        assert_equal(b"four", zip_file.read("c.xml"))
+
+
+def test_update_zip_copies_unchanged_entries_without_recompressing_them():
+    contents = b"0123456789" * 1000
+    fileobj = _zip_bytes({"a.png": contents, "b.xml": b"one"}, compression=zipfile.ZIP_DEFLATED, compresslevel=1)
+    with zipfile.ZipFile(fileobj) as zip_file:
+        original_info = zip_file.getinfo("a.png")
+
+    zips.update_zip(fileobj, {"b.xml": b"two"})
+
+    with zipfile.ZipFile(fileobj) as zip_file:
+        info = zip_file.getinfo("a.png")
+        assert_equal(original_info.compress_size, info.compress_size)
+        assert_equal(original_info.date_time, info.date_time)
+        assert_equal(contents, zip_file.read("a.png"))
+
+
+def test_update_zip_preserves_comment():
+    fileobj = _zip_bytes({"a.xml": b"one"}, comment=b"Comment")
+    zips.update_zip(fileobj, {"a.xml": b"two"})
+
+    with zipfile.ZipFile(fileobj) as zip_file:
+        assert_equal(b"Comment", zip_file.comment)
+
+
+def test_update_zip_truncates_file_when_updated_zip_is_smaller():
+    fileobj = _zip_bytes({"a.xml": b"0123456789" * 1000})
+    zips.update_zip(fileobj, {"a.xml": b"one"})
+
+    assert_equal(len(fileobj.getvalue()), fileobj.tell())
+    with zipfile.ZipFile(fileobj) as zip_file:
+        assert_equal(b"one", zip_file.read("a.xml"))
+
+
+def test_when_updating_zip_in_place_then_unchanged_entries_are_not_moved():
+    fileobj = _zip_bytes({"a.xml": b"one", "b.xml": b"two", "c.xml": b"three"})
+    with zipfile.ZipFile(fileobj) as zip_file:
+        original_offsets = dict((info.filename, info.header_offset) for info in zip_file.infolist())
+
+    zips.update_zip(fileobj, {"b.xml": b"four"}, in_place=True)
+
+    with zipfile.ZipFile(fileobj) as zip_file:
+        assert_equal(["a.xml", "c.xml", "b.xml"], zip_file.namelist())
+        assert_equal(original_offsets["a.xml"], zip_file.getinfo("a.xml").header_offset)
+        assert_equal(original_offsets["c.xml"], zip_file.getinfo("c.xml").header_offset)
+        assert_equal(b"one", zip_file.read("a.xml"))
+        assert_equal(b"four", zip_file.read("b.xml"))
+        assert_equal(b"three", zip_file.read("c.xml"))
+
+
+def test_when_updating_zip_in_place_then_replaced_entries_at_end_of_file_are_overwritten():
+    fileobj = _zip_bytes({"a.xml": b"one"})
+    zips.update_zip(fileobj, {"b.xml": b"two"}, in_place=True)
+    size = len(fileobj.getvalue())
+
+    zips.update_zip(fileobj, {"b.xml": b"six"}, in_place=True)
+
+    assert_equal(size, len(fileobj.getvalue()))
+    with zipfile.ZipFile(fileobj) as zip_file:
+        assert_equal(["a.xml", "b.xml"], zip_file.namelist())
+        assert_equal(b"six", zip_file.read("b.xml"))
+
+
+def test_update_zip_encodes_non_ascii_names_as_utf8():
+    fileobj = _zip_bytes({"a.xml": b"one"})
+    zips.update_zip(fileobj, {"caf\u00e9.xml": b"two"})
+
+    with zipfile.ZipFile(fileobj) as zip_file:
+        assert_equal(b"two", zip_file.read("caf\u00e9.xml"))
+
+
+@contextlib.contextmanager
+def _zip_file_on_disk(entries, compression=zipfile.ZIP_DEFLATED, corrupt=None):
+    with tempman.create_temp_dir() as temp_dir:
+        path = os.path.join(temp_dir.path, "file.zip")
+        with zipfile.ZipFile(path, "w", compression=compression) as zip_file:
+            for name, contents in entries.items():
+                zip_file.writestr(name, contents)
+
+        if corrupt is not None:
+            with open(path, "rb") as fileobj:
+                zip_bytes = fileobj.read()
+            with open(path, "wb") as fileobj:
+                fileobj.write(zip_bytes.replace(*corrupt))
+
+        with open(path, "rb") as fileobj:
+            with zips.open_zip(fileobj, "r") as zip_file:
+                yield zip_file
+
+
+def _zip_bytes(entries, comment=b"", **kwargs):
+    fileobj = io.BytesIO()
+    with zipfile.ZipFile(fileobj, "w", **kwargs) as zip_file:
+        zip_file.comment = comment
+        for name, contents in entries.items():
+            zip_file.writestr(name, contents)
+    return fileobj
+
+
+def _zip_with_entries(entries):
+    if not isinstance(entries, dict):
+        entries = dict((name, b"") for name in entries)
+
+    fileobj = io.BytesIO()
+    with zipfile.ZipFile(fileobj, "w") as zip_file:
+        for name, contents in entries.items():
+            zip_file.writestr(name, contents)
+    return zips.open_zip(fileobj, "r")